@@ -13,12 +13,22 @@
 
 """Base API Library"""
 
+import operator
+
 import simplejson as json
 
 from keystoneauth1 import exceptions as ks_exceptions
 from keystoneauth1 import session as ks_session
 from osc_lib import exceptions
-
+from six.moves import urllib
+
+from openstackclient.api import httpcache
+from openstackclient.api import jsonstream
+from openstackclient.api import pagination
+from openstackclient.api import retry
+from openstackclient.api import utils as api_utils
+from openstackclient.common import httppool
+from openstackclient.common import trace
 from openstackclient.i18n import _
 
 
@@ -52,6 +62,9 @@ class KeystoneSession(object):
         self.session = session
         self.endpoint = endpoint
 
+        # Identical GET requests are answered from here
+        self.response_cache = httpcache.ResponseCache()
+
     def _request(self, method, url, session=None, **kwargs):
         """Perform call into session
 
@@ -61,32 +74,49 @@ class KeystoneSession(object):
         :param string method:
             The HTTP method name, i.e. ``GET``, ``PUT``, etc
         :param string url:
-            The API-specific portion of the URL path
+            The API-specific portion of the URL path, or an absolute URL
+            such as a pagination link
         :param Session session:
             HTTP client session
         :param kwargs:
             keyword arguments passed to requests.request().
-        :return: the requests.Response object
+        :return: the requests.Response object, possibly one cached by an
+            identical GET request
         """
 
         if not session:
             session = self.session
         if not session:
             session = ks_session.Session()
+        # Transient failures are retried by the session's adapters
+        httppool.ensure_retry_policy(session, retry.get_default_policy())
 
-        if self.endpoint:
+        if self.endpoint and not urllib.parse.urlparse(url or '').scheme:
             if url:
                 url = '/'.join([self.endpoint.rstrip('/'), url.lstrip('/')])
             else:
                 url = self.endpoint.rstrip('/')
 
-        # Why is ksc session backwards???
-        return session.request(url, method, **kwargs)
+        def send(method, url, **kwargs):
+            # Why is ksc session backwards???
+            return session.request(url, method, **kwargs)
+
+        return self.response_cache.request(
+            send,
+            method,
+            url,
+            identity=lambda: httpcache.get_identity(session),
+            **kwargs
+        )
 
 
 class BaseAPI(KeystoneSession):
     """Base API"""
 
+    # Query parameters the API filters on, for each listing path searched
+    # by find_bulk(); other attributes are matched locally
+    SERVER_FILTERS = {}
+
     def __init__(
         self,
         session=None,
@@ -108,6 +138,9 @@ class BaseAPI(KeystoneSession):
         super(BaseAPI, self).__init__(session=session, endpoint=endpoint)
 
         self.service_type = service_type
+        self._list_indexes = api_utils.ListIndexCache(
+            maxsize=self.response_cache.maxsize,
+        )
 
     # The basic action methods all take a Session and return dict/lists
 
@@ -153,12 +186,14 @@ class BaseAPI(KeystoneSession):
 
         return self._request('DELETE', url, **params)
 
+    @trace.traced('list')
     def list(
         self,
         path,
         session=None,
         body=None,
         detailed=False,
+        resource=None,
         **params
     ):
         """Return a list of resources
@@ -175,10 +210,28 @@ class BaseAPI(KeystoneSession):
             request (GET will be sent by default)
         :param bool detailed:
             Adds '/details' to path for some APIs to return extended attributes
+        :param string resource:
+            name of the list wrapped in the response; if given, the response
+            is decoded incrementally and the unwrapped list is returned,
+            without going through the response cache; use iter_list() or
+            paginate() to consume large listings as they are read
         :returns:
             JSON-decoded response, could be a list or a dict-wrapped-list
         """
 
+        if resource is not None:
+            items = self.iter_list(
+                path,
+                session=session,
+                body=body,
+                detailed=detailed,
+                resource=resource,
+                **params
+            )
+            ret = [item for item in items]
+            # Some APIs (Identity) return a single dict instead of a list
+            return items.members.get(resource, ret)
+
         if detailed:
             path = '/'.join([path.rstrip('/'), 'details'])
 
@@ -202,9 +255,128 @@ class BaseAPI(KeystoneSession):
         except json.JSONDecodeError:
             return ret
 
+    def iter_list(
+        self,
+        path,
+        session=None,
+        body=None,
+        detailed=False,
+        resource=None,
+        **params
+    ):
+        """Iterate over a list of resources as the response is read
+
+        The response body is decoded incrementally so the whole body and
+        the whole decoded list are never held in memory at once.  Streamed
+        responses are not kept by the response cache, each call sends a
+        request.
+
+        :param string path:
+            The API-specific portion of the URL path
+        :param Session session:
+            HTTP client session
+        :param body: data that will be encoded as JSON and passed in POST
+            request (GET will be sent by default)
+        :param bool detailed:
+            Adds '/details' to path for some APIs to return extended attributes
+        :param string resource:
+            name of the list wrapped in the response; the response may also
+            be a bare list
+        :returns:
+            a jsonstream.ItemStream of resource dicts; the other members of
+            the response are in its ``members`` once iteration is complete
+        """
+
+        if detailed:
+            path = '/'.join([path.rstrip('/'), 'details'])
+
+        kwargs = {}
+        if body:
+            kwargs['json'] = body
+        ret = self._request(
+            'POST' if body else 'GET',
+            path,
+            session=session,
+            params=params,
+            stream=True,
+            **kwargs
+        )
+        return jsonstream.iter_response(ret, resource=resource)
+
+    def paginate(
+        self,
+        path,
+        resource=None,
+        marker_key=None,
+        prefetch_batches=pagination.PREFETCH_BATCHES,
+        **params
+    ):
+        """Iterate over every resource of a paginated listing
+
+        Each page is decoded as it is read, in a background thread that
+        stays up to prefetch_batches batches of items ahead of the
+        consumer, so the next page is requested as soon as the current one
+        has been read and no page is held in memory as a whole.  Pages are
+        followed using the link to the next page when the response has one
+        (``next`` for Image v2, ``<resource>_links`` for Compute, Block
+        Storage and Networking), otherwise using a marker taken from the
+        last item of each page.  The pages are streamed, so they are not
+        answered from the response cache.
+
+        :param string path:
+            The API-specific portion of the URL path
+        :param string resource:
+            plural of the object resource name wrapping the list in the
+            response; defaults to path
+        :param marker_key:
+            name of the item attribute used as the ``marker`` query
+            parameter, or a callable returning the marker for an item;
+            None disables marker pagination
+        :param int prefetch_batches:
+            number of batches of items decoded ahead of the consumer, 0
+            reads the pages only as the items are consumed
+        :returns:
+            a generator of resource dicts
+        """
+
+        if resource is None:
+            resource = path
+        if marker_key is not None and not callable(marker_key):
+            marker_key = operator.itemgetter(marker_key)
+
+        def iter_batches():
+            url, page_params = path, params
+            while True:
+                stream = self.iter_list(url, resource=resource, **page_params)
+                last = None
+                for batch in pagination.batches(stream, pagination.BATCH_SIZE):
+                    last = batch[-1]
+                    yield batch
+                next_link = _next_link(stream.members, resource)
+
+                if next_link:
+                    url = urllib.parse.urljoin(
+                        (self.endpoint or '').rstrip('/') + '/',
+                        next_link,
+                    )
+                    # The link carries the query parameters
+                    page_params = {}
+                    continue
+                if marker_key is None or last is None:
+                    return
+                marker = marker_key(last)
+                if marker == page_params.get('marker'):
+                    return
+                url, page_params = path, dict(params, marker=marker)
+
+        for batch in pagination.prefetch(iter_batches(), prefetch_batches):
+            for item in batch:
+                yield item
+
     # Layered actions built on top of the basic action methods do not
     # explicitly take a Session but one may still be passed in kwargs
 
+    @trace.traced('lookup')
     def find_attr(
         self,
         path,
@@ -220,6 +392,13 @@ class BaseAPI(KeystoneSession):
         unwrap these bodies and return a single dict without any resource
         wrappers.
 
+        Values shaped like an ID (a UUID or an integer) are searched by ID
+        first and a match on the ID is returned; the attribute is only
+        searched when it misses.  For other values the attribute and ID
+        queries are sent concurrently and a match on the attribute is
+        preferred.  Items returned by the ID query are only accepted if
+        their ID is the value, as some servers ignore the ``id`` filter.
+
         :param string path:
             The API-specific portion of the URL path
         :param string value:
@@ -248,9 +427,34 @@ class BaseAPI(KeystoneSession):
                 ret = ret[resource]
             return ret
 
+        def id_matches(data):
+            """Return the items of an ID query really having the ID"""
+            if isinstance(data, dict):
+                data = [data]
+            return [
+                item for item in data
+                if str(item.get('id')) == str(value)
+            ]
+
+        if api_utils.is_id_like(value):
+            # The ID query is the likely hit, only search by attribute
+            # when it misses
+            by_id = id_matches(getlist({'id': value}))
+            if len(by_id) == 1:
+                return by_id[0]
+            by_attr = getlist({attr: value})
+            id_result = None
+        else:
+            # Either query may hit, run them together; a failure of the
+            # ID query only matters if the attribute query misses
+            attr_result, id_result = api_utils.call_concurrently(
+                lambda: getlist({attr: value}),
+                lambda: getlist({'id': value}),
+            )
+            by_attr = attr_result.get()
+
         # Search by attribute
-        kwargs = {attr: value}
-        data = getlist(kwargs)
+        data = by_attr
         if isinstance(data, dict):
             return data
         if len(data) == 1:
@@ -264,10 +468,10 @@ class BaseAPI(KeystoneSession):
             )
 
         # Search by id
-        kwargs = {'id': value}
-        data = getlist(kwargs)
-        if len(data) == 1:
-            return data[0]
+        if id_result is not None:
+            data = id_matches(id_result.get())
+            if len(data) == 1:
+                return data[0]
         msg = _("No %(resource)s with a %(attr)s or ID of '%(value)s' found")
         raise exceptions.CommandError(
             msg % {'resource': resource,
@@ -275,6 +479,7 @@ class BaseAPI(KeystoneSession):
                    'value': value}
         )
 
+    @trace.traced('lookup')
     def find_bulk(
         self,
         path,
@@ -282,6 +487,11 @@ class BaseAPI(KeystoneSession):
     ):
         """Bulk load and filter locally
 
+        The attributes listed in SERVER_FILTERS for the path are sent as
+        query parameters so the server does the filtering.  The listing is
+        indexed so further lookups in the same collection during a command
+        do not search it again.
+
         :param string path:
             The API-specific portion of the URL path
         :param kwargs:
@@ -289,21 +499,9 @@ class BaseAPI(KeystoneSession):
         :returns: list of resource dicts
         """
 
-        items = self.list(path)
-        if isinstance(items, dict):
-            # strip off the enclosing dict
-            key = list(items.keys())[0]
-            items = items[key]
-
-        ret = []
-        for o in items:
-            try:
-                if all(o[attr] == kwargs[attr] for attr in kwargs.keys()):
-                    ret.append(o)
-            except KeyError:
-                continue
-
-        return ret
+        params = api_utils.server_filters(self.SERVER_FILTERS, path, kwargs)
+        response = self._request('GET', path, params=params)
+        return self._list_indexes.get(path, params, response).find(**kwargs)
 
     def find_one(
         self,
@@ -328,6 +526,7 @@ class BaseAPI(KeystoneSession):
             raise RuntimeError(msg)
         return bulk_list[0]
 
+    @trace.traced('lookup')
     def find(
         self,
         path,
@@ -336,6 +535,11 @@ class BaseAPI(KeystoneSession):
     ):
         """Find a single resource by name or ID
 
+        Values shaped like an ID (a UUID or an integer) are fetched
+        directly first; for other values the direct fetch and the
+        attribute search are sent concurrently.  See find_bulk() for the
+        attribute search.
+
         :param string path:
             The API-specific portion of the URL path
         :param string value:
@@ -344,14 +548,47 @@ class BaseAPI(KeystoneSession):
             name of attribute for secondary search
         """
 
-        try:
-            ret = self._request('GET', "/%s/%s" % (path, value)).json()
-        except ks_exceptions.NotFound:
-            kwargs = {attr: value}
+        def get():
             try:
-                ret = self.find_one("/%s/detail" % (path), **kwargs)
+                return self._request('GET', "/%s/%s" % (path, value)).json()
             except ks_exceptions.NotFound:
-                msg = _("%s not found") % value
-                raise exceptions.NotFound(msg)
+                return None
+
+        def search():
+            if attr is None:
+                return []
+            return self.find_bulk("/%s/detail" % (path), **{attr: value})
+
+        if api_utils.is_id_like(value):
+            ret = get()
+            if ret is not None:
+                return ret
+            found = search()
+        else:
+            get_result, search_result = api_utils.call_concurrently(
+                get,
+                search,
+            )
+            ret = get_result.get()
+            if ret is not None:
+                return ret
+            found = search_result.get()
+
+        if len(found) > 1:
+            msg = _("many found")
+            raise RuntimeError(msg)
+        if not found:
+            msg = _("%s not found") % value
+            raise exceptions.NotFound(msg)
+        return found[0]
+
+
+def _next_link(body, resource):
+    """Return the link to the next page of a listing body, or None"""
 
-        return ret
+    if body.get('next'):
+        return body['next']
+    for link in body.get('%s_links' % resource) or []:
+        if link.get('rel') == 'next':
+            return link.get('href')
+    return None
@@ -14,10 +14,13 @@
 """Compute v2 API Library"""
 
 from keystoneauth1 import exceptions as ksa_exceptions
-from osc_lib.api import api
 from osc_lib import exceptions
 from osc_lib.i18n import _
 
+from openstackclient.api import api
+from openstackclient.api import utils as api_utils
+from openstackclient.common import trace
+
 
 # TODO(dtroyer): Mingrate this to osc-lib
 class InvalidValue(Exception):
@@ -28,10 +31,9 @@ class InvalidValue(Exception):
 class APIv2(api.BaseAPI):
     """Compute v2 API"""
 
-    def __init__(self, **kwargs):
-        super(APIv2, self).__init__(**kwargs)
-
-    # Overrides
+    # None of the nova-network listings searched by find_bulk() filter
+    # by name, so every attribute is matched locally
+    SERVER_FILTERS = {}
 
     def _check_integer(self, value, msg=None):
         """Attempt to convert value to an integer
@@ -58,6 +60,7 @@ class APIv2(api.BaseAPI):
 
     # TODO(dtroyer): Override find() until these fixes get into an osc-lib
     #                minimum release
+    @trace.traced('lookup')
     def find(
         self,
         path,
@@ -66,6 +69,10 @@ class APIv2(api.BaseAPI):
     ):
         """Find a single resource by name or ID
 
+        Values shaped like an ID (a UUID or an integer) are fetched
+        directly first; for other values the direct fetch and the
+        attribute search are sent concurrently.
+
         :param string path:
             The API-specific portion of the URL path
         :param string value:
@@ -74,23 +81,38 @@ class APIv2(api.BaseAPI):
             name of attribute for secondary search
         """
 
-        try:
-            ret = self._request('GET', "/%s/%s" % (path, value)).json()
+        def get():
+            try:
+                ret = self._request('GET', "/%s/%s" % (path, value)).json()
+            except (
+                ksa_exceptions.NotFound,
+                ksa_exceptions.BadRequest,
+            ):
+                return None
             if isinstance(ret, dict):
                 # strip off the enclosing dict
                 key = list(ret.keys())[0]
                 ret = ret[key]
-        except (
-            ksa_exceptions.NotFound,
-            ksa_exceptions.BadRequest,
-        ):
+            return ret
+
+        def search():
             kwargs = {attr: value}
             try:
-                ret = self.find_one(path, **kwargs)
+                return self.find_one(path, **kwargs)
             except ksa_exceptions.NotFound:
                 msg = _("%s not found") % value
                 raise exceptions.NotFound(msg)
 
+        if api_utils.is_id_like(value):
+            ret = get()
+            if ret is None:
+                ret = search()
+            return ret
+
+        get_result, search_result = api_utils.call_concurrently(get, search)
+        ret = get_result.get()
+        if ret is None:
+            ret = search_result.get()
         return ret
 
     # Floating IPs
@@ -654,3 +676,41 @@ class APIv2(api.BaseAPI):
             return self.delete('/%s/%s' % (url, security_group_rule_id))
 
         return None
+
+    def security_group_rule_find(
+        self,
+        security_group_rule=None,
+    ):
+        """Return a security group rule given its ID
+
+        There is no API to show or list rules, so the rules of every
+        security group are searched, through an index of the security
+        group listing shared by the lookups of a command.
+
+        :param string security_group_rule:
+            Security group rule ID
+        :returns: A dict of the security group rule attributes
+        :raises NotFound: if no rule has this ID
+        """
+
+        url = "/os-security-groups"
+
+        def rules(body):
+            return [
+                rule
+                for group in body['security_groups']
+                for rule in group['rules']
+            ]
+
+        response = self._request('GET', url)
+        index = self._list_indexes.get(url, {}, response, items=rules)
+        rule_id = str(security_group_rule)
+        found = index.find(id=rule_id)
+        if not found and rule_id.isdigit():
+            # nova-network rule IDs are integers
+            found = index.find(id=int(rule_id))
+        if not found:
+            msg = _("Could not find security group rule "
+                    "with ID '%s'") % security_group_rule
+            raise exceptions.NotFound(msg)
+        return found[0]
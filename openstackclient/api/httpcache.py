@@ -0,0 +1,283 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""HTTP GET response cache
+
+Identical GET requests made during one command are answered from an
+in-process LRU cache.  When persistent caching is enabled
+(``--os-http-cache``) responses carrying an ``ETag`` or ``Last-Modified``
+header are also stored on disk, and later commands reuse them once the
+server confirms them with a conditional request (``304 Not Modified``).
+
+Any other request drops the cached responses for its path, the paths below
+it and its parent collection.
+
+Responses stored on disk are keyed by the user and project of the session
+too, so identities sharing an endpoint never revalidate each other's
+responses.
+"""
+
+import base64
+import collections
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from keystoneauth1 import exceptions as ks_exceptions
+import requests
+from requests import structures
+from six.moves import urllib
+
+from openstackclient.common import cache
+
+
+LOG = logging.getLogger(__name__)
+
+HTTP_CACHE_DIR_NAME = 'http'
+
+# Number of responses kept in memory by each API
+DEFAULT_MAXSIZE = 128
+
+# Larger responses are not stored on disk
+PERSISTENT_MAX_BYTES = 1024 * 1024
+
+# Requests with other arguments (a body, stream=True, ...) are not cached
+_CACHEABLE_ARGS = frozenset(['params', 'headers'])
+
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_persistent_dir = None
+
+# Incremented for each command so warm processes start with empty caches
+_run = 0
+
+
+def enable_persistent(cache_dir=None):
+    """Store validated responses on disk for later commands
+
+    :param string cache_dir: directory holding the cache files
+    """
+
+    global _persistent_dir
+
+    _persistent_dir = cache_dir or os.path.join(
+        cache.get_cache_dir(),
+        HTTP_CACHE_DIR_NAME,
+    )
+
+
+def disable_persistent():
+    global _persistent_dir
+
+    _persistent_dir = None
+
+
+def get_persistent_dir():
+    """Return the directory of the persistent cache, or None if disabled"""
+
+    return _persistent_dir
+
+
+def start_run():
+    """Discard the responses cached in memory by previous commands"""
+
+    global _run
+
+    _run += 1
+
+
+def get_identity(session):
+    """Return what identifies the user of a session in persistent keys
+
+    :param session: a keystoneauth session
+    :returns: a JSON serializable value, None for a session without
+        authentication, whose responses are the same for every user
+    """
+
+    try:
+        identity = [session.get_user_id(), session.get_project_id()]
+    except (AttributeError, ks_exceptions.MissingAuthPlugin):
+        return None
+    if identity == [None, None]:
+        # A token without scope information, identified by the token
+        token = session.get_token()
+        identity = hashlib.sha256(
+            (token or '').encode('utf-8')).hexdigest()
+    return identity
+
+
+def _url_path(url):
+    return urllib.parse.urlparse(url).path.rstrip('/')
+
+
+class ResponseCache(object):
+    """Cache the GET responses of an API
+
+    :param int maxsize:
+        number of responses kept in memory
+    :param string cache_dir:
+        directory of the persistent cache, defaults to the one set by
+        enable_persistent()
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, cache_dir=None):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._entries = collections.OrderedDict()
+        self._run = _run
+        # Requests may be sent from several threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(method, url, kwargs):
+        """Return the cache key of a request, or None if it is not cached"""
+
+        if method != 'GET' or set(kwargs) - _CACHEABLE_ARGS:
+            return None
+        try:
+            return json.dumps(
+                [
+                    url,
+                    kwargs.get('params') or {},
+                    kwargs.get('headers') or {},
+                ],
+                sort_keys=True,
+            )
+        except (TypeError, ValueError):
+            return None
+
+    def request(self, send, method, url, identity=None, **kwargs):
+        """Send a request through the cache
+
+        :param send: callable taking the method, URL and keyword arguments
+            of the request and returning a requests.Response
+        :param string method: the HTTP method name
+        :param string url: the full URL of the request
+        :param identity: callable returning the identity of the user, see
+            get_identity(); only called if the persistent cache is used
+        :returns: the requests.Response object
+        """
+
+        key = self.make_key(method, url, kwargs)
+        if key is None:
+            if method not in _SAFE_METHODS:
+                self.invalidate(url)
+            return send(method, url, **kwargs)
+
+        with self._lock:
+            if self._run != _run:
+                self._entries.clear()
+                self._run = _run
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                LOG.debug('Using cached response for GET %s', url)
+                self._entries[key] = entry
+                return entry[1]
+
+        persistent_key = self._persistent_key(key, identity)
+        stored = self._load(persistent_key)
+        if stored is not None:
+            headers = dict(kwargs.get('headers') or {})
+            if stored.headers.get('etag'):
+                headers['If-None-Match'] = stored.headers['etag']
+            if stored.headers.get('last-modified'):
+                headers['If-Modified-Since'] = stored.headers['last-modified']
+            kwargs = dict(kwargs, headers=headers)
+
+        response = send(method, url, **kwargs)
+        if stored is not None and response.status_code == 304:
+            LOG.debug('Cached response for GET %s is not modified', url)
+            response = stored
+        elif response.status_code == 200:
+            self._save(persistent_key, url, response)
+        else:
+            return response
+
+        with self._lock:
+            self._entries[key] = (_url_path(url), response)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return response
+
+    def invalidate(self, url):
+        """Drop the responses for a URL's path, its children and parent
+
+        :param string url: the URL of a request changing a resource
+        """
+
+        path = _url_path(url)
+        parent = path.rsplit('/', 1)[0]
+        with self._lock:
+            for key, (entry_path, _response) in list(self._entries.items()):
+                if (
+                        entry_path in (path, parent) or
+                        entry_path.startswith(path + '/')
+                ):
+                    del self._entries[key]
+
+    def _persistent_key(self, key, identity):
+        if not (self.cache_dir or _persistent_dir):
+            return None
+        try:
+            return json.dumps(
+                [identity() if identity else None, key], sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+
+    def _path(self, key):
+        cache_dir = self.cache_dir or _persistent_dir
+        if not cache_dir or key is None:
+            return None
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(cache_dir, name + '.json')
+
+    def _load(self, key):
+        path = self._path(key)
+        if not path:
+            return None
+        data = cache.read_json(path)
+        if not isinstance(data, dict):
+            return None
+        try:
+            response = requests.Response()
+            response.status_code = data['status_code']
+            response.url = data['url']
+            response.headers = structures.CaseInsensitiveDict(
+                data['headers'])
+            response.encoding = requests.utils.get_encoding_from_headers(
+                response.headers)
+            response._content = base64.b64decode(data['content'])
+        except (KeyError, TypeError, ValueError) as e:
+            LOG.debug('Ignoring unusable cached response: %s', e)
+            return None
+        return response
+
+    def _save(self, key, url, response):
+        path = self._path(key)
+        if (
+                not path or
+                not (
+                    response.headers.get('etag') or
+                    response.headers.get('last-modified')
+                ) or
+                len(response.content) > PERSISTENT_MAX_BYTES
+        ):
+            return
+        cache.write_json(path, {
+            'url': url,
+            'status_code': response.status_code,
+            'headers': dict(response.headers),
+            'content': base64.b64encode(response.content).decode('ascii'),
+        })
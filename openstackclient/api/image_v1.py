@@ -21,6 +21,15 @@ class APIv1(api.BaseAPI):
 
     _endpoint_suffix = '/v1'
 
+    SERVER_FILTERS = {
+        'images/detail': (
+            'name',
+            'status',
+            'container_format',
+            'disk_format',
+        ),
+    }
+
     def __init__(self, endpoint=None, **kwargs):
         super(APIv1, self).__init__(endpoint=endpoint, **kwargs)
 
@@ -63,7 +72,7 @@ class APIv1(api.BaseAPI):
             # Because we can't all use /details
             url += "/detail"
 
-        image_list = self.list(url, **filter)['images']
+        image_list = self.list(url, resource='images', **filter)
 
         if public != private:
             # One is True and one is False, so public represents the filter
@@ -21,6 +21,18 @@ class APIv2(image_v1.APIv1):
 
     _endpoint_suffix = '/v2'
 
+    SERVER_FILTERS = {
+        'images': (
+            'name',
+            'status',
+            'visibility',
+            'owner',
+            'member_status',
+            'container_format',
+            'disk_format',
+        ),
+    }
+
     def _munge_url(self):
         # Hack this until discovery is up, and ignore parent endpoint setting
         if not self.endpoint.endswith(self._endpoint_suffix):
@@ -76,4 +88,4 @@ class APIv2(image_v1.APIv1):
             # Because we can't all use /details
             url += "/detail"
 
-        return self.list(url, **filter)['images']
+        return self.list(url, resource='images', **filter)
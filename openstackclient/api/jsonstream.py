@@ -0,0 +1,179 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Incremental decoding of JSON listings
+
+Decodes the items of the resource array of a listing response one at a
+time as the body is read, so only the undecoded remainder of the current
+chunk and the current item are held in memory rather than the whole body,
+its decoded text and the complete document.
+"""
+
+import codecs
+
+import simplejson as json
+
+
+# Bytes read from the response at a time
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader(object):
+    """A JSON text buffer refilled from an iterable of chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def read(self):
+        """Append the next chunk to the buffer
+
+        The consumed part of the buffer is dropped.
+
+        :returns: False at the end of the input
+        """
+
+        while not self.eof:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self.eof = True
+                text = self._text_decoder.decode(b'', True)
+            else:
+                if isinstance(chunk, bytes):
+                    text = self._text_decoder.decode(chunk)
+                else:
+                    text = chunk
+            if text:
+                self.buf = self.buf[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self):
+        """Return the next non-whitespace character, '' at the end"""
+
+        while True:
+            while (
+                self.pos < len(self.buf) and
+                self.buf[self.pos] in _WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.read():
+                return ''
+
+    def expect(self, chars):
+        """Consume the next non-whitespace character, one of chars"""
+
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(
+                'Expecting one of %r' % chars, self.buf, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value"""
+
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.read():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next
+            # chunk
+            if end == len(self.buf) and self.read():
+                continue
+            self.pos = end
+            return value
+
+
+class ItemStream(object):
+    """Iterate over the items of a JSON listing read in chunks
+
+    The body may be an array, or an object wrapping the array under the
+    resource name.  Once iteration is complete the other members of the
+    object, such as pagination links, are available in ``members``.
+
+    :param chunks: iterable of bytes or text, such as
+        ``response.iter_content(CHUNK_SIZE)``
+    :param string resource: name of the member holding the array
+    """
+
+    def __init__(self, chunks, resource=None):
+        self._reader = _Reader(chunks)
+        self.resource = resource
+        self.members = {}
+
+    def __iter__(self):
+        reader = self._reader
+        first = reader.peek()
+        if not first:
+            # An empty body, such as a 204 response
+            return
+        if first == '[':
+            for item in self._iter_array():
+                yield item
+        else:
+            reader.expect('{')
+            if reader.peek() == '}':
+                reader.pos += 1
+            else:
+                while True:
+                    key = reader.value()
+                    reader.expect(':')
+                    if key == self.resource and reader.peek() == '[':
+                        for item in self._iter_array():
+                            yield item
+                    else:
+                        self.members[key] = reader.value()
+                    if reader.expect(',}') == '}':
+                        break
+        if reader.peek():
+            raise json.JSONDecodeError('Extra data', reader.buf, reader.pos)
+
+    def _iter_array(self):
+        reader = self._reader
+        reader.expect('[')
+        if reader.peek() == ']':
+            reader.pos += 1
+            return
+        while True:
+            yield reader.value()
+            if reader.expect(',]') == ']':
+                return
+
+
+def iter_response(response, resource=None):
+    """Return an ItemStream over the body of a streamed response
+
+    :param response: a requests.Response, requested with ``stream=True``
+    :param string resource: name of the member holding the array
+    """
+
+    return ItemStream(
+        response.iter_content(CHUNK_SIZE),
+        resource=resource,
+    )
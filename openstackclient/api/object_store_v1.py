@@ -13,16 +13,142 @@
 
 """Object Store v1 API Library"""
 
+import hashlib
 import io
+import json
 import logging
 import os
 import sys
 
+from keystoneauth1 import exceptions as ks_exceptions
+from osc_lib import exceptions
 from osc_lib import utils
 import six
 from six.moves import urllib
 
 from openstackclient.api import api
+from openstackclient.api import pagination
+from openstackclient.api import utils as api_utils
+from openstackclient.i18n import _
+
+
+LOG = logging.getLogger(__name__)
+
+# Bytes read or written at a time
+_CHUNK_SIZE = 64 * 1024
+
+# Names deleted by a bulk delete request, unless /info says otherwise
+BULK_DELETE_MAX = 10000
+
+# Bulk delete requests sent at once, each one deletes many objects
+_BULK_DELETE_CONCURRENCY = 2
+
+# Object content is saved as stored, so do not ask for it compressed
+_OBJECT_GET_HEADERS = {'Accept-Encoding': 'identity'}
+
+
+def _object_marker(item):
+    """Return the listing marker of an object or, with a delimiter, subdir"""
+
+    return item.get('name', item.get('subdir'))
+
+
+def _strip_etag(etag):
+    return (etag or '').strip('"')
+
+
+def _listing_params(params, **query):
+    """Add the JSON format and the query parameters that are set"""
+
+    params['format'] = 'json'
+    for key, value in query.items():
+        if value:
+            params[key] = value
+    return params
+
+
+def _is_large_object(headers):
+    # The ETag of a large object is not the MD5 of its content
+    return (
+        headers.get('X-Static-Large-Object', '').lower() == 'true' or
+        'X-Object-Manifest' in headers
+    )
+
+
+def _content_range_size(content_range):
+    """Return the total size given by a Content-Range header, or None"""
+
+    try:
+        return int(content_range.rsplit('/', 1)[1])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def _iter_raw(response):
+    """Iterate over a streamed body as stored, ignoring Content-Encoding
+
+    The ETag and the byte ranges of an object stored with a
+    Content-Encoding are those of the encoded bytes.
+    """
+
+    return response.raw.stream(_CHUNK_SIZE, decode_content=False)
+
+
+def _pwrite(fd, data, offset):
+    """Write all of data at offset without moving the file position"""
+
+    while data:
+        if hasattr(os, 'pwrite'):
+            written = os.pwrite(fd, data, offset)
+        else:
+            # Each thread has its own descriptor
+            os.lseek(fd, offset, os.SEEK_SET)
+            written = os.write(fd, data)
+        data = data[written:]
+        offset += written
+
+
+def _check_md5(md5, etag, name):
+    if etag and md5.hexdigest() != etag:
+        raise exceptions.CommandError(
+            _("Object %(object)s was corrupted in transit: MD5 %(md5)s, "
+              "expected ETag %(etag)s") %
+            {'object': name, 'md5': md5.hexdigest(), 'etag': etag}
+        )
+
+
+class _FileSegment(object):
+    """A file-like object reading one segment of a file
+
+    The MD5 of the bytes read is computed as the segment is sent.  The
+    length lets requests send a Content-Length header instead of chunked
+    encoding.
+
+    :param string path: the file name
+    :param int offset: the position of the segment
+    :param int length: the size of the segment
+    """
+
+    def __init__(self, path, offset, length):
+        self._file = io.open(path, 'rb')
+        self._file.seek(offset)
+        self._remaining = length
+        self.length = length
+        self.md5 = hashlib.md5()
+
+    def __len__(self):
+        return self._remaining
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        self.md5.update(data)
+        return data
+
+    def close(self):
+        self._file.close()
 
 
 class APIv1(api.BaseAPI):
@@ -30,6 +156,28 @@ class APIv1(api.BaseAPI):
 
     def __init__(self, **kwargs):
         super(APIv1, self).__init__(**kwargs)
+        self._capabilities = None
+
+    def get_capabilities(self):
+        """Get the capabilities advertised by the cluster's /info
+
+        :returns:
+            dict of the capabilities, empty if /info is disabled
+        """
+
+        if self._capabilities is None:
+            url_parts = urllib.parse.urlparse(self.endpoint)
+            # /info is at the root of the cluster, above /v1/<account>
+            path = url_parts.path.rsplit('/v1', 1)[0]
+            url = urllib.parse.urlunparse(
+                (url_parts.scheme, url_parts.netloc, path + '/info',
+                 '', '', ''))
+            try:
+                self._capabilities = self._request('GET', url).json()
+            except (ks_exceptions.HttpError, ValueError) as e:
+                LOG.debug('Cluster capabilities are not available: %s', e)
+                self._capabilities = {}
+        return self._capabilities
 
     def container_create(
         self,
@@ -79,7 +227,7 @@ class APIv1(api.BaseAPI):
             if True, return a full listing, else returns a max of
             10000 listings
         :param integer limit:
-            query return count limit
+            query return count limit; the page size of a full listing
         :param string marker:
             query marker
         :param string end_marker:
@@ -90,53 +238,146 @@ class APIv1(api.BaseAPI):
             list of container names
         """
 
-        params['format'] = 'json'
-
+        # full_listing is the python-swiftclient name of all_data
+        all_data = params.pop('full_listing', all_data)
         if all_data:
-            data = listing = self.container_list(
+            return list(self.container_iter(
                 limit=limit,
                 marker=marker,
                 end_marker=end_marker,
                 prefix=prefix,
                 **params
-            )
-            while listing:
-                marker = listing[-1]['name']
-                listing = self.container_list(
-                    limit=limit,
-                    marker=marker,
-                    end_marker=end_marker,
-                    prefix=prefix,
-                    **params
-                )
-                if listing:
-                    data.extend(listing)
-            return data
+            ))
+
+        _listing_params(
+            params,
+            limit=limit,
+            marker=marker,
+            end_marker=end_marker,
+            prefix=prefix,
+        )
+        return self.list('', resource='containers', **params)
+
+    def container_iter(
+        self,
+        limit=None,
+        marker=None,
+        end_marker=None,
+        prefix=None,
+        **params
+    ):
+        """Iterate over every container in an account
 
-        if limit:
-            params['limit'] = limit
-        if marker:
-            params['marker'] = marker
-        if end_marker:
-            params['end_marker'] = end_marker
-        if prefix:
-            params['prefix'] = prefix
+        The next page of the listing is fetched in the background while
+        the current one is consumed.
+
+        :param integer limit:
+            the page size
+        :param string marker:
+            query marker
+        :param string end_marker:
+            query end_marker
+        :param string prefix:
+            query prefix
+        :returns:
+            a generator of container dicts
+        """
 
-        return self.list('', **params)
+        _listing_params(
+            params,
+            limit=limit,
+            marker=marker,
+            end_marker=end_marker,
+            prefix=prefix,
+        )
+        return self.paginate('', marker_key='name', **params)
 
     def container_save(
         self,
         container=None,
+        prefix=None,
+        concurrency=api_utils.DEFAULT_CONCURRENCY,
+        skip_identical=False,
     ):
         """Save all the content from a container
 
+        The objects are downloaded concurrently as the pages of the listing
+        arrive.  Each local directory is created once, before the objects
+        it holds are downloaded.
+
         :param string container:
             name of container to save
+        :param string prefix:
+            only save the objects whose name starts with prefix
+        :param integer concurrency:
+            number of objects downloaded at once
+        :param boolean skip_identical:
+            do not download objects already saved, with the same size and
+            MD5 as the listing's
+        :returns:
+            dict with the number of objects ``saved`` and ``skipped``
+        :raises CommandError: once every object was attempted, if some
+            could not be saved
         """
 
-        objects = self.object_list(container=container)
-        for object in objects:
-            self.object_save(container=container, object=object['name'])
+        directories = set([''])
+
+        def objects():
+            for item in self.object_iter(container, prefix=prefix):
+                name = item['name']
+                if name.endswith('/'):
+                    # A pseudo-directory marker
+                    directory = name.rstrip('/')
+                else:
+                    directory = os.path.dirname(name)
+                if directory not in directories:
+                    if not os.path.isdir(directory):
+                        os.makedirs(directory)
+                    directories.add(directory)
+                if not name.endswith('/'):
+                    yield item
+
+        def save(item):
+            name = item['name']
+            if skip_identical and self._is_saved(name, item):
+                return False
+            self.object_save(container=container, object=name)
+            return True
+
+        counts = {'saved': 0, 'skipped': 0}
+        failed = 0
+        for item, result in api_utils.map_concurrently(
+                save, objects(), concurrency=concurrency):
+            try:
+                if result.get():
+                    counts['saved'] += 1
+                else:
+                    counts['skipped'] += 1
+            except Exception as e:
+                failed += 1
+                LOG.error(_("Failed to save object '%(object)s': %(e)s"),
+                          {'object': item['name'], 'e': e})
+        if failed:
+            raise exceptions.CommandError(
+                _("%(failed)s of %(total)s objects failed to save.") %
+                {'failed': failed, 'total': failed + sum(counts.values())}
+            )
+        return counts
+
+    @staticmethod
+    def _is_saved(file, item):
+        """Return True if file has the size and MD5 of a listed object"""
+
+        try:
+            if os.path.getsize(file) != item.get('bytes'):
+                return False
+            md5 = hashlib.md5()
+            with open(file, 'rb') as f:
+                for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                    md5.update(chunk)
+        except (IOError, OSError):
+            return False
+        return md5.hexdigest() == _strip_etag(item.get('hash'))
 
     def container_set(
         self,
@@ -216,15 +457,31 @@ class APIv1(api.BaseAPI):
         container=None,
         object=None,
         name=None,
+        segment_size=None,
+        segment_container=None,
+        concurrency=api_utils.DEFAULT_CONCURRENCY,
     ):
         """Create an object inside a container
 
+        Files larger than segment_size are uploaded as a Static Large
+        Object: the segments are uploaded concurrently to segment_container,
+        each one checked against the ETag returned for it, then the
+        manifest is written to the object.
+
         :param string container:
             name of container to store object
         :param string object:
             local path to object
         :param string name:
             name of object to create
+        :param integer segment_size:
+            size in bytes of the segments of large files, None uploads
+            every file in one request
+        :param string segment_container:
+            name of container to store the segments, defaults to
+            ``<container>_segments``
+        :param integer concurrency:
+            number of segments uploaded at once
         :returns:
             dict of returned headers
         """
@@ -239,12 +496,22 @@ class APIv1(api.BaseAPI):
 
         full_url = "%s/%s" % (urllib.parse.quote(container),
                               urllib.parse.quote(object_name_str))
-        with io.open(object, 'rb') as f:
-            response = self.create(
+        if segment_size and os.path.getsize(object) > segment_size:
+            response = self._object_create_segmented(
                 full_url,
-                method='PUT',
-                data=f,
+                object,
+                object_name_str,
+                segment_size,
+                segment_container or container + '_segments',
+                concurrency,
             )
+        else:
+            with io.open(object, 'rb') as f:
+                response = self.create(
+                    full_url,
+                    method='PUT',
+                    data=f,
+                )
         data = {
             'account': self._find_account_id(),
             'container': container,
@@ -255,6 +522,81 @@ class APIv1(api.BaseAPI):
 
         return data
 
+    def _object_create_segmented(
+        self,
+        full_url,
+        path,
+        object_name,
+        segment_size,
+        segment_container,
+        concurrency,
+    ):
+        """Upload a file as a Static Large Object
+
+        :returns: the response to the manifest upload
+        """
+
+        size = os.path.getsize(path)
+        # Segment names as used by python-swiftclient, unique per upload of
+        # a version of the file
+        prefix = '%s/slo/%s/%d/%d/' % (
+            object_name,
+            os.path.getmtime(path),
+            size,
+            segment_size,
+        )
+        segments = [
+            (prefix + '%08d' % index, offset, min(segment_size, size - offset))
+            for index, offset in enumerate(range(0, size, segment_size))
+        ]
+        LOG.debug(
+            'Uploading %s as %d segments to container %s',
+            object_name, len(segments), segment_container,
+        )
+        self.container_create(container=segment_container)
+
+        def upload(segment):
+            segment_name, offset, length = segment
+            body = _FileSegment(path, offset, length)
+            try:
+                response = self._request(
+                    'PUT',
+                    "%s/%s" % (urllib.parse.quote(segment_container),
+                               urllib.parse.quote(segment_name)),
+                    data=body,
+                )
+            finally:
+                body.close()
+            etag = body.md5.hexdigest()
+            if _strip_etag(response.headers.get('Etag')) != etag:
+                raise exceptions.CommandError(
+                    _("Segment %(segment)s of %(object)s was corrupted in "
+                      "transit: ETag %(etag)s, expected %(md5)s") % {
+                        'segment': segment_name,
+                        'object': object_name,
+                        'etag': response.headers.get('Etag'),
+                        'md5': etag,
+                    }
+                )
+            return {
+                'path': '/%s/%s' % (segment_container, segment_name),
+                'etag': etag,
+                'size_bytes': length,
+            }
+
+        # Raises the error of the first failed segment
+        manifest = [
+            result.get()
+            for _segment, result in api_utils.map_concurrently(
+                upload, segments, concurrency=concurrency)
+        ]
+        return self._request(
+            'PUT',
+            full_url,
+            params={'multipart-manifest': 'put'},
+            data=json.dumps(manifest),
+        )
+
     def object_delete(
         self,
         container=None,
@@ -274,6 +616,124 @@ class APIv1(api.BaseAPI):
         self.delete("%s/%s" % (urllib.parse.quote(container),
                                urllib.parse.quote(object)))
 
+    def object_delete_bulk(
+        self,
+        container,
+        objects,
+    ):
+        """Delete objects of a container with one bulk delete request
+
+        :param string container:
+            name of container that stores the objects
+        :param list objects:
+            names of the objects to delete, no more than the
+            ``max_deletes_per_request`` of the cluster's bulk delete
+        :returns:
+            dict of the bulk delete result, with the ``Number Deleted``,
+            ``Number Not Found``, ``Response Status`` and ``Errors``
+            (a list of ``[name, status]``) keys
+        """
+
+        body = '\n'.join(
+            urllib.parse.quote('/%s/%s' % (container, obj))
+            for obj in objects
+        )
+        response = self._request(
+            'POST',
+            '',
+            params={'bulk-delete': 'true'},
+            headers={
+                'Accept': 'application/json',
+                'Content-Type': 'text/plain',
+            },
+            data=body.encode('utf-8'),
+        )
+        return response.json()
+
+    def object_delete_all(
+        self,
+        container,
+        concurrency=api_utils.DEFAULT_CONCURRENCY,
+    ):
+        """Delete every object of a container
+
+        The objects are deleted as the pages of the listing arrive, with
+        bulk delete requests when the cluster supports them, otherwise
+        with concurrent DELETE requests.
+
+        :param string container:
+            name of container to empty
+        :param integer concurrency:
+            number of objects deleted at once without bulk delete
+        :returns:
+            the number of objects deleted
+        :raises CommandError: once every object was attempted, if some
+            could not be deleted
+        """
+
+        names = (
+            item['name'] for item in self.object_iter(container)
+        )
+        bulk_delete = self.get_capabilities().get('bulk_delete')
+
+        deleted = 0
+        failed = 0
+        if bulk_delete is not None:
+            batch_size = min(
+                bulk_delete.get('max_deletes_per_request', BULK_DELETE_MAX),
+                BULK_DELETE_MAX,
+            )
+            for batch, result in api_utils.map_concurrently(
+                    lambda batch: self.object_delete_bulk(container, batch),
+                    pagination.batches(names, batch_size),
+                    concurrency=min(concurrency, _BULK_DELETE_CONCURRENCY)):
+                try:
+                    data = result.get()
+                except Exception as e:
+                    failed += len(batch)
+                    LOG.error(_("Failed to delete %(count)s objects: %(e)s"),
+                              {'count': len(batch), 'e': e})
+                    continue
+                errors = data.get('Errors') or []
+                for name, status in errors:
+                    LOG.error(_("Failed to delete object '%(object)s': "
+                                "%(e)s"), {'object': name, 'e': status})
+                batch_deleted = (
+                    data.get('Number Deleted', 0) +
+                    data.get('Number Not Found', 0)
+                )
+                deleted += batch_deleted
+                failed += len(batch) - batch_deleted
+                if len(batch) > batch_deleted and not errors:
+                    LOG.error(_("Failed to delete %(count)s objects: "
+                                "%(e)s"),
+                              {'count': len(batch) - batch_deleted,
+                               'e': data.get('Response Status')})
+        else:
+            def delete(name):
+                try:
+                    self.object_delete(container=container, object=name)
+                except ks_exceptions.NotFound:
+                    # Already deleted
+                    pass
+
+            for name, result in api_utils.map_concurrently(
+                    delete, names, concurrency=concurrency):
+                try:
+                    result.get()
+                    deleted += 1
+                except Exception as e:
+                    failed += 1
+                    LOG.error(_("Failed to delete object '%(object)s': "
+                                "%(e)s"), {'object': name, 'e': e})
+
+        if failed:
+            raise exceptions.CommandError(
+                _("%(failed)s of %(total)s objects failed to delete.") %
+                {'failed': failed, 'total': failed + deleted}
+            )
+        return deleted
+
     def object_list(
         self,
         container=None,
@@ -302,91 +762,264 @@ class APIv1(api.BaseAPI):
             query prefix
         :param string delimiter:
             string to delimit the queries on
-        :returns: a tuple of (response headers, a list of objects) The response
-            headers will be a dict and all header names will be lowercase.
+        :returns: a list of objects
         """
 
         if container is None or object is None:
             return None
 
-        params['format'] = 'json'
+        # full_listing is the python-swiftclient name of all_data
+        all_data = params.pop('full_listing', all_data)
         if all_data:
-            data = listing = self.object_list(
-                container=container,
+            return list(self.object_iter(
+                container,
                 limit=limit,
                 marker=marker,
                 end_marker=end_marker,
-                prefix=prefix,
                 delimiter=delimiter,
+                prefix=prefix,
                 **params
-            )
-            while listing:
-                if delimiter:
-                    marker = listing[-1].get('name', listing[-1].get('subdir'))
-                else:
-                    marker = listing[-1]['name']
-                listing = self.object_list(
-                    container=container,
-                    limit=limit,
-                    marker=marker,
-                    end_marker=end_marker,
-                    prefix=prefix,
-                    delimiter=delimiter,
-                    **params
-                )
-                if listing:
-                    data.extend(listing)
-            return data
-
-        if limit:
-            params['limit'] = limit
-        if marker:
-            params['marker'] = marker
-        if end_marker:
-            params['end_marker'] = end_marker
-        if prefix:
-            params['prefix'] = prefix
-        if delimiter:
-            params['delimiter'] = delimiter
-
-        return self.list(urllib.parse.quote(container), **params)
+            ))
+
+        _listing_params(
+            params,
+            limit=limit,
+            marker=marker,
+            end_marker=end_marker,
+            prefix=prefix,
+            delimiter=delimiter,
+        )
+        return self.list(
+            urllib.parse.quote(container),
+            resource='objects',
+            **params
+        )
+
+    def object_iter(
+        self,
+        container,
+        limit=None,
+        marker=None,
+        end_marker=None,
+        delimiter=None,
+        prefix=None,
+        **params
+    ):
+        """Iterate over every object in a container
+
+        The next page of the listing is fetched in the background while
+        the current one is consumed.
+
+        :param string container:
+            container name to get a listing for
+        :param integer limit:
+            the page size
+        :param string marker:
+            query marker
+        :param string end_marker:
+            query end_marker
+        :param string prefix:
+            query prefix
+        :param string delimiter:
+            string to delimit the queries on
+        :returns:
+            a generator of object dicts, and of subdir dicts with a
+            delimiter
+        """
+
+        _listing_params(
+            params,
+            limit=limit,
+            marker=marker,
+            end_marker=end_marker,
+            prefix=prefix,
+            delimiter=delimiter,
+        )
+        return self.paginate(
+            urllib.parse.quote(container),
+            marker_key=_object_marker,
+            **params
+        )
 
     def object_save(
         self,
         container=None,
         object=None,
         file=None,
+        range_size=None,
+        concurrency=api_utils.DEFAULT_CONCURRENCY,
     ):
         """Save an object stored in a container
 
+        With a range size, the object is requested as a first byte range
+        of that size; the rest of a larger object is downloaded as byte
+        ranges fetched concurrently and written in place into the file.
+        The content is checked against the object's ETag, unless it is a
+        large object.
+
         :param string container:
             name of container that stores object
         :param string object:
             name of object to save
         :param string file:
             local name of object
+        :param integer range_size:
+            size in bytes of the ranges of large objects, None downloads
+            every object in one request
+        :param integer concurrency:
+            number of ranges downloaded at once
         """
 
         if not file:
             file = object
 
+        url = "%s/%s" % (urllib.parse.quote(container),
+                         urllib.parse.quote(object))
+        if range_size and file != '-':
+            self._make_parent_dir(file)
+            self._object_save_ranged(
+                url, object, file, range_size, concurrency)
+            return
+
         response = self._request(
             'GET',
-            "%s/%s" % (urllib.parse.quote(container),
-                       urllib.parse.quote(object)),
+            url,
+            headers=dict(_OBJECT_GET_HEADERS),
             stream=True,
         )
         if response.status_code == 200:
             if file == '-':
-                for chunk in response.iter_content(64 * 1024):
+                for chunk in response.iter_content(_CHUNK_SIZE):
                     sys.stdout.write(chunk)
             else:
-                if not os.path.exists(os.path.dirname(file)):
-                    if len(os.path.dirname(file)) > 0:
-                        os.makedirs(os.path.dirname(file))
-                with open(file, 'wb') as f:
-                    for chunk in response.iter_content(64 * 1024):
-                        f.write(chunk)
+                self._make_parent_dir(file)
+                self._write_object(response, object, file)
+
+    @staticmethod
+    def _write_object(response, object_name, file):
+        """Write the whole content of an object, checking its MD5"""
+
+        md5 = hashlib.md5()
+        with open(file, 'wb') as f:
+            for chunk in _iter_raw(response):
+                md5.update(chunk)
+                f.write(chunk)
+        if not _is_large_object(response.headers):
+            _check_md5(
+                md5, _strip_etag(response.headers.get('Etag')), object_name)
+
+    @staticmethod
+    def _make_parent_dir(file):
+        if not os.path.exists(os.path.dirname(file)):
+            if len(os.path.dirname(file)) > 0:
+                os.makedirs(os.path.dirname(file))
+
+    def _object_save_ranged(
+        self,
+        url,
+        object_name,
+        file,
+        range_size,
+        concurrency,
+    ):
+        """Download an object as concurrent byte ranges
+
+        The response to the first range gives the size of the object, the
+        other ranges are only requested if it is larger than range_size.
+        """
+
+        headers = dict(_OBJECT_GET_HEADERS)
+        headers['Range'] = 'bytes=0-%d' % (range_size - 1)
+        try:
+            first = self._request(
+                'GET',
+                url,
+                headers=headers,
+                stream=True,
+            )
+        except ks_exceptions.RequestedRangeNotSatisfiable:
+            # An empty object has no byte range
+            first = self._request(
+                'GET',
+                url,
+                headers=dict(_OBJECT_GET_HEADERS),
+                stream=True,
+            )
+        size = _content_range_size(first.headers.get('Content-Range'))
+        if first.status_code != 206 or size is None or size <= range_size:
+            # The response has the whole object
+            self._write_object(first, object_name, file)
+            return
+
+        headers = first.headers
+        etag = _strip_etag(headers.get('Etag'))
+        ranges = [
+            (offset, min(offset + range_size, size) - 1)
+            for offset in range(0, size, range_size)
+        ]
+        LOG.debug('Downloading %s as %d ranges', object_name, len(ranges))
+
+        # Preallocate the file, each range is written in place
+        fd = os.open(file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            os.ftruncate(fd, size)
+
+            def download(byte_range):
+                start, end = byte_range
+                if start == 0:
+                    response = first
+                else:
+                    range_headers = dict(_OBJECT_GET_HEADERS)
+                    range_headers['Range'] = 'bytes=%d-%d' % (start, end)
+                    if etag:
+                        # Fail rather than mix versions of a changed object
+                        range_headers['If-Match'] = etag
+                    response = self._request(
+                        'GET', url, headers=range_headers, stream=True)
+                if response.status_code != 206:
+                    response.close()
+                    raise exceptions.CommandError(
+                        _("Range requests are not supported for %s") %
+                        object_name
+                    )
+                range_fd = os.open(file, os.O_WRONLY)
+                offset = start
+                try:
+                    for chunk in _iter_raw(response):
+                        _pwrite(range_fd, chunk, offset)
+                        offset += len(chunk)
+                finally:
+                    os.close(range_fd)
+                if offset != end + 1:
+                    raise exceptions.CommandError(
+                        _("Incomplete range %(start)d-%(end)d of "
+                          "%(object)s") %
+                        {'start': start, 'end': end, 'object': object_name}
+                    )
+
+            verify = etag and not _is_large_object(headers)
+            md5 = hashlib.md5()
+            # The ranges complete in order, each one is added to the MD5
+            # while the next ones download
+            for (start, end), result in api_utils.map_concurrently(
+                    download, ranges, concurrency=concurrency):
+                result.get()
+                if verify:
+                    os.lseek(fd, start, os.SEEK_SET)
+                    remaining = end + 1 - start
+                    while remaining:
+                        chunk = os.read(fd, min(_CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        md5.update(chunk)
+                        remaining -= len(chunk)
+            if verify:
+                _check_md5(md5, etag, object_name)
+        except Exception:
+            os.close(fd)
+            os.remove(file)
+            raise
+        os.close(fd)
 
     def object_set(
         self,
@@ -0,0 +1,181 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Paginated listing helpers
+
+A listing is described by a ``fetch_page(state)`` callable returning the
+items of one page and the state needed to fetch the next one, or None
+after the last page.  The items are yielded as they arrive while the next
+page is fetched in a background thread.
+"""
+
+import operator
+import sys
+import threading
+
+import six
+from six.moves import queue
+
+
+# Number of pages fetched ahead of the consumer
+PREFETCH_PAGES = 1
+
+# Items handed over at once by a streamed listing, and number of such
+# batches decoded ahead of the consumer
+BATCH_SIZE = 100
+PREFETCH_BATCHES = 10
+
+# Seconds between checks for an abandoned iteration
+_POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+def prefetch(iterable, depth=PREFETCH_PAGES):
+    """Iterate in a background thread, staying up to depth items ahead
+
+    Exceptions raised by the iterable are re-raised in the consumer.  The
+    background thread stops when the returned generator is closed or
+    garbage collected.
+
+    :param iterable: the iterable to consume in the background
+    :param int depth: number of items to fetch ahead, 0 disables
+        prefetching
+    """
+
+    if depth < 1:
+        for item in iterable:
+            yield item
+        return
+
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(value):
+        while not stop.is_set():
+            try:
+                items.put(value, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception:
+            put((_DONE, sys.exc_info()))
+        else:
+            put((_DONE, None))
+
+    thread = threading.Thread(target=produce)
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            item, exc_info = items.get()
+            if item is _DONE:
+                if exc_info:
+                    six.reraise(*exc_info)
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def batches(items, size=BATCH_SIZE):
+    """Split an iterable into lists of up to size items"""
+
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_pages(fetch_page, state=None):
+    """Yield the non-empty pages of a listing
+
+    :param fetch_page: callable taking the state of a page and returning
+        ``(items, next_state)``; ``next_state`` is None after the last page
+    :param state: the state of the first page
+    """
+
+    while True:
+        items, state = fetch_page(state)
+        if items:
+            yield items
+        if state is None:
+            return
+
+
+def iter_items(fetch_page, state=None, prefetch_pages=PREFETCH_PAGES):
+    """Yield the items of every page, prefetching the following pages
+
+    :param fetch_page: see iter_pages()
+    :param state: the state of the first page
+    :param int prefetch_pages: number of pages to fetch ahead
+    """
+
+    for page in prefetch(iter_pages(fetch_page, state), prefetch_pages):
+        for item in page:
+            yield item
+
+
+def marker_fetcher(list_page, marker_key='id'):
+    """Build a fetch_page() for a marker-paginated listing
+
+    The listing ends with the first empty page.
+
+    :param list_page: callable taking a marker (None for the first page)
+        and returning the list of items after it
+    :param marker_key: name of the item attribute to use as the marker for
+        the next page, or a callable returning the marker for an item
+    """
+
+    if not callable(marker_key):
+        marker_key = operator.itemgetter(marker_key)
+
+    def fetch_page(marker):
+        items = list_page(marker)
+        if not items:
+            return items, None
+        next_marker = marker_key(items[-1])
+        if next_marker == marker:
+            # The server ignored the marker, do not loop forever
+            return items, None
+        return items, next_marker
+
+    return fetch_page
+
+
+def paginate(list_page, marker=None, marker_key='id',
+             prefetch_pages=PREFETCH_PAGES):
+    """Yield every item of a marker-paginated listing
+
+    :param list_page: see marker_fetcher()
+    :param marker: marker of the first page
+    :param marker_key: see marker_fetcher()
+    :param int prefetch_pages: number of pages to fetch ahead
+    """
+
+    return iter_items(
+        marker_fetcher(list_page, marker_key),
+        state=marker,
+        prefetch_pages=prefetch_pages,
+    )
@@ -0,0 +1,291 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Retry and rate limiting of HTTP requests
+
+Requests rejected with ``429 Too Many Requests``, or failed with a
+transient error (a connection failure or a 502, 503 or 504 status) when
+the method is idempotent, are sent again after an exponentially growing,
+randomized delay or the delay given by the server's ``Retry-After``
+header, until the retries or the maximum total time are exhausted.  An
+optional token bucket limits the rate of requests sent by all of the
+threads using the policy.
+"""
+
+from email import utils as email_utils
+import logging
+import random
+import threading
+import time
+
+from osc_lib import exceptions
+import requests
+
+from openstackclient.i18n import _
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 3
+
+# Seconds
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30
+DEFAULT_MAX_TIME = 60
+
+# 429 means the request was not processed, so it is retried for any method
+RATE_LIMITED = 429
+RETRY_STATUSES = frozenset([RATE_LIMITED, 502, 503, 504])
+
+IDEMPOTENT_METHODS = frozenset(
+    ['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'])
+
+_default_policy = None
+
+
+def parse_retry_after(value, now=None):
+    """Return the seconds to wait given by a Retry-After header, or None
+
+    :param string value: delay in seconds or an HTTP date
+    :param float now: the current time, defaults to time.time()
+    """
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email_utils.parsedate_tz(value)
+        if date is None:
+            return None
+        when = email_utils.mktime_tz(date)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if now is None:
+        now = time.time()
+    return max(0.0, when - now)
+
+
+class TokenBucket(object):
+    """Limit the rate of an operation, allowing short bursts
+
+    :param float rate: operations per second
+    :param float burst: operations allowed at once, defaults to one
+        second's worth
+    """
+
+    def __init__(self, rate, burst=None, clock=time.time, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive, not %r" % rate)
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst or rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait for and take a token
+
+        :returns: the number of seconds waited
+        """
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._last) * self.rate,
+                )
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+
+class RetryPolicy(object):
+    """When and how long to wait before sending a request again
+
+    :param int max_retries: retries after the first attempt, 0 disables
+        retrying
+    :param float backoff: base delay in seconds, doubled for each retry
+    :param float max_backoff: longest delay between attempts, unless the
+        server asks for more with Retry-After
+    :param float max_time: seconds after the first attempt after which
+        no more attempts are made
+    :param float rate_limit: requests per second allowed by the token
+        bucket, None does not limit the rate
+    """
+
+    def __init__(
+        self,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff=DEFAULT_BACKOFF,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        max_time=DEFAULT_MAX_TIME,
+        rate_limit=None,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_time = max_time
+        self.bucket = None
+        if rate_limit:
+            self.bucket = TokenBucket(rate_limit, clock=clock, sleep=sleep)
+        self._clock = clock
+        self._sleep = sleep
+        self._random = random.Random()
+
+    def is_retryable(self, method, status_code):
+        """Return True if a response with status_code may be retried"""
+
+        if status_code == RATE_LIMITED:
+            return True
+        return (
+            status_code in RETRY_STATUSES and
+            method.upper() in IDEMPOTENT_METHODS
+        )
+
+    def get_delay(self, attempt, response=None):
+        """Return the seconds to wait before retry number attempt + 1
+
+        The delay is the server's Retry-After, or a random delay up to the
+        exponential backoff ("full jitter") so that clients backing off at
+        the same time do not retry at the same time.
+        """
+
+        if response is not None:
+            delay = parse_retry_after(
+                response.headers.get('Retry-After'),
+                now=self._clock(),
+            )
+            if delay is not None:
+                return delay
+        cap = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return self._random.uniform(0, cap)
+
+    def _wait(self, attempt, start, method, url, reason, response=None):
+        """Sleep before the next attempt, return False to give up"""
+
+        if attempt >= self.max_retries:
+            return False
+        delay = self.get_delay(attempt, response)
+        if self._clock() + delay - start > self.max_time:
+            LOG.debug(
+                'Not retrying %s %s after %s, the %ss limit would be exceeded',
+                method, url, reason, self.max_time,
+            )
+            return False
+        LOG.debug(
+            'Retrying %s %s in %.2fs after %s (retry %d of %d)',
+            method, url, delay, reason, attempt + 1, self.max_retries,
+        )
+        self._sleep(delay)
+        return True
+
+    def run(self, method, url, send, replayable=True):
+        """Send a request, retrying it as allowed by the policy
+
+        :param string method: the HTTP method name
+        :param string url: the URL, for logging
+        :param send: callable sending the request and returning a
+            requests.Response
+        :param bool replayable: False if the request body can only be
+            sent once, such as a file being uploaded
+        :returns: the last response
+        """
+
+        start = self._clock()
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                response = send()
+            except requests.exceptions.ConnectionError as e:
+                if not (
+                        replayable and
+                        method.upper() in IDEMPOTENT_METHODS and
+                        self._wait(attempt, start, method, url, e)
+                ):
+                    raise
+            else:
+                if not (
+                        replayable and
+                        self.is_retryable(method, response.status_code) and
+                        self._wait(
+                            attempt, start, method, url,
+                            response.status_code, response,
+                        )
+                ):
+                    return response
+                # Return the connection to the pool
+                response.close()
+            attempt += 1
+
+
+def _setting(config, name, convert, default):
+    value = config.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        value = convert(value)
+    except (TypeError, ValueError):
+        value = -1
+    if value < 0:
+        raise exceptions.CommandError(
+            _("%(name)s must be a non-negative number, not %(value)r") %
+            {'name': name, 'value': config.get(name)}
+        )
+    return value
+
+
+def policy_from_config(config):
+    """Build a RetryPolicy from the cloud configuration
+
+    :param dict config: the ``http_retries``, ``http_retry_max_time`` and
+        ``http_rate_limit`` settings are used
+    :raises CommandError: for a negative or non-numeric setting
+    """
+
+    return RetryPolicy(
+        max_retries=_setting(
+            config, 'http_retries', int, DEFAULT_MAX_RETRIES),
+        max_time=_setting(
+            config, 'http_retry_max_time', float, DEFAULT_MAX_TIME),
+        rate_limit=_setting(config, 'http_rate_limit', float, None),
+    )
+
+
+def get_default_policy():
+    """Return the policy used by sessions that were not configured"""
+
+    global _default_policy
+
+    if _default_policy is None:
+        _default_policy = RetryPolicy()
+    return _default_policy
+
+
+def set_default_policy(policy):
+    global _default_policy
+
+    _default_policy = policy
@@ -13,6 +13,142 @@
 
 """API Utilities Library"""
 
+import collections
+import json
+import operator
+import re
+import sys
+import threading
+import weakref
+
+from oslo_utils import uuidutils
+import six
+from six.moves import queue
+
+
+_MISSING = object()
+
+_COMPARISONS = {
+    'lt': operator.lt,
+    'le': operator.le,
+    'gt': operator.gt,
+    'ge': operator.ge,
+}
+
+FILTER_OPS = ('eq', 'prefix', 'regex') + tuple(sorted(_COMPARISONS))
+
+# Number of listing indexes kept by a ListIndexCache
+DEFAULT_INDEX_MAXSIZE = 128
+
+# Number of calls run at once by map_concurrently()
+DEFAULT_CONCURRENCY = 10
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _compile_predicate(attr, op, value, property_field):
+    """Return a function matching items on a single attribute"""
+
+    def get(item):
+        if attr in item:
+            return item[attr]
+        if property_field:
+            properties = item.get(property_field)
+            if isinstance(properties, dict):
+                return properties.get(attr, _MISSING)
+        return _MISSING
+
+    if op == 'eq':
+        def match(item):
+            found = get(item)
+            return found is not _MISSING and found == value
+    elif op == 'prefix':
+        def match(item):
+            found = get(item)
+            return (
+                isinstance(found, six.string_types) and
+                found.startswith(value)
+            )
+    elif op == 'regex':
+        search = re.compile(value).search
+
+        def match(item):
+            found = get(item)
+            return (
+                isinstance(found, six.string_types) and
+                search(found) is not None
+            )
+    elif op in _COMPARISONS:
+        compare = _COMPARISONS[op]
+        bound = _number(value)
+        if bound is None:
+            raise ValueError(
+                "%s filter on %s needs a number, not %r" % (op, attr, value))
+
+        def match(item):
+            found = _number(get(item))
+            return found is not None and compare(found, bound)
+    else:
+        raise ValueError("Unknown filter operator %r" % op)
+    return match
+
+
+def compile_filter(filters, property_field=None):
+    """Compile filters into a single function matching an item
+
+    :param dict filters:
+        The attributes to match, logical AND.  A value is matched exactly;
+        an ``(op, value)`` tuple selects another operator from FILTER_OPS:
+        ``prefix``, ``regex`` (searched anywhere in the value) or a numeric
+        comparison ``lt``, ``le``, ``gt`` or ``ge``.  A value of None is
+        not a filter.
+    :param string property_field:
+        The name of the item field containing a property dict, searched
+        for attributes that are not item fields.
+    :returns:
+        a function taking an item dict and returning True if it matches
+    :raises ValueError:
+        for an unknown operator or a comparison with a non-numeric value
+    """
+
+    predicates = []
+    for attr, spec in filters.items():
+        if isinstance(spec, tuple):
+            op, value = spec
+        else:
+            op, value = 'eq', spec
+        if value is None:
+            continue
+        predicates.append(
+            _compile_predicate(attr, op, value, property_field))
+
+    if not predicates:
+        return lambda item: True
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda item: all(match(item) for match in predicates)
+
+
+def filter_items(data, filters, property_field=None):
+    """Lazily filter an iterable of dicts
+
+    The input is neither copied nor modified, items are matched as they
+    are consumed.
+
+    :param data: an iterable of item dicts, such as a list or generator
+    :param dict filters: see compile_filter()
+    :param string property_field: see compile_filter()
+    :returns: an iterator over the matching items
+    """
+
+    match = compile_filter(filters, property_field=property_field)
+    return (item for item in data if match(item))
+
 
 def simple_filter(
     data=None,
@@ -47,38 +183,272 @@ def simple_filter(
     matching ``attr`` then does an exact-match on the ``value``.  If
     ``property_field`` is given, it will look inside that field (if it
     exists and is a dict) for a matching ``value``.
+
+    New code should use filter_items(), which does not modify the list.
     """
 
     # Take the do-nothing case shortcut
     if not data or not attr or value is None:
         return data
 
-    # NOTE:(dtroyer): This filter modifies the provided list in-place using
-    # list.remove() so we need to start at the end so the loop pointer does
-    # not skip any items after a deletion.
-    for d in reversed(data):
-        if attr in d:
-            # Searching data fields
-            search_value = d[attr]
-        elif (property_field and property_field in d and
-                isinstance(d[property_field], dict)):
-            # Searching a properties field - do this separately because
-            # we don't want to fail over to checking the fields if a
-            # property name is given.
-            if attr in d[property_field]:
-                search_value = d[property_field][attr]
-            else:
-                search_value = None
-        else:
-            search_value = None
+    data[:] = filter_items(data, {attr: value}, property_field)
+    return data
+
+
+def is_id_like(value):
+    """Return True if a name-or-ID value is probably an ID
+
+    UUIDs and integers are taken to be IDs; resource names rarely have
+    either form.
+
+    :param value: the value given to a find() method
+    """
+
+    if isinstance(value, six.integer_types):
+        return True
+    if not isinstance(value, six.string_types):
+        return False
+    return value.isdigit() or uuidutils.is_uuid_like(value)
+
+
+class CallResult(object):
+    """The outcome of a function run by call_concurrently()"""
+
+    def __init__(self):
+        self.value = None
+        self.exc_info = None
+
+    def get(self):
+        """Return the function's return value or raise its exception"""
+
+        if self.exc_info is not None:
+            six.reraise(*self.exc_info)
+        return self.value
+
 
-        # could do regex here someday...
-        if not search_value or search_value != value:
-            # remove from list
+def call_concurrently(*funcs):
+    """Run functions concurrently, one per thread
+
+    The first function runs in the calling thread.  Exceptions are only
+    raised when a result is read, so callers can ignore the failures of
+    calls whose results they end up not needing.
+
+    :param funcs: callables taking no arguments
+    :returns: a CallResult for each function, in order
+    """
+
+    results = [CallResult() for _func in funcs]
+
+    def run(func, result):
+        try:
+            result.value = func()
+        except Exception:
+            result.exc_info = sys.exc_info()
+
+    threads = []
+    for func, result in zip(funcs[1:], results[1:]):
+        thread = threading.Thread(target=run, args=(func, result))
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    if funcs:
+        run(funcs[0], results[0])
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _call(func, item, result):
+    try:
+        result.value = func(item)
+    except Exception:
+        result.exc_info = sys.exc_info()
+
+
+def map_concurrently(func, items, concurrency=DEFAULT_CONCURRENCY):
+    """Call a function for each item with a bounded pool of threads
+
+    Items are taken from the iterable as the calls progress, so it may be a
+    generator such as a paginated listing; no more than twice concurrency
+    results are held waiting for an earlier, slower call.  As with
+    call_concurrently(), exceptions are only raised when a result is read,
+    so one failure does not stop the other calls.  Calls not started when
+    the returned generator is closed are skipped.
+
+    :param func: callable taking an item
+    :param items: iterable of the items
+    :param int concurrency: number of calls run at once, 1 runs them in
+        the calling thread
+    :returns: an iterator of ``(item, CallResult)`` tuples, in the order of
+        the items
+    """
+
+    if concurrency <= 1:
+        for item in items:
+            result = CallResult()
+            _call(func, item, result)
+            yield item, result
+        return
+
+    tasks = queue.Queue()
+    stop = threading.Event()
+
+    def work():
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            item, result, done = task
+            if not stop.is_set():
+                _call(func, item, result)
+            done.set()
+
+    threads = []
+    for _i in range(concurrency):
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+
+    pending = collections.deque()
+    try:
+        for item in items:
+            task = (item, CallResult(), threading.Event())
+            tasks.put(task)
+            pending.append(task)
+            while len(pending) >= 2 * concurrency:
+                item, result, done = pending.popleft()
+                done.wait()
+                yield item, result
+        while pending:
+            item, result, done = pending.popleft()
+            done.wait()
+            yield item, result
+    finally:
+        stop.set()
+        for _thread in threads:
+            tasks.put(None)
+
+
+def server_filters(capabilities, path, filters):
+    """Return the filters the API applies itself when listing path
+
+    :param dict capabilities:
+        the query parameters accepted by each listing path, such as
+        ``{'images': ('name', 'status')}``
+    :param string path:
+        The API-specific portion of the URL path
+    :param dict filters:
+        the attributes to match
+    :returns: dict of query parameters
+    """
+
+    accepted = capabilities.get(path.strip('/'), ())
+    return dict((k, v) for k, v in filters.items() if k in accepted)
+
+
+class ListIndex(object):
+    """Hash index of a listing, built for each attribute on first use
+
+    :param list items: the resource dicts of a listing
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self._indexes = {}
+
+    def _index(self, attr):
+        """Return the index of attr, or None if its values are unhashable"""
+
+        if attr not in self._indexes:
+            index = {}
             try:
-                data.remove(d)
-            except ValueError:
-                # it's already gone!
-                pass
+                for o in self.items:
+                    if attr in o:
+                        index.setdefault(o[attr], []).append(o)
+            except TypeError:
+                index = None
+            self._indexes[attr] = index
+        return self._indexes[attr]
 
-    return data
+    def find(self, **kwargs):
+        """Return the items matching all of kwargs, in listing order"""
+
+        candidates = self.items
+        for attr, value in kwargs.items():
+            index = self._index(attr)
+            if index is None:
+                continue
+            try:
+                candidates = index.get(value, [])
+            except TypeError:
+                # An unhashable value can not be looked up
+                continue
+            break
+
+        ret = []
+        for o in candidates:
+            try:
+                if all(o[attr] == kwargs[attr] for attr in kwargs.keys()):
+                    ret.append(o)
+            except KeyError:
+                continue
+        return ret
+
+
+class ListIndexCache(object):
+    """The ListIndex of each listing of an API
+
+    An index is reused for as long as the API's response cache returns
+    the same response to the listing request, that is within a command and
+    until the collection is changed.  The responses are not kept alive by
+    the indexes, and only the maxsize most recently used indexes are kept.
+
+    :param int maxsize: number of indexes kept, the size of the response
+        cache is enough
+    """
+
+    def __init__(self, maxsize=DEFAULT_INDEX_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, params, response, items=None):
+        """Return the index of a listing response
+
+        :param string path:
+            The API-specific portion of the URL path
+        :param dict params:
+            the query parameters of the listing
+        :param response:
+            the requests.Response of the listing
+        :param items:
+            function returning the items to index from the decoded
+            response body, by default the list it wraps; the indexes of
+            each function are kept apart
+        :returns: a ListIndex
+        """
+
+        key = json.dumps(
+            [path, params, getattr(items, '__name__', None)],
+            sort_keys=True,
+        )
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[0]() is response:
+                self._entries[key] = entry
+                return entry[1]
+
+        body = response.json()
+        if items is not None:
+            body = items(body)
+        elif isinstance(body, dict):
+            # strip off the enclosing dict
+            wrapper = list(body.keys())[0]
+            body = body[wrapper]
+        index = ListIndex(body)
+        with self._lock:
+            self._entries[key] = (weakref.ref(response), index)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return index
@@ -0,0 +1,132 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Cross-invocation cache of authentication state
+
+Stores the keystoneauth plugin's auth state (the token and the service
+catalog) in a file only readable by its owner so that later commands
+using the same credentials can skip authenticating against Identity.
+"""
+
+import hashlib
+import logging
+import os
+
+from openstackclient.common import cache
+
+
+LOG = logging.getLogger(__name__)
+
+AUTH_CACHE_DIR_NAME = 'auth'
+
+# Do not reuse a cached token that expires within this many seconds
+DEFAULT_EXPIRY_MARGIN = 300
+
+
+class AuthCache(object):
+    """Load and store the auth state of a keystoneauth plugin
+
+    :param auth:
+        a keystoneauth identity plugin; plugins that do not support
+        ``get_cache_id()`` (such as token_endpoint) are never cached
+    :param string cache_dir:
+        directory holding the cache files
+    :param int expiry_margin:
+        seconds of remaining token life required to reuse a cached token
+    """
+
+    def __init__(self, auth, cache_dir=None, expiry_margin=None):
+        self.auth = auth
+        self.cache_dir = cache_dir or os.path.join(
+            cache.get_cache_dir(),
+            AUTH_CACHE_DIR_NAME,
+        )
+        if expiry_margin is None:
+            expiry_margin = DEFAULT_EXPIRY_MARGIN
+        self.expiry_margin = expiry_margin
+        self._state = None
+
+    @property
+    def path(self):
+        """The cache file for the plugin, or None if it can not be cached"""
+
+        get_cache_id = getattr(self.auth, 'get_cache_id', None)
+        cache_id = get_cache_id() if get_cache_id else None
+        if not cache_id:
+            return None
+        # The cache id is already a hash of the auth parameters, hash it
+        # again so the file name has a fixed, filesystem-safe form
+        name = hashlib.sha256(cache_id.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name + '.json')
+
+    def load(self):
+        """Restore a cached auth state into the plugin
+
+        :returns: True if a valid, unexpired state was restored
+        """
+
+        path = self.path
+        if not path:
+            return False
+        data = cache.read_json(path)
+        if not isinstance(data, dict) or not data.get('state'):
+            return False
+
+        try:
+            self.auth.set_auth_state(data['state'])
+        except Exception as e:
+            LOG.debug('Ignoring unusable cached auth state: %s', e)
+            self.invalidate()
+            return False
+
+        auth_ref = getattr(self.auth, 'auth_ref', None)
+        if (
+                auth_ref is None or
+                auth_ref.will_expire_soon(self.expiry_margin)
+        ):
+            LOG.debug('Cached token is expired or about to expire')
+            self.auth.invalidate()
+            self.invalidate()
+            return False
+
+        LOG.debug('Using cached auth state from %s', path)
+        self._state = data['state']
+        return True
+
+    def save(self):
+        """Store the plugin's current auth state if it has changed"""
+
+        path = self.path
+        if not path:
+            return
+        try:
+            state = self.auth.get_auth_state()
+        except Exception as e:
+            LOG.debug('Unable to get auth state: %s', e)
+            return
+        if not state or state == self._state:
+            return
+        if cache.write_json(path, {'state': state}):
+            self._state = state
+
+    def invalidate(self):
+        """Remove the cached state, for example after a 401 response"""
+
+        self._state = None
+        path = self.path
+        if not path:
+            return
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,172 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Batch action implementation"""
+
+import io
+import json
+import logging
+import shlex
+import sys
+
+from cliff import display
+from osc_lib.command import command
+from osc_lib import exceptions
+import six
+
+from openstackclient.i18n import _
+
+
+class _ErrorCollector(logging.Handler):
+    """Collect the error messages logged while a command runs"""
+
+    def __init__(self):
+        super(_ErrorCollector, self).__init__(logging.ERROR)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _parse_line(line):
+    """Split a batch line into argv, or None for blank and comment lines"""
+
+    argv = shlex.split(line, comments=True)
+    # Allow copying command lines including the program name
+    if argv and argv[0] == 'openstack':
+        argv = argv[1:]
+    return argv or None
+
+
+class RunBatch(command.Command):
+    _description = _("Run a batch of commands using a single session")
+
+    auth_required = False
+
+    def get_parser(self, prog_name):
+        parser = super(RunBatch, self).get_parser(prog_name)
+        parser.add_argument(
+            '--file',
+            metavar='<file>',
+            default='-',
+            help=_("Read commands from <file>, one per line "
+                   "(default: read from stdin)"),
+        )
+        parser.add_argument(
+            '--stop-on-error',
+            action='store_true',
+            default=False,
+            help=_("Stop at the first command that fails "
+                   "(default: run all commands)"),
+        )
+        return parser
+
+    def _format_args(self, argv):
+        """Ask display commands for JSON output unless a format is given"""
+
+        try:
+            cmd_factory, _name, _args = \
+                self.app.command_manager.find_command(argv)
+        except ValueError:
+            return argv
+        if not issubclass(cmd_factory, display.DisplayCommandBase):
+            return argv
+        for arg in argv:
+            if arg in ('-f', '--format') or arg.startswith('--format='):
+                return argv
+        return argv + ['-f', 'json']
+
+    def run_line(self, argv):
+        """Run one command, capturing its output and errors
+
+        :returns: a (status, output, errors) tuple
+        """
+
+        argv = self._format_args(argv)
+
+        stdout = six.StringIO()
+        stderr = six.StringIO()
+        collector = _ErrorCollector()
+        root_logger = logging.getLogger('')
+        saved = (self.app.stdout, self.app.stderr, sys.stderr)
+        self.app.stdout = stdout
+        self.app.stderr = sys.stderr = stderr
+        root_logger.addHandler(collector)
+        try:
+            status = self.app.run_subcommand(argv)
+        except SystemExit as e:
+            # argparse exits on invalid command arguments
+            status = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            status = 1
+            collector.messages.append(six.text_type(e))
+        finally:
+            root_logger.removeHandler(collector)
+            self.app.stdout, self.app.stderr, sys.stderr = saved
+
+        output = stdout.getvalue()
+        try:
+            output = json.loads(output)
+        except ValueError:
+            pass
+
+        errors = collector.messages
+        if stderr.getvalue():
+            errors.append(stderr.getvalue().strip())
+
+        return status, output, errors
+
+    def take_action(self, parsed_args):
+        if parsed_args.file == '-':
+            lines = self.app.stdin
+        else:
+            try:
+                lines = io.open(parsed_args.file, 'r')
+            except (IOError, OSError) as e:
+                msg = _("Unable to read batch file %(file)s: %(error)s")
+                raise exceptions.CommandError(
+                    msg % {'file': parsed_args.file, 'error': e})
+
+        failed = 0
+        try:
+            for line_num, line in enumerate(lines, 1):
+                try:
+                    argv = _parse_line(line)
+                except ValueError as e:
+                    status, output, errors = 2, '', [six.text_type(e)]
+                else:
+                    if argv is None:
+                        continue
+                    status, output, errors = self.run_line(argv)
+
+                record = {
+                    'line': line_num,
+                    'command': line.strip(),
+                    'status': status,
+                    'output': output,
+                    'errors': errors,
+                }
+                self.app.stdout.write(json.dumps(record) + '\n')
+                self.app.stdout.flush()
+
+                if status:
+                    failed += 1
+                    if parsed_args.stop_on_error:
+                        break
+        finally:
+            if lines is not self.app.stdin:
+                lines.close()
+
+        if failed:
+            msg = _("%d command(s) in the batch failed")
+            raise exceptions.CommandError(msg % failed)
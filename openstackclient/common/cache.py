@@ -0,0 +1,87 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Local on-disk cache helpers"""
+
+import json
+import logging
+import os
+import tempfile
+
+
+LOG = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = 'openstack'
+
+
+def get_cache_dir():
+    """Return the directory used for OSC's local cache files
+
+    Follows the XDG base directory convention so the cache lives next to
+    the one used by os-client-config, ``~/.cache/openstack`` by default.
+    """
+
+    base = os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, CACHE_DIR_NAME)
+
+
+def read_json(path):
+    """Load a JSON cache file
+
+    :param string path:
+        Full path of the cache file
+    :returns:
+        the decoded data or None if the file is missing or unreadable
+    """
+
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        LOG.debug('Unable to read cache file %s: %s', path, e)
+        return None
+
+
+def write_json(path, data):
+    """Atomically write a JSON cache file readable only by its owner
+
+    Failures are logged and otherwise ignored; a cache that can not be
+    written must never break the command being run.
+
+    :param string path:
+        Full path of the cache file
+    :param data:
+        JSON-serializable data to store
+    :returns:
+        True if the file was written
+    """
+
+    dirname = os.path.dirname(path)
+    try:
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname, 0o700)
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.chmod(tmp_path, 0o600)
+            os.rename(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    except (IOError, OSError, TypeError, ValueError) as e:
+        LOG.debug('Unable to write cache file %s: %s', path, e)
+        return False
+    return True
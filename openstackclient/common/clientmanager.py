@@ -15,12 +15,21 @@
 
 """Manage access to the clients, including authenticating when needed."""
 
+import importlib
 import logging
 import sys
 
 from osc_lib import clientmanager
+from osc_lib import exceptions
 from osc_lib import shell
-import pkg_resources
+import six
+
+from openstackclient.api import retry
+from openstackclient.common import authcache
+from openstackclient.common import commandindex
+from openstackclient.common import compression
+from openstackclient.common import httppool
+from openstackclient.common import startup
 
 
 LOG = logging.getLogger(__name__)
@@ -29,6 +38,9 @@ PLUGIN_MODULES = []
 
 USER_AGENT = 'python-openstackclient'
 
+# Command index data holding the plugin settings needed at startup
+PLUGIN_SETTINGS_KEY = 'plugin-settings'
+
 
 class ClientManager(clientmanager.ClientManager):
     """Manages access to API clients, including authentication
@@ -64,6 +76,7 @@ class ClientManager(clientmanager.ClientManager):
         self._insecure = not self.verify
         # store original auth_type
         self._original_auth_type = cli_options.auth_type
+        self._auth_cache = None
 
     def setup_auth(self):
         """Set up authentication"""
@@ -89,14 +102,60 @@ class ClientManager(clientmanager.ClientManager):
             except TypeError as e:
                 self._fallback_load_auth_plugin(e)
 
-        return super(ClientManager, self).setup_auth()
+        with startup.phase('auth'):
+            super(ClientManager, self).setup_auth()
+            self._setup_http_pool()
+
+            if (
+                    self._auth_required and
+                    self._cli_options.config.get('auth_cache')
+            ):
+                self._auth_cache = authcache.AuthCache(self.auth)
+                if self._auth_cache.load():
+                    self._auth_ref = self.auth.auth_ref
+
+    def _setup_http_pool(self):
+        """Configure the session shared by the clients
+
+        Sizes its connection pools, sets its retry policy and the response
+        compression it negotiates.
+        """
+
+        config = self._cli_options.config
+        policy = retry.policy_from_config(config)
+        # Also used by API objects given another session
+        retry.set_default_policy(policy)
+        httppool.configure(
+            self.session,
+            pool_connections=config.get('http_pool_connections'),
+            pool_maxsize=config.get('http_pool_maxsize'),
+            retry_policy=policy,
+        )
+        compression.configure(self.session, config.get('http_compression'))
+
+    def save_auth_cache(self):
+        """Store the current token and catalog if the auth cache is enabled"""
+
+        if self._auth_cache is not None:
+            self._auth_cache.save()
+
+    def invalidate_auth_cache(self):
+        """Forget the cached token, for example after it has been rejected"""
+
+        if self._auth_cache is not None:
+            self._auth_cache.invalidate()
+            # Make a long-lived process, such as the command server,
+            # authenticate again on its next request
+            self.auth.invalidate()
+            self._auth_ref = None
 
     @property
     def auth_ref(self):
         if not self._auth_required:
             return None
         else:
-            return super(ClientManager, self).auth_ref
+            with startup.phase('auth'):
+                return super(ClientManager, self).auth_ref
 
     def _fallback_load_auth_plugin(self, e):
         # NOTES(RuiChen): Hack to avoid auth plugins choking on data they don't
@@ -147,41 +206,175 @@ class ClientManager(clientmanager.ClientManager):
 
 # Plugin Support
 
+class ClientCache(object):
+    """Descriptor class for caching created client handles
+
+    Unlike osc_lib's ClientCache the handle is stored on the ClientManager
+    instance, so a process that keeps several ClientManagers alive, like
+    the daemon server, does not share clients between clouds.
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        cache = instance.__dict__.setdefault('_client_cache', {})
+        if self.name not in cache:
+            try:
+                cache[self.name] = self.factory(instance)
+            except AttributeError as err:
+                # Make sure the failure propagates. Otherwise, the plugin just
+                # quietly isn't there.
+                new_err = exceptions.PluginAttributeError(err)
+                six.reraise(new_err.__class__, new_err, sys.exc_info()[2])
+        return cache[self.name]
+
+
+class PluginModule(object):
+    """Stand-in for a plugin client module that imports it on first use
+
+    ``API_NAME`` is taken from the entry point name, which the plugin
+    interface requires to match the module's ``API_NAME``, so plugins can
+    be registered with the ClientManager without importing them.  Any
+    other attribute access imports the real module.
+    """
+
+    def __init__(self, entry_point):
+        self.API_NAME = entry_point.name
+        self.module_name = entry_point.module_name
+        self._module = None
+        self._failed = False
+        self._version_check = None
+
+    @property
+    def loaded(self):
+        """True if the plugin module has been imported"""
+        return self._module is not None
+
+    def load(self):
+        """Import and initialize the plugin module
+
+        :returns: the plugin module, or None if it failed to import
+        """
+
+        if self._module is None and not self._failed:
+            LOG.debug('Loading plugin %s', self.API_NAME)
+            try:
+                module = importlib.import_module(self.module_name)
+            except Exception:
+                self._failed = True
+                sys.stderr.write(
+                    "WARNING: Failed to import plugin %s.\n" % self.API_NAME)
+                return None
+
+            init_func = getattr(module, 'Initialize', None)
+            if init_func:
+                init_func('x')
+            self._module = module
+        return self._module
+
+    # Module attributes the shell reads for every plugin at startup
+    SETTINGS = ('API_VERSION_OPTION', 'DEFAULT_API_VERSION')
+
+    def get_settings(self):
+        """Return the plugin's startup settings, importing it only once
+
+        The settings are cached in the command index so later runs do not
+        have to import plugins that are not used.
+
+        :returns: a dict of the SETTINGS attributes, or None if the plugin
+            failed to import
+        """
+
+        index = commandindex.get_index()
+        cached = index.get_data(PLUGIN_SETTINGS_KEY) or {}
+        if self.module_name in cached:
+            return cached[self.module_name]
+
+        module = self.load()
+        if module is None:
+            return None
+        settings = dict(
+            (name, getattr(module, name, None)) for name in self.SETTINGS
+        )
+        cached = dict(cached)
+        cached[self.module_name] = settings
+        index.set_data(PLUGIN_SETTINGS_KEY, cached)
+        index.save()
+        return settings
+
+    def set_version_check(self, check):
+        """Set a callable to validate the API version before first use
+
+        The check is run once, just before the plugin's client is created,
+        so plugins that are never used do not pay for version validation.
+        """
+        self._version_check = check
+
+    def make_client(self, instance):
+        """Create the plugin's client, loading the module if required"""
+
+        if self._version_check:
+            check, self._version_check = self._version_check, None
+            check()
+
+        # NOTE: AttributeError is reported as a PluginAttributeError by
+        #       the ClientCache descriptor
+        with startup.phase('client ' + self.API_NAME):
+            return self.__getattr__('make_client')(instance)
+
+    def __getattr__(self, name):
+        # Only called for attributes not set on the stand-in itself
+        if name.startswith('_'):
+            raise AttributeError(name)
+        module = self.load()
+        if module is None:
+            raise AttributeError(
+                "Plugin %s is not available" % self.API_NAME)
+        return getattr(module, name)
+
+    def __repr__(self):
+        return '<PluginModule %s (%s)>' % (self.API_NAME, self.module_name)
+
+
 def get_plugin_modules(group):
-    """Find plugin entry points"""
+    """Find plugin entry points
+
+    :returns: list of PluginModule objects; the modules themselves are
+        not imported until they are needed
+    """
     mod_list = []
-    for ep in pkg_resources.iter_entry_points(group):
+    for ep in commandindex.get_entry_points(group):
         LOG.debug('Found plugin %s', ep.name)
 
-        try:
-            __import__(ep.module_name)
-        except Exception:
-            sys.stderr.write(
-                "WARNING: Failed to import plugin %s.\n" % ep.name)
-            continue
-
-        module = sys.modules[ep.module_name]
+        module = PluginModule(ep)
         mod_list.append(module)
-        init_func = getattr(module, 'Initialize', None)
-        if init_func:
-            init_func('x')
 
         # Add the plugin to the ClientManager
         setattr(
             clientmanager.ClientManager,
             module.API_NAME,
-            clientmanager.ClientCache(
-                getattr(sys.modules[ep.module_name], 'make_client', None)
-            ),
+            ClientCache(module.API_NAME, module.make_client),
         )
     return mod_list
 
 
-def build_plugin_option_parser(parser):
-    """Add plugin options to the parser"""
+def build_plugin_option_parser(parser, modules=None):
+    """Add plugin options to the parser
+
+    Every plugin module given is imported.  The shell defers each plugin's
+    options and passes only the plugin whose options are used.
+
+    :param modules: the PluginModules to add options for, defaults to all
+    """
 
     # Loop through extensions to get parser additions
-    for mod in PLUGIN_MODULES:
+    for mod in PLUGIN_MODULES if modules is None else modules:
+        if mod.load() is None:
+            continue
         parser = mod.build_option_parser(parser)
     return parser
 
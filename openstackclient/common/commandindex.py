@@ -0,0 +1,290 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Persistent index of command and plugin entry points
+
+Scanning the entry point groups of every installed distribution is one of
+the most expensive parts of starting ``openstack``.  The index maps each
+entry point group to ``{name: 'module:attr'}`` and is stored on disk so
+later runs can resolve a command without importing ``pkg_resources``.
+
+The index is only trusted while its signature matches the installed
+distribution metadata; installing, upgrading or removing any package
+changes the signature and causes the index to be rebuilt.
+
+Set ``OS_COMMAND_INDEX`` to a file name to relocate the index, or to an
+empty string to disable it.
+"""
+
+import hashlib
+import importlib
+import logging
+import os
+import sys
+
+from openstackclient.common import cache
+
+
+LOG = logging.getLogger(__name__)
+
+# Bump this when the on-disk format changes
+INDEX_VERSION = 1
+
+INDEX_FILE_NAME = 'osc-command-index.json'
+
+_METADATA_SUFFIXES = ('.dist-info', '.egg-info')
+
+
+class IndexedEntryPoint(object):
+    """A lightweight entry point rebuilt from the command index
+
+    Provides the parts of the ``pkg_resources.EntryPoint`` interface that
+    cliff uses to look up and load commands.
+    """
+
+    def __init__(self, name, target):
+        self.name = name
+        self.value = target
+        module_name, _sep, attrs = target.partition(':')
+        self.module_name = module_name
+        self.attrs = tuple(attrs.split('.')) if attrs else ()
+
+    def load(self, *args, **kwargs):
+        """Import the module and return the referenced object"""
+
+        obj = importlib.import_module(self.module_name)
+        for attr in self.attrs:
+            obj = getattr(obj, attr)
+        return obj
+
+    # cliff prefers resolve() when it is available
+    resolve = load
+
+    def __repr__(self):
+        return 'IndexedEntryPoint(%r, %r)' % (self.name, self.value)
+
+
+def entry_point_target(ep):
+    """Return the ``module:attr`` string for an entry point"""
+
+    if ep.attrs:
+        return '%s:%s' % (ep.module_name, '.'.join(ep.attrs))
+    return ep.module_name
+
+
+def get_index_path():
+    """Return the index file name, or None if the index is disabled"""
+
+    path = os.environ.get('OS_COMMAND_INDEX')
+    if path is None:
+        return os.path.join(cache.get_cache_dir(), INDEX_FILE_NAME)
+    return path or None
+
+
+def compute_signature(paths=None):
+    """Fingerprint the installed distribution metadata
+
+    Only directory listings and a stat() per distribution are needed, which
+    is far cheaper than parsing every ``entry_points.txt``.
+
+    :param list paths:
+        directories to inspect, defaults to ``sys.path``
+    :returns:
+        a hex digest string
+    """
+
+    if paths is None:
+        paths = sys.path
+
+    digest = hashlib.sha1()
+    digest.update(('%d:%s' % (INDEX_VERSION, sys.version)).encode('utf-8'))
+    for path in paths:
+        try:
+            names = sorted(os.listdir(path or '.'))
+        except (IOError, OSError):
+            continue
+        for name in names:
+            if not name.endswith(_METADATA_SUFFIXES):
+                continue
+            ep_file = os.path.join(path, name, 'entry_points.txt')
+            try:
+                mtime = os.stat(ep_file).st_mtime
+            except (IOError, OSError):
+                mtime = 0
+            entry = '%s/%s:%r\n' % (path, name, mtime)
+            digest.update(entry.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class CommandIndex(object):
+    """On-disk map of entry point groups to ``{name: 'module:attr'}``"""
+
+    def __init__(self, path=None, signature=None):
+        self.path = path
+        self._signature = signature
+        self._groups = None
+        self._data = None
+        self._dirty = False
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    @property
+    def signature(self):
+        if self._signature is None:
+            self._signature = compute_signature()
+        return self._signature
+
+    def _load(self):
+        if self._groups is not None:
+            return self._groups
+
+        self._groups = {}
+        self._data = {}
+        if not self.enabled:
+            return self._groups
+
+        data = cache.read_json(self.path)
+        if (
+                isinstance(data, dict) and
+                data.get('version') == INDEX_VERSION and
+                data.get('signature') == self.signature and
+                isinstance(data.get('groups'), dict)
+        ):
+            self._groups = data['groups']
+            if isinstance(data.get('data'), dict):
+                self._data = data['data']
+        elif data is not None:
+            LOG.debug('Discarding stale command index %s', self.path)
+        return self._groups
+
+    def get_group(self, group):
+        """Return the indexed ``{name: target}`` for a group, or None"""
+
+        if not self.enabled:
+            return None
+        return self._load().get(group)
+
+    def set_group(self, group, entries):
+        """Record the ``{name: target}`` mapping for a group"""
+
+        if not self.enabled:
+            return
+        self._load()[group] = dict(entries)
+        self._dirty = True
+
+    def get_data(self, key):
+        """Return other data derived from the installed packages, or None"""
+
+        if not self.enabled:
+            return None
+        self._load()
+        return self._data.get(key)
+
+    def set_data(self, key, value):
+        """Record JSON-serializable data derived from the installed packages
+
+        Like the entry point groups it is discarded when the installed
+        packages change.
+        """
+
+        if not self.enabled:
+            return
+        self._load()
+        self._data[key] = value
+        self._dirty = True
+
+    def save(self):
+        """Write the index back to disk if it has changed"""
+
+        if not self.enabled or not self._dirty:
+            return
+        data = {
+            'version': INDEX_VERSION,
+            'signature': self.signature,
+            'groups': self._load(),
+            'data': self._data,
+        }
+        if cache.write_json(self.path, data):
+            self._dirty = False
+
+
+def scan_group(group):
+    """Read a group from the installed entry points
+
+    :returns: list of ``pkg_resources.EntryPoint`` objects
+    """
+
+    # NOTE: pkg_resources is slow to import, so only do it on an index miss
+    import pkg_resources
+
+    return list(pkg_resources.iter_entry_points(group))
+
+
+def _get_entries(group, index=None):
+    """Return the ``(name, target)`` pairs of a group"""
+
+    if index is None:
+        index = get_index()
+
+    entries = index.get_group(group)
+    if entries is not None:
+        return list(entries.items())
+
+    entries = [(ep.name, entry_point_target(ep)) for ep in scan_group(group)]
+    index.set_group(group, entries)
+    index.save()
+    return entries
+
+
+def get_entry_points(group, index=None):
+    """Return the entry points for a group, using the index when possible
+
+    :param string group:
+        entry point group name
+    :param CommandIndex index:
+        index to consult and update, defaults to the shared index
+    :returns:
+        list of IndexedEntryPoint objects
+    """
+
+    return [IndexedEntryPoint(name, target)
+            for name, target in _get_entries(group, index)]
+
+
+def get_entry_point_names(group, index=None):
+    """Return the entry point names of a group without building entry points
+
+    :param string group:
+        entry point group name
+    :param CommandIndex index:
+        index to consult and update, defaults to the shared index
+    :returns:
+        list of names
+    """
+
+    return [name for name, _target in _get_entries(group, index)]
+
+
+_INDEX = None
+
+
+def get_index():
+    """Return the process-wide command index"""
+
+    global _INDEX
+    path = get_index_path()
+    if _INDEX is None or _INDEX.path != path:
+        _INDEX = CommandIndex(path=path)
+    return _INDEX
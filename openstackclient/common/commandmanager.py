@@ -15,45 +15,117 @@
 
 """Modify cliff.CommandManager"""
 
-import pkg_resources
+import logging
 
 import cliff.commandmanager
 
+from openstackclient.common import commandindex
+
+
+LOG = logging.getLogger(__name__)
+
 
 class CommandManager(cliff.commandmanager.CommandManager):
     """Add additional functionality to cliff.CommandManager
 
     Load additional command groups after initialization
     Add _command_group() methods
+    Resolve command entry points through the persistent command index
+    Defer loading added command groups until a command is looked up
     """
 
     def __init__(self, namespace, convert_underscores=True):
         self.group_list = []
+        # Groups added with add_command_group() but not loaded yet
+        self._pending_groups = []
+        # Maps command names to the position of the group defining them
+        self._command_group_index = {}
         super(CommandManager, self).__init__(namespace, convert_underscores)
 
+    def __iter__(self):
+        # Listing commands (help, complete, interactive mode) needs them all
+        self._load_pending_groups()
+        return super(CommandManager, self).__iter__()
+
+    def _get_command_name(self, name):
+        return name.replace('_', ' ') if self.convert_underscores else name
+
     def load_commands(self, namespace):
-        self.group_list.append(namespace)
-        return super(CommandManager, self).load_commands(namespace)
+        """Load all the commands from an entry point group"""
+        if namespace not in self.group_list:
+            self.group_list.append(namespace)
+        group_index = self.group_list.index(namespace)
+        for ep in commandindex.get_entry_points(namespace):
+            LOG.debug('found command %r', ep.name)
+            name = self._get_command_name(ep.name)
+            # Groups may be loaded out of order; keep the definition from
+            # the group added last, as loading them in order would
+            if self._command_group_index.get(name, -1) > group_index:
+                continue
+            self._command_group_index[name] = group_index
+            self.commands[name] = ep
 
     def add_command_group(self, group=None):
-        """Adds another group of command entrypoints"""
-        if group:
+        """Adds another group of command entrypoints
+
+        The group is loaded when a command that may belong to it is looked
+        up, or when all of the commands are listed.
+        """
+        if group and group not in self.group_list:
+            self.group_list.append(group)
+            self._pending_groups.append(group)
+
+    def _load_pending_groups(self, groups=None):
+        """Load the given pending groups, or all of them"""
+        if groups is None:
+            groups = list(self._pending_groups)
+        for group in groups:
+            self._pending_groups.remove(group)
             self.load_commands(group)
 
+    def _match_pending_groups(self, argv):
+        """Return the pending groups that may contain the command in argv
+
+        The prefix index maps the first word of each command name to the
+        groups defining it; it only needs the names from the command index
+        so no entry points are built for the groups that are skipped.
+        """
+        if not argv:
+            return []
+        first = self._get_command_name(argv[0]).split(' ')[0]
+        return [
+            group for group in self._pending_groups
+            if first in set(
+                self._get_command_name(name).split(' ')[0]
+                for name in commandindex.get_entry_point_names(group)
+            )
+        ]
+
+    def find_command(self, argv):
+        """Load only the groups that may define the command before looking
+
+        Fall back to loading every group when the command is not found.
+        """
+        if self._pending_groups:
+            self._load_pending_groups(self._match_pending_groups(argv))
+        try:
+            return super(CommandManager, self).find_command(argv)
+        except ValueError:
+            if not self._pending_groups:
+                raise
+        self._load_pending_groups()
+        return super(CommandManager, self).find_command(argv)
+
     def get_command_groups(self):
-        """Returns a list of the loaded command groups"""
+        """Returns a list of the added command groups"""
         return self.group_list
 
     def get_command_names(self, group=None):
         """Returns a list of commands loaded for the specified group"""
         group_list = []
         if group is not None:
-            for ep in pkg_resources.iter_entry_points(group):
-                cmd_name = (
-                    ep.name.replace('_', ' ')
-                    if self.convert_underscores
-                    else ep.name
-                )
-                group_list.append(cmd_name)
+            for name in commandindex.get_entry_point_names(group):
+                group_list.append(self._get_command_name(name))
             return group_list
+        self._load_pending_groups()
         return list(self.commands.keys())
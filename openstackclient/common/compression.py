@@ -0,0 +1,161 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""HTTP response compression
+
+The shared session asks for compressed responses (``Accept-Encoding``)
+unless compression is disabled with ``--os-http-compression identity``.
+Compressed bodies are decompressed as they are read, so streamed listings
+stay streamed.  With ``--http-compression-report`` the bytes received and
+the size of the decompressed content are counted for every compressed
+response and the savings are reported when the command ends.
+"""
+
+import threading
+
+from osc_lib import exceptions
+
+from openstackclient.i18n import _
+
+
+# Accept-Encoding sent in each mode
+MODES = {
+    'gzip': 'gzip, deflate',
+    'identity': 'identity',
+}
+DEFAULT_MODE = 'gzip'
+
+_COMPRESSED = ('gzip', 'deflate')
+
+_stats = None
+
+
+class CompressionStats(object):
+    """Count the bytes received for compressed responses"""
+
+    def __init__(self):
+        self.responses = 0
+        self.compressed = 0
+        self.wire_bytes = 0
+        self.content_bytes = 0
+        self._lock = threading.Lock()
+
+    def track(self, response):
+        """Count a response as its body is read
+
+        :param response: a requests.Response whose body was not read yet
+        """
+
+        with self._lock:
+            self.responses += 1
+        encoding = response.headers.get('Content-Encoding', '').lower()
+        raw = response.raw
+        if encoding not in _COMPRESSED or not hasattr(raw, 'tell'):
+            return
+
+        stream = raw.stream
+
+        def counting_stream(*args, **kwargs):
+            content_bytes = 0
+            try:
+                for chunk in stream(*args, **kwargs):
+                    content_bytes += len(chunk)
+                    yield chunk
+            finally:
+                self._add(raw.tell(), content_bytes)
+
+        # requests reads the content, streamed or not, with raw.stream()
+        raw.stream = counting_stream
+
+    def _add(self, wire_bytes, content_bytes):
+        with self._lock:
+            self.compressed += 1
+            self.wire_bytes += wire_bytes
+            self.content_bytes += content_bytes
+
+    @property
+    def saved_bytes(self):
+        return self.content_bytes - self.wire_bytes
+
+    def format_report(self):
+        saved = 0
+        if self.content_bytes:
+            saved = 100.0 * self.saved_bytes / self.content_bytes
+        return (
+            'HTTP compression: %d of %d responses compressed, '
+            '%d bytes received for %d bytes of content, '
+            '%d bytes (%.0f%%) saved\n' % (
+                self.compressed,
+                self.responses,
+                self.wire_bytes,
+                self.content_bytes,
+                self.saved_bytes,
+                saved,
+            )
+        )
+
+
+def _track(response, *args, **kwargs):
+    if _stats is not None:
+        _stats.track(response)
+    return response
+
+
+def configure(session, mode=None):
+    """Set the compression negotiated by a session
+
+    :param session: a keystoneauth or requests session
+    :param string mode: a key of MODES, defaults to DEFAULT_MODE
+    :raises CommandError: for an unknown mode
+    """
+
+    mode = mode or DEFAULT_MODE
+    if mode not in MODES:
+        raise exceptions.CommandError(
+            _("http_compression must be one of %(modes)s, not %(mode)r") %
+            {'modes': ', '.join(sorted(MODES)), 'mode': mode}
+        )
+    # Accept a keystoneauth session or a requests session
+    requests_session = getattr(session, 'session', session)
+    requests_session.headers['Accept-Encoding'] = MODES[mode]
+    if _track not in requests_session.hooks['response']:
+        requests_session.hooks['response'].append(_track)
+
+
+def enable_report():
+    """Start counting the bytes of compressed responses"""
+
+    global _stats
+
+    if _stats is None:
+        _stats = CompressionStats()
+    return _stats
+
+
+def disable_report():
+    global _stats
+
+    _stats = None
+
+
+def get_stats():
+    """Return the active CompressionStats, or None"""
+
+    return _stats
+
+
+def report(stream):
+    """Write the bytes saved by compression to a stream"""
+
+    if _stats is not None:
+        stream.write(_stats.format_report())
@@ -0,0 +1,274 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Deferred global option groups
+
+Building the options of every API plugin and every keystoneauth plugin
+imports most of the installed client libraries.  Each group of options is
+described once, in the command index, by its option strings, the
+environment variables read while building them and the defaults they have
+when those variables are unset.  A group is only added to the parser when
+one of its options is used on the command line, one of its variables is
+set, or help is requested; otherwise only its defaults are set so the
+parsed options look the same to the rest of the shell.
+"""
+
+import argparse
+import json
+import logging
+import os
+
+from openstackclient.common import commandindex
+
+
+LOG = logging.getLogger(__name__)
+
+# Renamed when the format of the descriptions changes
+INDEX_DATA_KEY = 'deferred-option-groups'
+
+# Commands that need every option to be available
+COMPLETE_COMMAND = 'complete'
+HELP_COMMAND = 'help'
+
+
+class _RecordingEnviron(dict):
+    """Environment recording the unset variables read while building options
+
+    A variable read while the parser has n actions is read for the default
+    of the next action added, the one at index n.
+    """
+
+    def __init__(self, environ, parser):
+        super(_RecordingEnviron, self).__init__(environ)
+        self.parser = parser
+        self.reads = []
+        self.paused = False
+
+    def _record(self, key):
+        if not self.paused and not dict.__contains__(self, key):
+            self.reads.append((key, len(self.parser._actions)))
+
+    def get(self, key, default=None):
+        self._record(key)
+        return super(_RecordingEnviron, self).get(key, default)
+
+    def __getitem__(self, key):
+        self._record(key)
+        return super(_RecordingEnviron, self).__getitem__(key)
+
+    def __contains__(self, key):
+        self._record(key)
+        return super(_RecordingEnviron, self).__contains__(key)
+
+
+class _ScratchParser(argparse.ArgumentParser):
+    """Parser not recording the variables read by argparse itself"""
+
+    environ = None
+
+    def _get_formatter(self):
+        # The help formatter reads COLUMNS, which no option depends on
+        self.environ.paused = True
+        try:
+            return super(_ScratchParser, self)._get_formatter()
+        finally:
+            self.environ.paused = False
+
+
+def describe_group(builder):
+    """Describe the options added by a builder
+
+    The builder is run on a scratch parser with the ``OS_*`` environment
+    variables removed so the recorded defaults do not depend on the current
+    environment.  The unset variables read meanwhile are recorded with the
+    destination of the option they were read for; the builder is run once
+    beforehand so the variables read by the modules it imports are not.
+
+    :param builder: callable adding options to the parser it is given
+    :returns: a dict with ``options``, ``envs`` (variable to destination)
+        and ``defaults`` keys, or None if the group can not be deferred
+    """
+
+    parser = _ScratchParser(add_help=False)
+    environ = _RecordingEnviron(
+        (
+            (name, value) for name, value in os.environ.items()
+            if not name.startswith('OS_')
+        ),
+        parser,
+    )
+    parser.environ = environ
+    saved_environ = os.environ
+    os.environ = environ
+    try:
+        # A first run imports the modules the builder needs, they may
+        # read variables no option depends on
+        environ.paused = True
+        builder(argparse.ArgumentParser(add_help=False))
+        environ.paused = False
+        builder(parser)
+    finally:
+        os.environ = saved_environ
+
+    options = []
+    defaults = {}
+    for action in parser._actions:
+        options.extend(action.option_strings)
+        if action.dest is not argparse.SUPPRESS:
+            defaults[action.dest] = action.default
+    envs = {}
+    for name, position in environ.reads:
+        if position < len(parser._actions):
+            envs.setdefault(name, parser._actions[position].dest)
+        else:
+            # Read after the last option was added
+            envs.setdefault(name, None)
+    try:
+        json.dumps(defaults)
+    except (TypeError, ValueError):
+        # Defaults that can not be stored are not restorable either
+        return None
+    return {
+        'options': options,
+        'envs': envs,
+        'defaults': defaults,
+    }
+
+
+class DeferredOptions(object):
+    """Global option groups added to the parser on demand
+
+    :param CommandIndex index:
+        where the group descriptions are cached, defaults to the shared
+        command index; groups are never deferred without one
+    """
+
+    def __init__(self, index=None):
+        self.index = index
+        self._groups = []
+        self._pending = []
+
+    def add_group(self, name, builder):
+        """Register a group of options
+
+        :param string name: a unique name for the group
+        :param builder: callable adding the options to the parser it is
+            given and returning the parser
+        """
+
+        self._groups.append((name, builder))
+
+    def _describe_groups(self):
+        """Return the descriptions of all of the groups, or None"""
+
+        index = self.index or commandindex.get_index()
+        if not index.enabled:
+            return None
+
+        descriptions = index.get_data(INDEX_DATA_KEY) or {}
+        missing = [
+            (name, builder) for name, builder in self._groups
+            if name not in descriptions
+        ]
+        if missing:
+            descriptions = dict(descriptions)
+            for name, builder in missing:
+                descriptions[name] = describe_group(builder)
+            index.set_data(INDEX_DATA_KEY, descriptions)
+            index.save()
+        return descriptions
+
+    def build(self, parser):
+        """Add the groups that can not be deferred, set the others' defaults
+
+        :param parser: the global argparse parser
+        """
+
+        descriptions = self._describe_groups()
+        for name, builder in self._groups:
+            description = (descriptions or {}).get(name)
+            if description is None:
+                builder(parser)
+            else:
+                parser.set_defaults(**description['defaults'])
+                self._pending.append((name, builder, description))
+
+    def _is_needed(self, description, argv, environ):
+        for arg in argv:
+            arg = arg.split('=', 1)[0]
+            # Also match abbreviations, as argparse accepts them
+            if arg.startswith('--') and [
+                o for o in description['options'] if o.startswith(arg)
+            ]:
+                return True
+        return bool([env for env in description['envs'] if environ.get(env)])
+
+    def _command_words(self, parser, argv):
+        """Return the command and its arguments from argv
+
+        Options not on the parser yet are assumed to take a value, as the
+        plugin and auth options do.
+        """
+
+        known = parser._option_string_actions
+        for i, arg in enumerate(argv):
+            if arg == '--':
+                return argv[i + 1:]
+            if not arg.startswith('-'):
+                # Skip the value of the previous option
+                if i > 0 and self._takes_value(known, argv[i - 1]):
+                    continue
+                return argv[i:]
+        return []
+
+    @staticmethod
+    def _takes_value(known, arg):
+        if not arg.startswith('-') or '=' in arg:
+            return False
+        action = known.get(arg)
+        if action is None:
+            # Unknown short options are flags like -vv
+            return arg.startswith('--')
+        return action.nargs != 0
+
+    def materialize(self, parser, argv, environ=None):
+        """Add the pending groups needed to parse argv
+
+        :param parser: the global argparse parser
+        :param list argv: the command line arguments
+        :param dict environ: the environment, defaults to os.environ
+        """
+
+        if environ is None:
+            environ = os.environ
+
+        # Interactive mode, completion and the global help need every
+        # option; the help of a command does not show the global options
+        words = self._command_words(parser, argv)
+        load_all = (
+            not words or
+            words == [HELP_COMMAND] or
+            words[0] == COMPLETE_COMMAND
+        )
+        # An option already on the parser is not an abbreviation
+        known = set(parser._option_string_actions)
+        argv = [arg for arg in argv if arg.split('=', 1)[0] not in known]
+
+        pending = []
+        for name, builder, description in self._pending:
+            if load_all or self._is_needed(description, argv, environ):
+                LOG.debug('Adding deferred options %s', name)
+                builder(parser)
+            else:
+                pending.append((name, builder, description))
+        self._pending = pending
@@ -0,0 +1,196 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""HTTP connection pools of the shared session
+
+Every API client is created with the ClientManager's keystoneauth session,
+so they all share the connection pools of its requests session.  The pools
+are sized with ``--os-http-pool-connections`` (number of hosts) and
+``--os-http-pool-maxsize`` (connections kept open to each host); commands
+sending concurrent requests grow the per-host pool to their concurrency so
+connections are reused rather than opened and discarded.
+
+The adapters also apply the retry policy of the session (see
+openstackclient.api.retry) to every request sent through them.
+"""
+
+import functools
+import logging
+
+from keystoneauth1 import session as ksa_session
+from osc_lib import exceptions
+from requests import adapters
+import six
+
+from openstackclient.common import trace
+from openstackclient.i18n import _
+
+
+LOG = logging.getLogger(__name__)
+
+# The requests defaults
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+_SCHEMES = ('https://', 'http://')
+
+
+class PoolAdapter(ksa_session.TCPKeepAliveAdapter):
+    """A keep-alive adapter retrying requests as allowed by a policy
+
+    :param retry_policy: an openstackclient.api.retry.RetryPolicy, or None
+        to send each request once
+    """
+
+    def __init__(self, retry_policy=None, **kwargs):
+        self.retry_policy = retry_policy
+        super(PoolAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        send = super(PoolAdapter, self).send
+        if trace.is_enabled():
+            # Each attempt is recorded
+            send = functools.partial(trace.traced_send, send)
+        if self.retry_policy is None:
+            return send(request, **kwargs)
+        # A streamed body, such as an uploaded file, can not be sent again
+        replayable = request.body is None or isinstance(
+            request.body, (six.binary_type, six.text_type))
+        return self.retry_policy.run(
+            request.method,
+            request.url,
+            lambda: send(request, **kwargs),
+            replayable=replayable,
+        )
+
+
+def _requests_session(session):
+    # Accept a keystoneauth session or a requests session
+    return getattr(session, 'session', session)
+
+
+def _count(name, value, default):
+    if value is None or value == '':
+        return default
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        count = 0
+    if count < 1:
+        raise exceptions.CommandError(
+            _("%(name)s must be a positive integer, not %(value)r") %
+            {'name': name, 'value': value}
+        )
+    return count
+
+
+def _get_adapter(session):
+    return _requests_session(session).get_adapter(_SCHEMES[0])
+
+
+def get_pool_sizes(session):
+    """Return the pool connections and maxsize of a session
+
+    :param session: a keystoneauth or requests session
+    :returns: a ``(pool_connections, pool_maxsize)`` tuple
+    """
+
+    adapter = _get_adapter(session)
+    return (
+        getattr(adapter, '_pool_connections', DEFAULT_POOL_CONNECTIONS),
+        getattr(adapter, '_pool_maxsize', DEFAULT_POOL_MAXSIZE),
+    )
+
+
+def get_retry_policy(session):
+    """Return the retry policy of a session, or None"""
+
+    return getattr(_get_adapter(session), 'retry_policy', None)
+
+
+def configure(
+    session,
+    pool_connections=None,
+    pool_maxsize=None,
+    retry_policy=None,
+):
+    """Size the connection pools of a session and set its retry policy
+
+    The adapters keep TCP connections alive like keystoneauth's own.
+
+    :param session: a keystoneauth or requests session
+    :param int pool_connections: number of hosts with a pool
+    :param int pool_maxsize: connections kept open to each host
+    :param retry_policy: an openstackclient.api.retry.RetryPolicy
+    :raises CommandError: for a size that is not a positive integer
+    """
+
+    pool_connections = _count(
+        'http_pool_connections', pool_connections, DEFAULT_POOL_CONNECTIONS)
+    pool_maxsize = _count(
+        'http_pool_maxsize', pool_maxsize, DEFAULT_POOL_MAXSIZE)
+
+    LOG.debug(
+        'HTTP connection pools: %d hosts, %d connections per host',
+        pool_connections,
+        pool_maxsize,
+    )
+    requests_session = _requests_session(session)
+    for scheme in _SCHEMES:
+        requests_session.mount(scheme, PoolAdapter(
+            retry_policy=retry_policy,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        ))
+
+
+def ensure_pool_maxsize(session, maxsize):
+    """Make room for maxsize concurrent requests to a host
+
+    The pools are only replaced if they are smaller, call this before
+    starting the requests.
+
+    :param session: a keystoneauth or requests session
+    :param int maxsize: the number of concurrent requests
+    """
+
+    if not isinstance(_get_adapter(session), adapters.HTTPAdapter):
+        # Not sending through urllib3 pools, such as when mocked
+        return
+    pool_connections, pool_maxsize = get_pool_sizes(session)
+    if pool_maxsize < maxsize:
+        configure(
+            session,
+            pool_connections=pool_connections,
+            pool_maxsize=maxsize,
+            retry_policy=get_retry_policy(session),
+        )
+
+
+def ensure_retry_policy(session, retry_policy):
+    """Give a session a retry policy unless it already has one
+
+    The pool sizes are kept.
+
+    :param session: a keystoneauth or requests session
+    :param retry_policy: an openstackclient.api.retry.RetryPolicy
+    """
+
+    if get_retry_policy(session) is None:
+        pool_connections, pool_maxsize = get_pool_sizes(session)
+        configure(
+            session,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            retry_policy=retry_policy,
+        )
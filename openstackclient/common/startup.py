@@ -0,0 +1,273 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Startup profiler
+
+Records the wall time of the phases of a command run and the time spent
+importing each module.  Profiling is enabled by ``--profile-startup``;
+when it is disabled ``phase()`` is a no-op.
+"""
+
+import contextlib
+import importlib
+import json
+import sys
+import time
+
+import six
+from six.moves import builtins
+
+from openstackclient.common import trace
+
+
+# Number of imports shown in the table, the JSON output has all of them
+TABLE_IMPORT_LIMIT = 25
+
+_profile = None
+
+
+class StartupProfile(object):
+    """Collect phase and import timings"""
+
+    def __init__(self):
+        self.start = time.time()
+        self.end = None
+        # Phase timings keyed by phase path, in first-seen order
+        self.phases = {}
+        self.phase_order = []
+        self._phase_stack = []
+        # Import timings keyed by module name
+        self.imports = {}
+        self._import_stack = []
+        self.preloaded_modules = len(sys.modules)
+        self._saved_import = None
+        self._saved_import_module = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        self._phase_stack.append(name)
+        path = ' > '.join(self._phase_stack)
+        start = time.time()
+        try:
+            with trace.span(name):
+                yield
+        finally:
+            elapsed = time.time() - start
+            self._phase_stack.pop()
+            if path not in self.phases:
+                self.phases[path] = {'time': 0.0, 'count': 0}
+                self.phase_order.append(path)
+            self.phases[path]['time'] += elapsed
+            self.phases[path]['count'] += 1
+
+    def _timed_import(self, importer, name, *args, **kwargs):
+        if name in sys.modules or not isinstance(name, six.string_types):
+            return importer(name, *args, **kwargs)
+
+        # Time spent in nested imports is subtracted to get the self time
+        self._import_stack.append(0.0)
+        start = time.time()
+        try:
+            return importer(name, *args, **kwargs)
+        finally:
+            elapsed = time.time() - start
+            children = self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1] += elapsed
+            if name in sys.modules and name not in self.imports:
+                self.imports[name] = {
+                    'time': elapsed,
+                    'self': elapsed - children,
+                }
+
+    def install(self):
+        """Start recording imports"""
+
+        self._saved_import = builtins.__import__
+        self._saved_import_module = importlib.import_module
+
+        saved_import = self._saved_import
+        saved_import_module = self._saved_import_module
+
+        def timed_import(name, *args, **kwargs):
+            return self._timed_import(saved_import, name, *args, **kwargs)
+
+        def timed_import_module(name, *args, **kwargs):
+            return self._timed_import(
+                saved_import_module, name, *args, **kwargs)
+
+        builtins.__import__ = timed_import
+        importlib.import_module = timed_import_module
+
+    def uninstall(self):
+        """Stop recording imports"""
+
+        if self._saved_import is not None:
+            builtins.__import__ = self._saved_import
+            importlib.import_module = self._saved_import_module
+            self._saved_import = None
+            self._saved_import_module = None
+
+    def finish(self):
+        self.uninstall()
+        if self.end is None:
+            self.end = time.time()
+
+    def to_dict(self):
+        """Return the timings, longest first, as JSON-serializable data"""
+
+        end = self.end or time.time()
+        phases = sorted(
+            (
+                {
+                    'phase': path,
+                    'time': self.phases[path]['time'],
+                    'count': self.phases[path]['count'],
+                }
+                for path in self.phase_order
+            ),
+            key=lambda p: p['time'],
+            reverse=True,
+        )
+        imports = sorted(
+            (
+                {'module': name, 'time': t['time'], 'self': t['self']}
+                for name, t in self.imports.items()
+            ),
+            key=lambda i: i['time'],
+            reverse=True,
+        )
+        return {
+            'total': end - self.start,
+            'phases': phases,
+            'imports': imports,
+            'preloaded_modules': self.preloaded_modules,
+        }
+
+    def format_table(self):
+        """Return the timings as text tables, longest first"""
+
+        data = self.to_dict()
+        lines = []
+
+        def add_table(headings, rows):
+            widths = [
+                max(len(str(row[i])) for row in [headings] + rows)
+                for i in range(len(headings))
+            ]
+            for row in [headings] + rows:
+                lines.append('  '.join(
+                    str(cell).ljust(width) if i == 0
+                    else str(cell).rjust(width)
+                    for i, (cell, width) in enumerate(zip(row, widths))
+                ).rstrip())
+            lines.append('')
+
+        add_table(
+            ('Phase', 'Time (ms)', 'Count'),
+            [('total', '%.1f' % (data['total'] * 1000), 1)] + [
+                (p['phase'], '%.1f' % (p['time'] * 1000), p['count'])
+                for p in data['phases']
+            ],
+        )
+        add_table(
+            ('Module', 'Cumulative (ms)', 'Self (ms)'),
+            [
+                (
+                    i['module'],
+                    '%.1f' % (i['time'] * 1000),
+                    '%.1f' % (i['self'] * 1000),
+                )
+                for i in data['imports'][:TABLE_IMPORT_LIMIT]
+            ],
+        )
+        lines.append(
+            '%d modules imported, %d were already loaded when profiling '
+            'started' % (len(data['imports']), data['preloaded_modules'])
+        )
+        return '\n'.join(lines) + '\n'
+
+
+def requested(argv):
+    """Return True if argv asks for a startup profile
+
+    Used before the options are parsed, to start profiling as early as
+    possible.
+    """
+
+    return any(
+        arg.startswith('--profile-startup')
+        for arg in argv
+        if isinstance(arg, six.string_types)
+    )
+
+
+def enable():
+    """Start profiling the current process"""
+
+    global _profile
+
+    if _profile is None:
+        _profile = StartupProfile()
+        _profile.install()
+    return _profile
+
+
+def disable():
+    """Stop profiling and discard the results"""
+
+    global _profile
+
+    if _profile is not None:
+        _profile.uninstall()
+        _profile = None
+
+
+def get_profile():
+    """Return the active StartupProfile, or None"""
+
+    return _profile
+
+
+def phase(name):
+    """Context manager recording the wall time of a startup phase
+
+    The phase is also a span of the request trace when tracing is enabled.
+
+    :param string name: phase name, nested phases are recorded as
+        ``outer > inner``
+    """
+
+    if _profile is None:
+        return trace.span(name)
+    return _profile.phase(name)
+
+
+def report(stream, json_file=None):
+    """Write the table to a stream and, optionally, JSON to a file
+
+    :param stream: text stream receiving the table
+    :param string json_file: file name for the JSON output, ``-`` writes
+        the JSON to the stream instead of the table
+    """
+
+    if _profile is None:
+        return
+    _profile.finish()
+    if json_file == '-':
+        stream.write(json.dumps(_profile.to_dict(), indent=2) + '\n')
+        return
+    stream.write(_profile.format_table())
+    if json_file:
+        with open(json_file, 'w') as f:
+            json.dump(_profile.to_dict(), f, indent=2)
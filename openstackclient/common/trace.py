@@ -0,0 +1,279 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Request waterfall tracing
+
+Records every HTTP request sent through the shared session, with the
+thread that sent it, and the spans of the command phases (startup, auth,
+lookups, listings, the command's action and output formatting).  The trace
+is written by ``--trace-file`` in the Chrome ``trace_event`` JSON format,
+which chrome://tracing and Perfetto display as a waterfall per thread.
+When tracing is disabled ``span()`` and ``record_request()`` are no-ops.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+import six
+from six.moves import urllib
+
+
+_tracer = None
+
+
+def _body_size(body, headers):
+    if isinstance(body, (six.binary_type, six.text_type)):
+        return len(body)
+    try:
+        return int(headers.get('Content-Length'))
+    except (TypeError, ValueError):
+        return None
+
+
+class Tracer(object):
+    """Collect the request and phase events of a run"""
+
+    def __init__(self):
+        self.start = time.time()
+        # list.append() is atomic, requests are sent from several threads
+        self.events = []
+        self.threads = {}
+        self.endpoints = []
+
+    def _thread_id(self):
+        thread = threading.current_thread()
+        self.threads.setdefault(thread.ident, thread.name)
+        return thread.ident
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        tid = self._thread_id()
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.events.append({
+                'name': name,
+                'cat': 'phase',
+                'start': start,
+                'end': time.time(),
+                'tid': tid,
+                'args': args,
+            })
+
+    def record_request(self, request, start, end, response=None, error=None):
+        """Record an HTTP request
+
+        :param request: the requests.PreparedRequest sent
+        :param float start: the time the request was sent
+        :param float end: the time the response headers were received
+        :param response: the requests.Response, None if it failed
+        :param error: the exception raised instead of a response
+        """
+
+        self.events.append({
+            'cat': 'http',
+            'start': start,
+            'end': end,
+            'tid': self._thread_id(),
+            'method': request.method,
+            'url': request.url,
+            'bytes_out': _body_size(request.body, request.headers),
+            'response': response,
+            'error': error,
+        })
+
+    def add_endpoint(self, url, service_type):
+        """Name the service of the requests sent below url"""
+
+        if url:
+            self.endpoints.append((url.rstrip('/'), service_type))
+
+    def service_type(self, url):
+        """Return the service type of the longest endpoint matching url"""
+
+        matches = [
+            (len(endpoint), service_type)
+            for endpoint, service_type in self.endpoints
+            if url == endpoint or url.startswith(endpoint + '/') or
+            url.startswith(endpoint + '?')
+        ]
+        return max(matches)[1] if matches else None
+
+    def _request_event(self, event):
+        response = event['response']
+        service_type = self.service_type(event['url'])
+        args = {
+            'url': event['url'],
+            'service_type': service_type,
+            'bytes_out': event['bytes_out'],
+        }
+        if response is not None:
+            args['status'] = response.status_code
+            # The body has been read unless the response was streamed
+            content = getattr(response, '_content', None)
+            if isinstance(content, six.binary_type):
+                args['bytes_in'] = len(content)
+            else:
+                args['bytes_in'] = _body_size(None, response.headers)
+        if event['error'] is not None:
+            args['error'] = str(event['error'])
+        name = '%s %s' % (
+            event['method'],
+            service_type or urllib.parse.urlparse(event['url']).netloc,
+        )
+        return name, args
+
+    def to_dict(self):
+        """Return the trace in the Chrome trace_event format"""
+
+        pid = os.getpid()
+        trace_events = [{
+            'name': 'process_name',
+            'ph': 'M',
+            'pid': pid,
+            'args': {'name': 'openstack'},
+        }]
+        for tid, name in sorted(self.threads.items()):
+            trace_events.append({
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': pid,
+                'tid': tid,
+                'args': {'name': name},
+            })
+        for event in sorted(self.events, key=lambda e: e['start']):
+            if event['cat'] == 'http':
+                name, args = self._request_event(event)
+            else:
+                name, args = event['name'], event['args']
+            trace_events.append({
+                'name': name,
+                'cat': event['cat'],
+                'ph': 'X',
+                'ts': int((event['start'] - self.start) * 1000000),
+                'dur': int((event['end'] - event['start']) * 1000000),
+                'pid': pid,
+                'tid': event['tid'],
+                'args': args,
+            })
+        return {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+        }
+
+
+def enable():
+    """Start tracing the current process"""
+
+    global _tracer
+
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def disable():
+    """Stop tracing and discard the events"""
+
+    global _tracer
+
+    _tracer = None
+
+
+def get_tracer():
+    """Return the active Tracer, or None"""
+
+    return _tracer
+
+
+def is_enabled():
+    return _tracer is not None
+
+
+def span(name, **args):
+    """Context manager recording a phase of the command
+
+    :param string name: the phase name
+    :param args: details shown with the span
+    """
+
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, **args)
+
+
+def traced(name):
+    """Decorator recording each call of a function as a span"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_send(send, request, **kwargs):
+    """Call an adapter's send() method, recording the request
+
+    :param send: the send() method of a requests adapter
+    :param request: the requests.PreparedRequest to send
+    """
+
+    start = time.time()
+    response = error = None
+    try:
+        response = send(request, **kwargs)
+        return response
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if _tracer is not None:
+            _tracer.record_request(
+                request, start, time.time(), response=response, error=error)
+
+
+def add_endpoint(url, service_type):
+    if _tracer is not None:
+        _tracer.add_endpoint(url, service_type)
+
+
+class _NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def write(path):
+    """Write the trace as JSON to a file
+
+    :param string path: the file name
+    """
+
+    if _tracer is None or not path:
+        return
+    with open(path, 'w') as f:
+        json.dump(_tracer.to_dict(), f)
@@ -13,11 +13,16 @@
 #   under the License.
 #
 
+import importlib
 import logging
+import os
+import time
 
+from keystoneauth1 import exceptions as ks_exceptions
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import cache
 from openstackclient.i18n import _
 
 
@@ -39,6 +44,139 @@ COMPUTE_API_VERSIONS = {
 # Save the microversion if in use
 _compute_api_version = None
 
+# Version and extension discovery results are reused for this many seconds
+DISCOVERY_CACHE_TTL = 24 * 60 * 60
+DISCOVERY_CACHE_FILE_NAME = 'compute-discovery.json'
+
+# In-memory copy of the discovery cache file, loaded on first use
+_discovery_cache = None
+
+
+def _get_discovery_cache_path():
+    return os.path.join(cache.get_cache_dir(), DISCOVERY_CACHE_FILE_NAME)
+
+
+def _get_cached(key):
+    """Return a discovery result that has not expired, or None"""
+
+    global _discovery_cache
+
+    if _discovery_cache is None:
+        data = cache.read_json(_get_discovery_cache_path())
+        _discovery_cache = data if isinstance(data, dict) else {}
+    entry = _discovery_cache.get(key)
+    if (
+            not isinstance(entry, dict) or
+            time.time() - entry.get('time', 0) > DISCOVERY_CACHE_TTL
+    ):
+        return None
+    return entry.get('value')
+
+
+def _set_cached(key, value):
+    """Save a discovery result in memory and in the cache file"""
+
+    _get_cached(key)
+    _discovery_cache[key] = {'time': time.time(), 'value': value}
+    cache.write_json(_get_discovery_cache_path(), _discovery_cache)
+
+
+def _discover_version(client, endpoint):
+    """Negotiate the most recent microversion supported by both sides
+
+    The server's version range is fetched once per endpoint and cached.
+
+    :param client: a novaclient client
+    :param string endpoint: the compute endpoint, used as the cache key
+    :returns: an APIVersion
+    """
+
+    import novaclient
+    from novaclient import api_versions
+    from novaclient import exceptions as nova_exceptions
+
+    key = 'version:%s' % endpoint
+    server_range = _get_cached(key)
+    if server_range is None:
+        try:
+            current = client.versions.get_current()
+        except (
+                ks_exceptions.ClientException,
+                nova_exceptions.ClientException,
+        ) as e:
+            # Do not cache the failure, the next command tries again
+            LOG.debug(
+                'Compute API version discovery failed for %s, '
+                'using 2.0: %s',
+                endpoint,
+                e,
+            )
+            return api_versions.APIVersion('2.0')
+        if getattr(current, 'version', None):
+            server_range = [current.min_version, current.version]
+        else:
+            # The server does not support microversions
+            server_range = [None, None]
+        _set_cached(key, server_range)
+
+    min_version, max_version = server_range
+    if not max_version:
+        return api_versions.APIVersion('2.0')
+    max_version = api_versions.APIVersion(max_version)
+    LOG.debug(
+        'Compute API versions supported by %s: %s - %s',
+        endpoint,
+        min_version,
+        max_version.get_string(),
+    )
+    if (
+            min_version and
+            api_versions.APIVersion(min_version) >
+            novaclient.API_MAX_VERSION
+    ):
+        msg = _(
+            "The compute API at %(endpoint)s requires version "
+            "%(min_version)s or later but the installed novaclient "
+            "supports versions up to %(max_version)s"
+        ) % {
+            'endpoint': endpoint,
+            'min_version': min_version,
+            'max_version': novaclient.API_MAX_VERSION.get_string(),
+        }
+        raise exceptions.CommandError(msg)
+    return min(max_version, novaclient.API_MAX_VERSION)
+
+
+def _discover_extensions(version):
+    """Return the novaclient extensions used by the compute client
+
+    Extension discovery scans every module on the Python path, so the
+    names of the modules found are cached and imported directly later.
+    """
+
+    from novaclient import client as nova_client
+    from novaclient import extension
+
+    key = 'extensions:%s' % version.get_string()
+    found = _get_cached(key)
+    if found is not None:
+        try:
+            return [
+                extension.Extension(name, importlib.import_module(module))
+                for name, module in found
+            ]
+        except ImportError:
+            # Installed packages changed, discover again
+            pass
+
+    extensions = [ext for ext in nova_client.discover_extensions(version)
+                  if ext.name == "list_extensions"]
+    _set_cached(
+        key,
+        [[ext.name, ext.module.__name__] for ext in extensions],
+    )
+    return extensions
+
 
 def make_client(instance):
     """Returns a compute service client."""
@@ -54,11 +192,13 @@ def make_client(instance):
         # convert to APIVersion object
         version = api_versions.get_api_version(version)
 
-    if version.is_latest():
+    discover_version = version.is_latest()
+    if discover_version:
         import novaclient
         # NOTE(RuiChen): executing version discovery make sense, but that need
         #                an initialized REST client, it's not available now,
-        #                fallback to use the max version of novaclient side.
+        #                start with the max version of novaclient side and
+        #                negotiate with the server once the client exists.
         version = novaclient.API_MAX_VERSION
 
     LOG.debug('Instantiating compute client for %s', version)
@@ -73,8 +213,7 @@ def make_client(instance):
     # Set client http_log_debug to True if verbosity level is high enough
     http_log_debug = utils.get_effective_log_level() <= logging.DEBUG
 
-    extensions = [ext for ext in nova_client.discover_extensions(version)
-                  if ext.name == "list_extensions"]
+    extensions = _discover_extensions(version)
 
     # Remember interface only if it is set
     kwargs = utils.build_kwargs_dict('endpoint_type', instance.interface)
@@ -89,16 +228,22 @@ def make_client(instance):
         **kwargs
     )
 
+    endpoint = instance.get_endpoint_for_service_type(
+        COMPUTE_API_TYPE,
+        region_name=instance.region_name,
+        interface=instance.interface,
+    )
     client.api = compute_api(
         session=instance.session,
         service_type=COMPUTE_API_TYPE,
-        endpoint=instance.get_endpoint_for_service_type(
-            COMPUTE_API_TYPE,
-            region_name=instance.region_name,
-            interface=instance.interface,
-        )
+        endpoint=endpoint,
     )
 
+    if discover_version:
+        client.api_version = _discover_version(client, endpoint)
+        LOG.debug('Negotiated compute API version %s',
+                  client.api_version.get_string())
+
     return client
 
 
@@ -0,0 +1,483 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Warm-process command server and client shim
+
+``openstack --daemon`` keeps one interpreter alive with the plugins and
+commands loaded and the authenticated ClientManager sessions cached,
+listening on a per-user unix socket.  ``openstack-shim`` forwards its
+argv, environment, working directory and stdin to that server and relays
+stdout, stderr and the exit status back, falling back to running the
+command in-process when no server is listening.
+
+This module only imports the standard library at the top level so the
+shim starts quickly; the shell is imported by the server side only.
+"""
+
+import codecs
+import collections
+import hashlib
+import io
+import json
+import logging
+import os
+import socket
+import struct
+import sys
+import tempfile
+
+
+LOG = logging.getLogger(__name__)
+
+SOCKET_ENV = 'OS_DAEMON_SOCKET'
+
+# Maximum number of distinct ClientManagers kept warm by the server
+MAX_CLIENT_MANAGERS = 8
+
+# Frame types
+FRAME_REQUEST = b'R'
+FRAME_STDOUT = b'O'
+FRAME_STDERR = b'E'
+FRAME_STDIN_READ = b'r'
+FRAME_STDIN_DATA = b'I'
+FRAME_EXIT = b'X'
+
+_HEADER = struct.Struct('!cI')
+_READ_SIZE = 64 * 1024
+
+
+class DaemonUnavailable(Exception):
+    """No command server is listening on the socket"""
+
+
+def get_socket_path():
+    """Return the per-user command server socket path"""
+
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(
+        base,
+        'openstackclient-%d' % os.getuid(),
+        'daemon.sock',
+    )
+
+
+def _recv_exact(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def send_frame(sock, kind, payload=b''):
+    sock.sendall(_HEADER.pack(kind, len(payload)) + payload)
+
+
+def recv_frame(sock):
+    """Read one frame
+
+    :returns: a (kind, payload) tuple, or (None, None) at end of stream
+    """
+
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None, None
+    kind, size = _HEADER.unpack(header)
+    payload = _recv_exact(sock, size) if size else b''
+    if payload is None:
+        return None, None
+    return kind, payload
+
+
+# Client side
+
+def forward(argv, socket_path=None, stdin=None, stdout=None, stderr=None):
+    """Run a command on the command server
+
+    :param list argv:
+        command line arguments, without the program name
+    :param string socket_path:
+        server socket, defaults to get_socket_path()
+    :returns:
+        the command's exit status
+    :raises DaemonUnavailable:
+        if no server accepts the connection
+    """
+
+    stdin = stdin or getattr(sys.stdin, 'buffer', sys.stdin)
+    stdout = stdout or getattr(sys.stdout, 'buffer', sys.stdout)
+    stderr = stderr or getattr(sys.stderr, 'buffer', sys.stderr)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or get_socket_path())
+    except (IOError, OSError) as e:
+        sock.close()
+        raise DaemonUnavailable(str(e))
+
+    try:
+        request = {
+            'argv': list(argv),
+            'env': dict(os.environ),
+            'cwd': os.getcwd(),
+        }
+        send_frame(sock, FRAME_REQUEST, json.dumps(request).encode('utf-8'))
+
+        while True:
+            kind, payload = recv_frame(sock)
+            if kind is None:
+                stderr.write(b'Lost connection to the command server\n')
+                return 1
+            elif kind == FRAME_STDOUT:
+                stdout.write(payload)
+                stdout.flush()
+            elif kind == FRAME_STDERR:
+                stderr.write(payload)
+                stderr.flush()
+            elif kind == FRAME_STDIN_READ:
+                size = struct.unpack('!I', payload)[0]
+                send_frame(sock, FRAME_STDIN_DATA, stdin.read(size) or b'')
+            elif kind == FRAME_EXIT:
+                return json.loads(payload.decode('utf-8'))['status']
+    finally:
+        sock.close()
+
+
+def main(argv=None):
+    """Entry point for the ``openstack-shim`` command"""
+
+    if argv is None:
+        argv = sys.argv[1:]
+    try:
+        return forward(argv)
+    except DaemonUnavailable as e:
+        LOG.debug('Command server not available: %s', e)
+
+    from openstackclient import main as entry
+    return entry.main(argv)
+
+
+# Server side
+
+class _SocketWriter(object):
+    """File-like object sending everything written as frames"""
+
+    encoding = 'utf-8'
+    errors = 'strict'
+    closed = False
+
+    def __init__(self, sock, kind):
+        self._sock = sock
+        self._kind = kind
+
+    @property
+    def buffer(self):
+        return self
+
+    def write(self, data):
+        if not isinstance(data, bytes):
+            data = data.encode(self.encoding)
+        if data:
+            send_frame(self._sock, self._kind, data)
+        return len(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
+
+    def fileno(self):
+        raise io.UnsupportedOperation('fileno')
+
+    def isatty(self):
+        return False
+
+
+class _SocketReader(object):
+    """File-like object reading the client's stdin on demand
+
+    Reads return bytes; use _TextReader for a text stream.
+    """
+
+    encoding = 'utf-8'
+    errors = 'strict'
+    closed = False
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._data = b''
+        self._eof = False
+
+    def _fill(self, size=_READ_SIZE):
+        if self._eof:
+            return False
+        send_frame(self._sock, FRAME_STDIN_READ, struct.pack('!I', size))
+        kind, payload = recv_frame(self._sock)
+        if kind != FRAME_STDIN_DATA or not payload:
+            self._eof = True
+            return False
+        self._data += payload
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            while self._fill():
+                pass
+            data, self._data = self._data, b''
+        else:
+            while len(self._data) < size and self._fill(size):
+                pass
+            data, self._data = self._data[:size], self._data[size:]
+        return data
+
+    def readline(self, size=-1):
+        while b'\n' not in self._data and self._fill():
+            pass
+        end = self._data.find(b'\n') + 1 or len(self._data)
+        if size is not None and size >= 0:
+            end = min(end, size)
+        data, self._data = self._data[:end], self._data[end:]
+        return data
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+    def fileno(self):
+        raise io.UnsupportedOperation('fileno')
+
+    def isatty(self):
+        return False
+
+
+class _TextReader(_SocketReader):
+    """Text view of a _SocketReader, exposed as sys.stdin"""
+
+    def __init__(self, raw):
+        self.buffer = raw
+        self._decoder = codecs.getincrementaldecoder(self.encoding)()
+
+    def read(self, size=-1):
+        data = self.buffer.read(size)
+        return self._decoder.decode(data, final=not data)
+
+    def readline(self, size=-1):
+        data = self.buffer.readline(size)
+        return self._decoder.decode(data, final=not data)
+
+
+class CommandServer(object):
+    """Run forwarded commands in a warm interpreter
+
+    Commands are run one at a time; each one gets a fresh shell, but the
+    loaded plugins and commands stay in memory and ClientManagers (with
+    their sessions, tokens and service catalogs) are reused whenever a
+    command resolves to the same cloud configuration.
+    """
+
+    def __init__(self, socket_path=None, idle_timeout=None):
+        self.socket_path = socket_path or get_socket_path()
+        self.idle_timeout = idle_timeout or None
+        self.client_managers = collections.OrderedDict()
+
+    def get_client_manager(self, key):
+        client_manager = self.client_managers.pop(key, None)
+        if client_manager is not None:
+            self.client_managers[key] = client_manager
+        return client_manager
+
+    def add_client_manager(self, key, client_manager):
+        self.client_managers[key] = client_manager
+        while len(self.client_managers) > MAX_CLIENT_MANAGERS:
+            self.client_managers.popitem(last=False)
+
+    def _bind(self):
+        socket_dir = os.path.dirname(self.socket_path)
+        if socket_dir and not os.path.isdir(socket_dir):
+            os.makedirs(socket_dir, 0o700)
+        if os.path.exists(self.socket_path):
+            # Refuse to take over a socket that is still being served
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except (IOError, OSError):
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(
+                    'A command server is already listening on %s'
+                    % self.socket_path)
+            finally:
+                probe.close()
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(16)
+        return sock
+
+    def _is_same_user(self, conn):
+        peercred = getattr(socket, 'SO_PEERCRED', None)
+        if peercred is None:
+            # Rely on the permissions of the socket and its directory
+            return True
+        creds = struct.Struct('3i')
+        pid, uid, gid = creds.unpack(
+            conn.getsockopt(socket.SOL_SOCKET, peercred, creds.size))
+        return uid == os.getuid()
+
+    def serve_forever(self):
+        """Accept and run commands until idle for idle_timeout seconds"""
+
+        sock = self._bind()
+        sock.settimeout(self.idle_timeout)
+        LOG.info('Command server listening on %s', self.socket_path)
+        try:
+            while True:
+                try:
+                    conn, _addr = sock.accept()
+                except socket.timeout:
+                    LOG.info('Command server idle, exiting')
+                    return 0
+                conn.settimeout(None)
+                try:
+                    if self._is_same_user(conn):
+                        self.handle(conn)
+                    else:
+                        LOG.warning('Rejected connection from another user')
+                except (IOError, OSError) as e:
+                    LOG.debug('Command connection failed: %s', e)
+                finally:
+                    conn.close()
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            sock.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def handle(self, conn):
+        """Run a single forwarded command"""
+
+        kind, payload = recv_frame(conn)
+        if kind != FRAME_REQUEST:
+            return
+        request = json.loads(payload.decode('utf-8'))
+        status = self.run_command(
+            conn,
+            request.get('argv', []),
+            request.get('env', {}),
+            request.get('cwd'),
+        )
+        send_frame(
+            conn,
+            FRAME_EXIT,
+            json.dumps({'status': status}).encode('utf-8'),
+        )
+
+    def run_command(self, conn, argv, env, cwd):
+        """Run argv with the caller's environment and stdio"""
+
+        saved_env = dict(os.environ)
+        saved_cwd = os.getcwd()
+        saved_stdio = (sys.stdin, sys.stdout, sys.stderr)
+        root_logger = logging.getLogger('')
+        saved_handlers = list(root_logger.handlers)
+        saved_level = root_logger.level
+
+        os.environ.clear()
+        os.environ.update(env)
+        sys.stdin = _TextReader(_SocketReader(conn))
+        sys.stdout = _SocketWriter(conn, FRAME_STDOUT)
+        sys.stderr = _SocketWriter(conn, FRAME_STDERR)
+        try:
+            if cwd:
+                os.chdir(cwd)
+            shell = make_warm_shell(self)
+            return shell.run(argv)
+        except SystemExit as e:
+            # argparse exits for --help and usage errors
+            if e.code is None:
+                return 0
+            return e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            sys.stderr.write('%s\n' % e)
+            return 1
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = saved_stdio
+            os.environ.clear()
+            os.environ.update(saved_env)
+            os.chdir(saved_cwd)
+            root_logger.handlers[:] = saved_handlers
+            root_logger.setLevel(saved_level)
+
+
+def client_manager_key(config, api_version):
+    """Hash the settings that identify a reusable ClientManager"""
+
+    data = json.dumps(
+        [config, api_version],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def make_warm_shell(server):
+    """Return a shell that shares ClientManagers through the server"""
+
+    from openstackclient import shell
+
+    class WarmShell(shell.OpenStackShell):
+
+        def initialize_app(self, argv):
+            super(WarmShell, self).initialize_app(argv)
+
+            key = client_manager_key(self.cloud.config, self.api_version)
+            client_manager = server.get_client_manager(key)
+            if client_manager is not None:
+                self.log.debug('Reusing warm client manager')
+                self.client_manager = client_manager
+            else:
+                server.add_client_manager(key, self.client_manager)
+
+        def interact(self):
+            if self.options.daemon:
+                self.stderr.write('The command server is already running\n')
+                return 1
+            return super(WarmShell, self).interact()
+
+    return WarmShell()
+
+
+def serve(socket_path=None, idle_timeout=None):
+    """Run the command server in the foreground"""
+
+    return CommandServer(
+        socket_path=socket_path,
+        idle_timeout=idle_timeout,
+    ).serve_forever()
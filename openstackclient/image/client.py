@@ -51,11 +51,11 @@ def make_client(instance):
         interface=instance.interface,
     )
 
+    # Use the shared session so glanceclient reuses its connections
     client = image_client(
         endpoint,
-        token=instance.auth.get_token(instance.session),
-        cacert=instance.cacert,
-        insecure=not instance.verify,
+        session=instance.session,
+        endpoint_override=endpoint,
     )
 
     # Create the low-level API
@@ -27,6 +27,7 @@ from osc_lib.command import command
 from osc_lib import utils
 import six
 
+from openstackclient.api import pagination
 from openstackclient.api import utils as api_utils
 from openstackclient.i18n import _
 
@@ -340,7 +341,8 @@ class ListImage(command.Lister):
             '--property',
             metavar='<key=value>',
             action=parseractions.KeyValueAction,
-            help=_('Filter output based on property'),
+            help=_('Filter output based on property '
+                   '(repeat option to filter on multiple properties)'),
         )
         parser.add_argument(
             '--long',
@@ -412,29 +414,25 @@ class ListImage(command.Lister):
             columns = ("ID", "Name", "Status")
             column_headers = columns
 
-        # List of image data received
-        data = []
-        # No pages received yet, so start the page marker at None.
-        marker = None
-        while True:
-            page = image_client.api.image_list(marker=marker, **kwargs)
-            if not page:
-                break
-            data.extend(page)
-            # Set the marker to the id of the last item we received
-            marker = page[-1]['id']
+        # List of image data received, fetching the next page in the
+        # background
+        data = pagination.paginate(
+            lambda marker: image_client.api.image_list(
+                marker=marker, **kwargs),
+        )
 
         if parsed_args.property:
-            # NOTE(dtroyer): coerce to a list to subscript it in py3
-            attr, value = list(parsed_args.property.items())[0]
-            api_utils.simple_filter(
+            # Filter the listing as it is consumed
+            data = api_utils.filter_items(
                 data,
-                attr=attr,
-                value=value,
+                parsed_args.property,
                 property_field='properties',
             )
 
-        data = utils.sort_items(data, parsed_args.sort)
+        if parsed_args.sort:
+            # Sorting needs the whole listing, only the matching items are
+            # kept
+            data = utils.sort_items(data, parsed_args.sort)
 
         return (
             column_headers,
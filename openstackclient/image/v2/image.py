@@ -25,6 +25,7 @@ from osc_lib import exceptions
 from osc_lib import utils
 import six
 
+from openstackclient.api import pagination
 from openstackclient.api import utils as api_utils
 from openstackclient.i18n import _
 from openstackclient.identity import common
@@ -457,7 +458,8 @@ class ListImage(command.Lister):
             '--property',
             metavar='<key=value>',
             action=parseractions.KeyValueAction,
-            help=_('Filter output based on property'),
+            help=_('Filter output based on property '
+                   '(repeat option to filter on multiple properties)'),
         )
         parser.add_argument(
             '--name',
@@ -574,27 +576,24 @@ class ListImage(command.Lister):
         if 'marker' in kwargs:
             data = image_client.api.image_list(**kwargs)
         else:
-            # No pages received yet, so start the page marker at None.
-            marker = None
-            while True:
-                page = image_client.api.image_list(marker=marker, **kwargs)
-                if not page:
-                    break
-                data.extend(page)
-                # Set the marker to the id of the last item we received
-                marker = page[-1]['id']
+            # Fetch the next page in the background
+            data = pagination.paginate(
+                lambda marker: image_client.api.image_list(
+                    marker=marker, **kwargs),
+            )
 
         if parsed_args.property:
-            # NOTE(dtroyer): coerce to a list to subscript it in py3
-            attr, value = list(parsed_args.property.items())[0]
-            api_utils.simple_filter(
+            # Filter the listing as it is consumed
+            data = api_utils.filter_items(
                 data,
-                attr=attr,
-                value=value,
+                parsed_args.property,
                 property_field='properties',
             )
 
-        data = utils.sort_items(data, parsed_args.sort, str)
+        if parsed_args.sort:
+            # Sorting needs the whole listing, only the matching items are
+            # kept
+            data = utils.sort_items(data, parsed_args.sort, str)
 
         return (
             column_headers,
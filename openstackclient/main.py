@@ -0,0 +1,36 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Entry point of the openstack command
+
+Only the startup profiler is imported before the shell so that
+``--profile-startup`` can time the import of the shell and everything it
+loads.
+"""
+
+import sys
+
+from openstackclient.common import startup
+
+
+def main(argv=None):
+    # Start profiling before the shell and its dependencies are imported
+    if startup.requested(sys.argv[1:] if argv is None else argv):
+        startup.enable()
+
+    from openstackclient import shell
+    return shell.main(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -58,3 +58,39 @@ def get_osc_show_columns_for_sdk_resource(
         new_column = attr_map[column] if column in attr_map else column
         attr_columns.append(new_column)
     return tuple(sorted_display_columns), tuple(attr_columns)
+
+
+def get_fields_for_columns(resource_class, columns, attrs, required=('id',)):
+    """Get the API fields needed to display the selected columns
+
+    Listing APIs supporting field selection can then return only the
+    attributes shown with ``-c``/``--column`` instead of whole resources.
+
+    :param resource_class: The SDK resource class of the listed items
+    :param columns: The attribute names of all of the command's columns
+    :param attrs: The attribute names of the selected columns, as returned
+        by osc_lib.utils.calculate_header_and_attrs()
+    :param required: The API fields always requested, such as the one
+        used as the pagination marker
+
+    :returns: A list of API field names, or None if all of the columns are
+              selected or a column is not an API field
+    """
+
+    selected = [attr for attr in attrs if attr in columns]
+    if not selected or set(selected) == set(columns):
+        return None
+
+    # The SDK body mapping is from API field name to attribute name
+    field_names = dict(
+        (attr, field)
+        for field, attr in six.iteritems(resource_class._body_mapping())
+    )
+    fields = list(required)
+    for attr in selected:
+        field = field_names.get(attr)
+        if field is None:
+            return None
+        if field not in fields:
+            fields.append(field)
+    return fields
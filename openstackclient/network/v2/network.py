@@ -13,6 +13,7 @@
 
 """Network action implementations"""
 
+from openstack.network.v2 import network as _network
 from osc_lib.command import command
 from osc_lib import utils
 
@@ -565,11 +566,19 @@ class ListNetwork(common.NetworkAndComputeLister):
 
         _tag.get_tag_filtering_args(parsed_args, args)
 
+        headers, attrs = utils.calculate_header_and_attrs(
+            column_headers, columns, parsed_args)
+        # Only fetch the selected columns
+        fields = sdk_utils.get_fields_for_columns(
+            _network.Network, columns, attrs)
+        if fields:
+            args['fields'] = fields
+
         data = client.networks(**args)
 
-        return (column_headers,
+        return (headers,
                 (utils.get_item_properties(
-                    s, columns,
+                    s, attrs,
                     formatters=_formatters,
                 ) for s in data))
 
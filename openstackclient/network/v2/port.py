@@ -18,6 +18,7 @@ import copy
 import json
 import logging
 
+from openstack.network.v2 import port as _port
 from osc_lib.cli import parseractions
 from osc_lib.command import command
 from osc_lib import exceptions
@@ -606,10 +607,15 @@ class ListPort(command.Lister):
 
         _tag.get_tag_filtering_args(parsed_args, filters)
 
-        data = network_client.ports(**filters)
-
         headers, attrs = utils.calculate_header_and_attrs(
             column_headers, columns, parsed_args)
+        # Only fetch the selected columns
+        fields = sdk_utils.get_fields_for_columns(_port.Port, columns, attrs)
+        if fields:
+            filters['fields'] = fields
+
+        data = network_client.ports(**filters)
+
         return (headers,
                 (utils.get_item_properties(
                     s, attrs,
@@ -608,19 +608,11 @@ class ShowSecurityGroupRule(common.NetworkAndComputeShowOne):
 
     def take_action_compute(self, client, parsed_args):
         # NOTE(rtheis): Unfortunately, compute does not have an API
-        # to get or list security group rules so parse through the
-        # security groups to find all accessible rules in search of
-        # the requested rule.
-        obj = None
-        security_group_rules = []
-        for security_group in client.api.security_group_list():
-            security_group_rules.extend(security_group['rules'])
-        for security_group_rule in security_group_rules:
-            if parsed_args.rule == str(security_group_rule.get('id')):
-                obj = security_group_rule
-                break
-
-        if obj is None:
+        # to get or list security group rules so the API searches the
+        # rules of all accessible security groups.
+        try:
+            obj = client.api.security_group_rule_find(parsed_args.rule)
+        except exceptions.NotFound:
             msg = _("Could not find security group rule "
                     "with ID '%s'") % parsed_args.rule
             raise exceptions.CommandError(msg)
@@ -16,6 +16,7 @@
 import copy
 import logging
 
+from openstack.network.v2 import subnet as _subnet
 from osc_lib.cli import parseractions
 from osc_lib.command import command
 from osc_lib import exceptions
@@ -502,7 +503,6 @@ class ListSubnet(command.Lister):
         if parsed_args.subnet_range:
             filters['cidr'] = parsed_args.subnet_range
         _tag.get_tag_filtering_args(parsed_args, filters)
-        data = network_client.subnets(**filters)
 
         headers = ('ID', 'Name', 'Network', 'Subnet')
         columns = ('id', 'name', 'network_id', 'cidr')
@@ -514,9 +514,19 @@ class ListSubnet(command.Lister):
                         'allocation_pools', 'host_routes', 'ip_version',
                         'gateway_ip', 'service_types', 'tags')
 
+        headers, attrs = utils.calculate_header_and_attrs(
+            headers, columns, parsed_args)
+        # Only fetch the selected columns
+        fields = sdk_utils.get_fields_for_columns(
+            _subnet.Subnet, columns, attrs)
+        if fields:
+            filters['fields'] = fields
+
+        data = network_client.subnets(**filters)
+
         return (headers,
                 (utils.get_item_properties(
-                    s, columns,
+                    s, attrs,
                     formatters=_formatters,
                 ) for s in data))
 
@@ -22,7 +22,10 @@ from osc_lib.command import command
 from osc_lib import utils
 import six
 
+from openstackclient.api import utils as api_utils
+from openstackclient.common import httppool
 from openstackclient.i18n import _
+from openstackclient.object.v1 import object as object_cmds
 
 
 LOG = logging.getLogger(__name__)
@@ -73,6 +76,15 @@ class DeleteContainer(command.Command):
             default=False,
             help=_('Recursively delete objects and container'),
         )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=object_cmds.positive_int,
+            default=api_utils.DEFAULT_CONCURRENCY,
+            help=_('Number of objects deleted at once with --recursive, '
+                   'when the cluster does not support bulk delete '
+                   '(default: %d)') % api_utils.DEFAULT_CONCURRENCY,
+        )
         parser.add_argument(
             'containers',
             metavar='<container>',
@@ -82,17 +94,18 @@ class DeleteContainer(command.Command):
         return parser
 
     def take_action(self, parsed_args):
+        object_client = self.app.client_manager.object_store
+        if parsed_args.recursive:
+            httppool.ensure_pool_maxsize(
+                object_client.session, parsed_args.concurrency)
 
         for container in parsed_args.containers:
             if parsed_args.recursive:
-                objs = self.app.client_manager.object_store.object_list(
-                    container=container)
-                for obj in objs:
-                    self.app.client_manager.object_store.object_delete(
-                        container=container,
-                        object=obj['name'],
-                    )
-            self.app.client_manager.object_store.container_delete(
+                object_client.object_delete_all(
+                    container=container,
+                    concurrency=parsed_args.concurrency,
+                )
+            object_client.container_delete(
                 container=container,
             )
 
@@ -153,12 +166,13 @@ class ListContainer(command.Lister):
             kwargs['end_marker'] = parsed_args.end_marker
         if parsed_args.limit:
             kwargs['limit'] = parsed_args.limit
-        if parsed_args.all:
-            kwargs['full_listing'] = True
 
-        data = self.app.client_manager.object_store.container_list(
-            **kwargs
-        )
+        object_client = self.app.client_manager.object_store
+        if parsed_args.all:
+            # The rows of each page are output as soon as it arrives
+            data = object_client.container_iter(**kwargs)
+        else:
+            data = object_client.container_list(**kwargs)
 
         return (columns,
                 (utils.get_dict_properties(
@@ -177,12 +191,38 @@ class SaveContainer(command.Command):
             metavar='<container>',
             help=_('Container to save'),
         )
+        parser.add_argument(
+            '--prefix',
+            metavar='<prefix>',
+            help=_('Only save the objects whose name starts with <prefix>'),
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=object_cmds.positive_int,
+            default=api_utils.DEFAULT_CONCURRENCY,
+            help=_('Number of objects downloaded at once (default: %d)') %
+            api_utils.DEFAULT_CONCURRENCY,
+        )
+        parser.add_argument(
+            '--skip-identical',
+            action='store_true',
+            help=_('Do not download objects already saved locally with the '
+                   'same size and MD5'),
+        )
         return parser
 
     def take_action(self, parsed_args):
-        self.app.client_manager.object_store.container_save(
+        object_client = self.app.client_manager.object_store
+        httppool.ensure_pool_maxsize(
+            object_client.session, parsed_args.concurrency)
+        counts = object_client.container_save(
             container=parsed_args.container,
+            prefix=parsed_args.prefix,
+            concurrency=parsed_args.concurrency,
+            skip_identical=parsed_args.skip_identical,
         )
+        LOG.info(_('Saved %(saved)d objects, skipped %(skipped)d'), counts)
 
 
 class SetContainer(command.Command):
@@ -15,7 +15,10 @@
 
 """Object v1 action implementations"""
 
+import argparse
 import logging
+import os
+import time
 
 from osc_lib.cli import parseractions
 from osc_lib.command import command
@@ -23,11 +26,49 @@ from osc_lib import exceptions
 from osc_lib import utils
 import six
 
+from openstackclient.api import utils as api_utils
+from openstackclient.common import httppool
 from openstackclient.i18n import _
 
 
 LOG = logging.getLogger(__name__)
 
+_SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+# Objects larger than this are downloaded as concurrent byte ranges
+DEFAULT_RANGE_SIZE = 32 * 1024 ** 2
+
+
+def _size(value):
+    """Parse a size in bytes, with an optional K, M or G suffix"""
+
+    text = value.strip().upper()
+    multiplier = 1
+    if text[-1:] in _SIZE_UNITS:
+        multiplier = _SIZE_UNITS[text[-1]]
+        text = text[:-1]
+    try:
+        size = int(text) * multiplier
+    except ValueError:
+        size = 0
+    if size < 1:
+        raise argparse.ArgumentTypeError(
+            _("%r is not a positive size") % value)
+    return size
+
+
+def positive_int(value):
+    """Parse a count of at least one"""
+
+    try:
+        count = int(value)
+    except ValueError:
+        count = 0
+    if count < 1:
+        raise argparse.ArgumentTypeError(
+            _("%r is not a positive integer") % value)
+    return count
+
 
 class CreateObject(command.Lister):
     _description = _("Upload object to container")
@@ -51,6 +92,29 @@ class CreateObject(command.Lister):
             help=_('Upload a file and rename it. '
                    'Can only be used when uploading a single object')
         )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=positive_int,
+            default=api_utils.DEFAULT_CONCURRENCY,
+            help=_('Number of objects, or segments of an object, uploaded '
+                   'at once (default: %d)') % api_utils.DEFAULT_CONCURRENCY,
+        )
+        parser.add_argument(
+            '--segment-size',
+            metavar='<size>',
+            type=_size,
+            help=_('Upload files larger than <size> bytes (K, M or G '
+                   'suffixes are accepted) as Static Large Objects made of '
+                   'segments of <size> bytes, needed above the maximum '
+                   'object size of the cluster (5G by default)'),
+        )
+        parser.add_argument(
+            '--segment-container',
+            metavar='<segment-container>',
+            help=_('Container for the segments of large objects '
+                   '(default: <container>_segments)'),
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -59,26 +123,83 @@ class CreateObject(command.Lister):
                 msg = _('Attempting to upload multiple objects and '
                         'using --name is not permitted')
                 raise exceptions.CommandError(msg)
-        results = []
         for obj in parsed_args.objects:
             if len(obj) > 1024:
                 LOG.warning(
                     _('Object name is %s characters long, default limit'
                       ' is 1024'), len(obj))
-            data = self.app.client_manager.object_store.object_create(
+
+        object_client = self.app.client_manager.object_store
+        concurrency = min(parsed_args.concurrency, len(parsed_args.objects))
+        maxsize = concurrency
+        if parsed_args.segment_size:
+            # Each file uploads its segments concurrently
+            maxsize *= parsed_args.concurrency
+        httppool.ensure_pool_maxsize(object_client.session, maxsize)
+
+        def upload(obj):
+            return object_client.object_create(
                 container=parsed_args.container,
                 object=obj,
                 name=parsed_args.name,
+                segment_size=parsed_args.segment_size,
+                segment_container=parsed_args.segment_container,
+                concurrency=parsed_args.concurrency,
             )
-            results.append(data)
+
+        start = time.time()
+        results = []
+        self._failed = 0
+        uploaded_bytes = 0
+        for obj, call in api_utils.map_concurrently(
+                upload, parsed_args.objects, concurrency=concurrency):
+            try:
+                results.append(call.get())
+                uploaded_bytes += os.path.getsize(obj)
+            except Exception as e:
+                self._failed += 1
+                LOG.error(_("Failed to upload object '%(object)s': %(e)s"),
+                          {'object': obj, 'e': e})
+                results.append({
+                    'object': parsed_args.name or obj,
+                    'container': parsed_args.container,
+                    'error': six.text_type(e),
+                })
+        uploaded = len(results) - self._failed
+        elapsed = max(time.time() - start, 0.001)
+        LOG.info(
+            _('Uploaded %(count)d objects, %(bytes)d bytes in %(time).2fs '
+              '(%(rate).1f objects/s, %(bytes_rate).0f bytes/s)'),
+            {
+                'count': uploaded,
+                'bytes': uploaded_bytes,
+                'time': elapsed,
+                'rate': uploaded / elapsed,
+                'bytes_rate': uploaded_bytes / elapsed,
+            },
+        )
 
         columns = ("object", "container", "etag")
+        if self._failed:
+            # The failed uploads are marked by their error
+            columns += ("error",)
         return (columns,
                 (utils.get_dict_properties(
                     s, columns,
                     formatters={},
                 ) for s in results))
 
+    def run(self, parsed_args):
+        self._failed = 0
+        ret = super(CreateObject, self).run(parsed_args)
+        if self._failed:
+            # Exit with an error once every row was displayed
+            total = len(parsed_args.objects)
+            msg = (_("%(result)s of %(total)s objects failed "
+                     "to upload.") % {'result': self._failed, 'total': total})
+            raise exceptions.CommandError(msg)
+        return ret
+
 
 class DeleteObject(command.Command):
     _description = _("Delete object from container")
@@ -181,13 +302,16 @@ class ListObject(command.Lister):
             kwargs['end_marker'] = parsed_args.end_marker
         if parsed_args.limit:
             kwargs['limit'] = parsed_args.limit
-        if parsed_args.all:
-            kwargs['full_listing'] = True
 
-        data = self.app.client_manager.object_store.object_list(
-            container=parsed_args.container,
-            **kwargs
-        )
+        object_client = self.app.client_manager.object_store
+        if parsed_args.all:
+            # The rows of each page are output as soon as it arrives
+            data = object_client.object_iter(parsed_args.container, **kwargs)
+        else:
+            data = object_client.object_list(
+                container=parsed_args.container,
+                **kwargs
+            )
 
         return (columns,
                 (utils.get_dict_properties(
@@ -217,13 +341,35 @@ class SaveObject(command.Command):
             metavar="<object>",
             help=_("Object to save"),
         )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=positive_int,
+            default=api_utils.DEFAULT_CONCURRENCY,
+            help=_('Number of byte ranges of a large object downloaded at '
+                   'once (default: %d)') % api_utils.DEFAULT_CONCURRENCY,
+        )
+        parser.add_argument(
+            '--range-size',
+            metavar='<size>',
+            type=_size,
+            default=DEFAULT_RANGE_SIZE,
+            help=_('Download objects larger than <size> bytes (K, M or G '
+                   'suffixes are accepted) as concurrent byte ranges of '
+                   '<size> bytes (default: 32M)'),
+        )
         return parser
 
     def take_action(self, parsed_args):
-        self.app.client_manager.object_store.object_save(
+        object_client = self.app.client_manager.object_store
+        httppool.ensure_pool_maxsize(
+            object_client.session, parsed_args.concurrency)
+        object_client.object_save(
             container=parsed_args.container,
             object=parsed_args.object,
             file=parsed_args.file,
+            range_size=parsed_args.range_size,
+            concurrency=parsed_args.concurrency,
         )
 
 
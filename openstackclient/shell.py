@@ -16,17 +16,29 @@
 
 """Command-line interface to the OpenStack APIs"""
 
+import functools
 import locale
 import sys
 
 from osc_lib.api import auth
 from osc_lib import shell
+from osc_lib import utils
+from oslo_utils import strutils
 import six
 
 import openstackclient
+from openstackclient.api import httpcache
+from openstackclient.api import retry
 from openstackclient.common import client_config as cloud_config
 from openstackclient.common import clientmanager
 from openstackclient.common import commandmanager
+from openstackclient.common import compression
+from openstackclient.common import deferred_options
+from openstackclient.common import httppool
+from openstackclient.common import startup
+from openstackclient.common import trace
+from openstackclient import daemon
+from openstackclient.i18n import _
 
 
 DEFAULT_DOMAIN = 'default'
@@ -48,13 +60,201 @@ class OpenStackShell(shell.OpenStackShell):
         self.verify = True
 
     def build_option_parser(self, description, version):
-        parser = super(OpenStackShell, self).build_option_parser(
-            description,
-            version)
-        parser = clientmanager.build_plugin_option_parser(parser)
-        parser = auth.build_auth_plugins_option_parser(parser)
+        with startup.phase('option parser'):
+            parser = super(OpenStackShell, self).build_option_parser(
+                description,
+                version)
+        parser.add_argument(
+            '--os-auth-cache',
+            dest='auth_cache',
+            action='store_true',
+            default=strutils.bool_from_string(utils.env('OS_AUTH_CACHE')),
+            help=_("Reuse the token and service catalog of a previous "
+                   "command with the same credentials until shortly "
+                   "before the token expires (Env: OS_AUTH_CACHE)"),
+        )
+        parser.add_argument(
+            '--os-http-cache',
+            dest='http_cache',
+            action='store_true',
+            default=strutils.bool_from_string(utils.env('OS_HTTP_CACHE')),
+            help=_("Keep API responses that carry an ETag or Last-Modified "
+                   "header on disk and reuse them in later commands when "
+                   "the server reports them unchanged (Env: OS_HTTP_CACHE)"),
+        )
+        parser.add_argument(
+            '--os-http-pool-connections',
+            metavar='<count>',
+            dest='http_pool_connections',
+            type=int,
+            default=utils.env('OS_HTTP_POOL_CONNECTIONS') or None,
+            help=_("Number of hosts to keep a connection pool for, "
+                   "default=%s (Env: OS_HTTP_POOL_CONNECTIONS)") %
+            httppool.DEFAULT_POOL_CONNECTIONS,
+        )
+        parser.add_argument(
+            '--os-http-pool-maxsize',
+            metavar='<count>',
+            dest='http_pool_maxsize',
+            type=int,
+            default=utils.env('OS_HTTP_POOL_MAXSIZE') or None,
+            help=_("Number of connections to keep open to each host, "
+                   "default=%s (Env: OS_HTTP_POOL_MAXSIZE)") %
+            httppool.DEFAULT_POOL_MAXSIZE,
+        )
+        parser.add_argument(
+            '--os-http-retries',
+            metavar='<count>',
+            dest='http_retries',
+            type=int,
+            default=utils.env('OS_HTTP_RETRIES') or None,
+            help=_("Number of times to retry a request rate limited by the "
+                   "server (429) or, for idempotent requests, failed with a "
+                   "connection error or a 502, 503 or 504 status, 0 "
+                   "disables retrying, default=%s (Env: OS_HTTP_RETRIES)") %
+            retry.DEFAULT_MAX_RETRIES,
+        )
+        parser.add_argument(
+            '--os-http-retry-max-time',
+            metavar='<seconds>',
+            dest='http_retry_max_time',
+            type=float,
+            default=utils.env('OS_HTTP_RETRY_MAX_TIME') or None,
+            help=_("Stop retrying a request <seconds> after it was first "
+                   "sent, default=%s (Env: OS_HTTP_RETRY_MAX_TIME)") %
+            retry.DEFAULT_MAX_TIME,
+        )
+        parser.add_argument(
+            '--os-http-rate-limit',
+            metavar='<requests-per-second>',
+            dest='http_rate_limit',
+            type=float,
+            default=utils.env('OS_HTTP_RATE_LIMIT') or None,
+            help=_("Send at most <requests-per-second> requests per second, "
+                   "default=unlimited (Env: OS_HTTP_RATE_LIMIT)"),
+        )
+        parser.add_argument(
+            '--os-http-compression',
+            metavar='<mode>',
+            dest='http_compression',
+            choices=sorted(compression.MODES),
+            default=utils.env('OS_HTTP_COMPRESSION') or None,
+            help=_("Ask for gzip compressed responses ('gzip', default) or "
+                   "uncompressed responses ('identity') "
+                   "(Env: OS_HTTP_COMPRESSION)"),
+        )
+        parser.add_argument(
+            '--http-compression-report',
+            action='store_true',
+            default=False,
+            help=_("Print the number of bytes saved by response "
+                   "compression to stderr"),
+        )
+        parser.add_argument(
+            '--daemon',
+            action='store_true',
+            default=False,
+            help=_("Instead of entering interactive mode, serve commands "
+                   "forwarded by 'openstack-shim' from a warm process"),
+        )
+        parser.add_argument(
+            '--daemon-socket',
+            metavar='<path>',
+            default=utils.env(daemon.SOCKET_ENV),
+            help=_("Unix socket for the command server "
+                   "(Env: OS_DAEMON_SOCKET)"),
+        )
+        parser.add_argument(
+            '--daemon-idle-timeout',
+            metavar='<seconds>',
+            type=int,
+            default=0,
+            help=_("Stop the command server after <seconds> without "
+                   "a command (default: never)"),
+        )
+        parser.add_argument(
+            '--profile-startup',
+            action='store_true',
+            default=False,
+            help=_("Print the time spent in each startup phase and "
+                   "importing each module to stderr"),
+        )
+        parser.add_argument(
+            '--profile-startup-file',
+            metavar='<file>',
+            help=_("Also write the startup profile as JSON to <file>, "
+                   "'-' writes it to stderr instead of the table "
+                   "(implies --profile-startup)"),
+        )
+        parser.add_argument(
+            '--trace-file',
+            metavar='<file>',
+            help=_("Write the HTTP requests and command phases to <file> "
+                   "as Chrome trace_event JSON, viewable with "
+                   "chrome://tracing or Perfetto"),
+        )
+
+        # The plugin and auth plugin options are only added when needed
+        self.deferred_options = deferred_options.DeferredOptions()
+        for mod in clientmanager.PLUGIN_MODULES:
+            self.deferred_options.add_group(
+                'plugin ' + mod.API_NAME,
+                functools.partial(self._build_plugin_options, mod=mod),
+            )
+        self.deferred_options.add_group('auth', self._build_auth_options)
+        with startup.phase('deferred options'):
+            self.deferred_options.build(parser)
         return parser
 
+    @staticmethod
+    def _build_plugin_options(parser, mod):
+        with startup.phase('plugin options'):
+            return clientmanager.build_plugin_option_parser(parser, [mod])
+
+    @staticmethod
+    def _build_auth_options(parser):
+        with startup.phase('auth options'):
+            return auth.build_auth_plugins_option_parser(parser)
+
+    def run(self, argv):
+        try:
+            self.deferred_options.materialize(self.parser, argv)
+            return super(OpenStackShell, self).run(argv)
+        finally:
+            startup.report(
+                self.stderr,
+                getattr(self.options, 'profile_startup_file', None),
+            )
+            # A warm process runs further commands
+            startup.disable()
+            compression.report(self.stderr)
+            compression.disable_report()
+            if trace.is_enabled():
+                self._add_trace_endpoints()
+                trace.write(getattr(self.options, 'trace_file', None))
+                trace.disable()
+
+    def _add_trace_endpoints(self):
+        """Name the services of the traced requests from the catalog"""
+
+        cloud = getattr(self, 'cloud', None)
+        if cloud is not None:
+            trace.add_endpoint(
+                cloud.config.get('auth', {}).get('auth_url'),
+                'identity',
+            )
+        # Do not authenticate just to get the catalog
+        auth_ref = getattr(self.client_manager, '_auth_ref', None)
+        if auth_ref is None:
+            return
+        try:
+            endpoints = auth_ref.service_catalog.get_endpoints_data()
+        except (AttributeError, KeyError, TypeError):
+            return
+        for service_type, service_endpoints in endpoints.items():
+            for endpoint in service_endpoints:
+                trace.add_endpoint(endpoint.url, service_type)
+
     def _final_defaults(self):
         super(OpenStackShell, self)._final_defaults()
 
@@ -70,34 +270,28 @@ class OpenStackShell(shell.OpenStackShell):
 
         osc-lib has no opinion on what plugins should be loaded
         """
+        with startup.phase('plugin import'):
+            self._load_plugin_modules()
+
+    def _load_plugin_modules(self):
         # Loop through extensions to get API versions
         for mod in clientmanager.PLUGIN_MODULES:
-            default_version = getattr(mod, 'DEFAULT_API_VERSION', None)
+            settings = mod.get_settings()
+            if settings is None:
+                continue
+            default_version = settings['DEFAULT_API_VERSION']
             # Only replace the first instance of "os", some service names will
             # have "os" in their name, like: "antiddos"
-            option = mod.API_VERSION_OPTION.replace('os_', '', 1)
+            option = settings['API_VERSION_OPTION'].replace('os_', '', 1)
             version_opt = str(self.cloud.config.get(option, default_version))
             if version_opt:
                 api = mod.API_NAME
                 self.api_version[api] = version_opt
 
-                # Add a plugin interface to let the module validate the version
-                # requested by the user
-                skip_old_check = False
-                mod_check_api_version = getattr(mod, 'check_api_version', None)
-                if mod_check_api_version:
-                    # this throws an exception if invalid
-                    skip_old_check = mod_check_api_version(version_opt)
-
-                mod_versions = getattr(mod, 'API_VERSIONS', None)
-                if not skip_old_check and mod_versions:
-                    if version_opt not in mod_versions:
-                        sorted_versions = sorted(
-                            mod.API_VERSIONS.keys(),
-                            key=lambda s: list(map(int, s.split('.'))))
-                        self.log.warning(
-                            "%s version %s is not in supported versions: %s"
-                            % (api, version_opt, ', '.join(sorted_versions)))
+                # Validating the version may require importing the plugin's
+                # client library, so wait until the plugin is actually used
+                mod.set_version_check(functools.partial(
+                    self._check_api_version, mod, version_opt))
 
                 # Command groups deal only with major versions
                 version = '.v' + version_opt.replace('.', '_').split('_')[0]
@@ -108,11 +302,36 @@ class OpenStackShell(shell.OpenStackShell):
                     {'name': api, 'version': version_opt, 'group': cmd_group}
                 )
 
+    def _check_api_version(self, mod, version_opt):
+        """Validate the API version requested for a plugin"""
+
+        # Add a plugin interface to let the module validate the version
+        # requested by the user
+        skip_old_check = False
+        mod_check_api_version = getattr(mod, 'check_api_version', None)
+        if mod_check_api_version:
+            # this throws an exception if invalid
+            skip_old_check = mod_check_api_version(version_opt)
+
+        mod_versions = getattr(mod, 'API_VERSIONS', None)
+        if not skip_old_check and mod_versions:
+            if version_opt not in mod_versions:
+                sorted_versions = sorted(
+                    mod.API_VERSIONS.keys(),
+                    key=lambda s: list(map(int, s.split('.'))))
+                self.log.warning(
+                    "%s version %s is not in supported versions: %s"
+                    % (mod.API_NAME, version_opt, ', '.join(sorted_versions)))
+
     def _load_commands(self):
         """Load commands via cliff/stevedore
 
         osc-lib has no opinion on what commands should be loaded
         """
+        with startup.phase('command loading'):
+            self._add_command_groups()
+
+    def _add_command_groups(self):
         # Commands that span multiple APIs
         self.command_manager.add_command_group(
             'openstack.common')
@@ -130,7 +349,42 @@ class OpenStackShell(shell.OpenStackShell):
         self.command_manager.add_command_group(
             'openstack.extension')
 
+    def run_subcommand(self, argv):
+        # Responses cached in memory only live for one command
+        httpcache.start_run()
+        with startup.phase('command'):
+            return super(OpenStackShell, self).run_subcommand(argv)
+
+    def clean_up(self, cmd, result, err):
+        if self.client_manager is not None:
+            if err is None:
+                self.client_manager.save_auth_cache()
+            elif 401 in (
+                    getattr(err, 'http_status', None),
+                    getattr(err, 'code', None),
+            ):
+                self.client_manager.invalidate_auth_cache()
+        return super(OpenStackShell, self).clean_up(cmd, result, err)
+
+    def interact(self):
+        if self.options.daemon:
+            return daemon.serve(
+                socket_path=self.options.daemon_socket,
+                idle_timeout=self.options.daemon_idle_timeout,
+            )
+        return super(OpenStackShell, self).interact()
+
     def initialize_app(self, argv):
+        # main() starts profiling and tracing earlier, but commands run by
+        # a warm process only get here
+        if self.options.profile_startup or self.options.profile_startup_file:
+            startup.enable()
+        if self.options.trace_file:
+            trace.enable()
+        with startup.phase('initialize'):
+            self._initialize_app(argv)
+
+    def _initialize_app(self, argv):
         super(OpenStackShell, self).initialize_app(argv)
 
         # Argument precedence is really broken in multiple places
@@ -140,28 +394,31 @@ class OpenStackShell(shell.OpenStackShell):
 
         # First, throw away what has already been done with o-c-c and
         # use our own.
-        try:
-            self.cloud_config = cloud_config.OSC_Config(
-                override_defaults={
-                    'interface': None,
-                    'auth_type': self._auth_type,
-                },
+        with startup.phase('cloud config'):
+            try:
+                self.cloud_config = cloud_config.OSC_Config(
+                    override_defaults={
+                        'interface': None,
+                        'auth_type': self._auth_type,
+                    },
+                )
+            except (IOError, OSError):
+                self.log.critical(
+                    "Could not read clouds.yaml configuration file")
+                self.print_help_if_requested()
+                raise
+
+            if not self.options.debug:
+                self.options.debug = None
+
+            # NOTE(dtroyer): Need to do this with validate=False to defer the
+            #                auth plugin handling to
+            #                ClientManager.setup_auth()
+            self.cloud = self.cloud_config.get_one_cloud(
+                cloud=self.options.cloud,
+                argparse=self.options,
+                validate=False,
             )
-        except (IOError, OSError):
-            self.log.critical("Could not read clouds.yaml configuration file")
-            self.print_help_if_requested()
-            raise
-
-        if not self.options.debug:
-            self.options.debug = None
-
-        # NOTE(dtroyer): Need to do this with validate=False to defer the
-        #                auth plugin handling to ClientManager.setup_auth()
-        self.cloud = self.cloud_config.get_one_cloud(
-            cloud=self.options.cloud,
-            argparse=self.options,
-            validate=False,
-        )
 
         # Then, re-create the client_manager with the correct arguments
         self.client_manager = clientmanager.ClientManager(
@@ -194,6 +451,21 @@ class OpenStackShell(shell.OpenStackShell):
         # Push the updated args into ClientManager
         self.client_manager._cli_options = self.cloud
 
+        if self.cloud.config.get('http_cache'):
+            httpcache.enable_persistent()
+        else:
+            httpcache.disable_persistent()
+
+        if self.options.http_compression_report:
+            compression.enable_report()
+
+        if trace.is_enabled():
+            # Listings are often fetched while the output is formatted
+            cmd.take_action = trace.traced('take action')(cmd.take_action)
+            if hasattr(cmd, 'produce_output'):
+                cmd.produce_output = trace.traced('format output')(
+                    cmd.produce_output)
+
         return super(OpenStackShell, self).prepare_to_run_command(cmd)
 
 
@@ -207,6 +479,12 @@ def main(argv=None):
             if encoding:
                 argv = map(lambda arg: arg.decode(encoding), argv)
 
+    # Start profiling before the option parser is built
+    if startup.requested(argv):
+        startup.enable()
+    if [arg for arg in argv if arg.startswith('--trace-file')]:
+        trace.enable()
+
     return OpenStackShell().run(argv)
 
 if __name__ == "__main__":
@@ -13,9 +13,13 @@
 
 """Base API Library Tests"""
 
+from keystoneauth1 import exceptions as ks_exceptions
+import mock
 from osc_lib import exceptions
 
 from openstackclient.api import api
+from openstackclient.api import jsonstream
+from openstackclient.api import pagination
 from openstackclient.tests.unit.api import fakes as api_fakes
 
 
@@ -38,6 +42,16 @@ class TestKeystoneSession(api_fakes.TestSession):
         ret = self.api._request('GET', '/qaz')
         self.assertEqual(api_fakes.RESP_ITEM_1, ret.json())
 
+    def test_session_request_absolute_url(self):
+        self.requests_mock.register_uri(
+            'GET',
+            'https://other.example.com/qaz',
+            json=api_fakes.RESP_ITEM_1,
+            status_code=200,
+        )
+        ret = self.api._request('GET', 'https://other.example.com/qaz')
+        self.assertEqual(api_fakes.RESP_ITEM_1, ret.json())
+
 
 class TestBaseAPI(api_fakes.TestSession):
 
@@ -171,6 +185,94 @@ class TestBaseAPI(api_fakes.TestSession):
         ret = self.api.find_attr('qaz', value='UP', attr='status')
         self.assertEqual(api_fakes.RESP_ITEM_1, ret)
 
+    def test_find_attr_uuid(self):
+        value = 'a6e4a3f4-8e04-4d3f-95cd-6f2c0d5bde4f'
+        item = dict(api_fakes.RESP_ITEM_1, id=value)
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?id=' + value,
+            json={'qaz': [item]},
+            status_code=200,
+        )
+        ret = self.api.find_attr('qaz', value)
+        self.assertEqual(item, ret)
+        # The name search is not needed
+        self.assertEqual(1, self.requests_mock.call_count)
+
+    def test_find_attr_uuid_filter_ignored(self):
+        # The server ignores the id filter and returns an unrelated item
+        value = 'a6e4a3f4-8e04-4d3f-95cd-6f2c0d5bde4f'
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?id=' + value,
+            json={'qaz': [api_fakes.RESP_ITEM_1]},
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?name=' + value,
+            json={'qaz': []},
+            status_code=200,
+        )
+        self.assertRaises(
+            exceptions.CommandError,
+            self.api.find_attr,
+            'qaz',
+            value,
+        )
+
+    def test_find_attr_id_filter_ignored(self):
+        # The server ignores the id filter and returns every item
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?name=1',
+            json={'qaz': []},
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?id=1',
+            json={'qaz': [api_fakes.RESP_ITEM_2, api_fakes.RESP_ITEM_1]},
+            status_code=200,
+        )
+        ret = self.api.find_attr('qaz', '1')
+        self.assertEqual(api_fakes.RESP_ITEM_1, ret)
+
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?name=3',
+            json={'qaz': []},
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?id=3',
+            json={'qaz': [api_fakes.RESP_ITEM_1]},
+            status_code=200,
+        )
+        self.assertRaises(
+            exceptions.CommandError,
+            self.api.find_attr,
+            'qaz',
+            '3',
+        )
+
+    def test_find_attr_id_error_ignored(self):
+        # The concurrent ID search fails but is not needed
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?name=alpha',
+            json={'qaz': [api_fakes.RESP_ITEM_1]},
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?id=alpha',
+            status_code=400,
+        )
+        ret = self.api.find_attr('qaz', 'alpha')
+        self.assertEqual(api_fakes.RESP_ITEM_1, ret)
+
     def test_find_attr_path_resource(self):
 
         # Test resource different than path
@@ -244,6 +346,106 @@ class TestBaseAPI(api_fakes.TestSession):
         ret = self.api.find_bulk('qaz', id='1')
         self.assertEqual([api_fakes.LIST_RESP[0]], ret)
 
+    def test_find_id(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz/1',
+            json=api_fakes.RESP_ITEM_1,
+            status_code=200,
+        )
+        ret = self.api.find('qaz', '1', attr='name')
+        self.assertEqual(api_fakes.RESP_ITEM_1, ret)
+        self.assertEqual(1, self.requests_mock.call_count)
+
+    def test_find_name(self):
+        self.api.SERVER_FILTERS = {'qaz/detail': ('name',)}
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz/beta',
+            status_code=404,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz/detail?name=beta',
+            # The server ignores the filter
+            json={'qaz': api_fakes.LIST_RESP},
+            status_code=200,
+        )
+        ret = self.api.find('qaz', 'beta', attr='name')
+        self.assertEqual(api_fakes.RESP_ITEM_2, ret)
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_find_local_filter(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz/DOWN',
+            status_code=404,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz/detail',
+            json={'qaz': api_fakes.LIST_RESP},
+            status_code=200,
+        )
+        ret = self.api.find('qaz', 'DOWN', attr='status')
+        self.assertEqual(api_fakes.RESP_ITEM_2, ret)
+        self.assertEqual({}, self.requests_mock.last_request.qs)
+
+    def test_find_not_found(self):
+        value = 'a6e4a3f4-8e04-4d3f-95cd-6f2c0d5bde4f'
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz/' + value,
+            status_code=404,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz/detail',
+            json={'qaz': api_fakes.LIST_RESP},
+            status_code=200,
+        )
+        self.assertRaises(
+            exceptions.NotFound,
+            self.api.find,
+            'qaz',
+            value,
+            attr='name',
+        )
+
+    def test_find_bulk_server_filters(self):
+        self.api.SERVER_FILTERS = {'qaz': ('status',)}
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?status=UP',
+            json={'qaz': [api_fakes.RESP_ITEM_1, api_fakes.RESP_ITEM_3]},
+            status_code=200,
+        )
+        ret = self.api.find_bulk('qaz', status='UP', name='delta')
+        self.assertEqual([api_fakes.RESP_ITEM_3], ret)
+        # Only the supported filter is sent
+        self.assertEqual(
+            {'status': ['up']},
+            self.requests_mock.last_request.qs,
+        )
+
+    def test_find_bulk_index(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json={'qaz': api_fakes.LIST_RESP},
+            status_code=200,
+        )
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_1],
+            self.api.find_bulk('qaz', name='alpha'),
+        )
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_2],
+            self.api.find_bulk('qaz', name='beta', status='DOWN'),
+        )
+        self.assertEqual([], self.api.find_bulk('qaz', name='delta'))
+        self.assertEqual(1, self.requests_mock.call_count)
+
     # list tests
 
     def test_list_no_body(self):
@@ -324,3 +526,159 @@ class TestBaseAPI(api_fakes.TestSession):
         )
         ret = self.api.list('qaz', attr='value')
         self.assertEqual({'responses': api_fakes.LIST_RESP}, ret)
+
+    def test_list_resource(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?attr=value',
+            json={'qaz': api_fakes.LIST_RESP, 'next': None},
+            status_code=200,
+        )
+        ret = self.api.list('qaz', resource='qaz', attr='value')
+        self.assertEqual(api_fakes.LIST_RESP, ret)
+        self.assertTrue(self.requests_mock.last_request.stream)
+
+    def test_list_resource_dict(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json={'qaz': api_fakes.RESP_ITEM_1},
+            status_code=200,
+        )
+        ret = self.api.list('qaz', resource='qaz')
+        self.assertEqual(api_fakes.RESP_ITEM_1, ret)
+
+    def test_iter_list(self):
+        self.requests_mock.register_uri(
+            'POST',
+            self.BASE_URL + '/qaz/details',
+            json={'qaz': api_fakes.LIST_RESP, 'count': 2},
+            status_code=200,
+        )
+        ret = self.api.iter_list(
+            'qaz',
+            body=api_fakes.LIST_BODY,
+            detailed=True,
+            resource='qaz',
+        )
+        self.assertEqual(api_fakes.LIST_RESP, list(ret))
+        self.assertEqual({'count': 2}, ret.members)
+        self.assertEqual(
+            api_fakes.LIST_BODY,
+            self.requests_mock.last_request.json(),
+        )
+
+    # paginate tests
+
+    def test_paginate_marker(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json={'qaz': [api_fakes.RESP_ITEM_1]},
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?marker=1',
+            json={'qaz': [api_fakes.RESP_ITEM_2]},
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?marker=2',
+            json={'qaz': []},
+            status_code=200,
+        )
+        ret = self.api.paginate('qaz', marker_key='id', limit=1)
+        self.assertEqual(api_fakes.LIST_RESP, list(ret))
+        self.assertEqual(3, self.requests_mock.call_count)
+        self.assertEqual(
+            {'limit': ['1'], 'marker': ['2']},
+            self.requests_mock.last_request.qs,
+        )
+
+    def test_paginate_streamed(self):
+        read = []
+
+        def chunks():
+            for chunk in ('{"qaz": [{"id": "1"}, ', '{"id": "2"}]}'):
+                read.append(chunk)
+                yield chunk
+
+        with mock.patch.object(
+            self.api,
+            'iter_list',
+            return_value=jsonstream.ItemStream(chunks(), resource='qaz'),
+        ), mock.patch.object(pagination, 'BATCH_SIZE', 1):
+            ret = self.api.paginate('qaz', prefetch_batches=0)
+            self.assertEqual({'id': '1'}, next(ret))
+            # The rest of the page has not been read yet
+            self.assertEqual(1, len(read))
+            self.assertEqual([{'id': '2'}], list(ret))
+
+    def test_paginate_marker_ignored(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json=api_fakes.LIST_RESP,
+            status_code=200,
+        )
+        ret = self.api.paginate('qaz', marker_key='id')
+        # The second page repeats the first one, stop there
+        self.assertEqual(
+            api_fakes.LIST_RESP + api_fakes.LIST_RESP,
+            list(ret),
+        )
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_paginate_links(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json={
+                'qaz': [api_fakes.RESP_ITEM_1],
+                'qaz_links': [{
+                    'rel': 'next',
+                    'href': self.BASE_URL + '/qaz?marker=1',
+                }],
+            },
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?marker=1',
+            json={
+                'qaz': [api_fakes.RESP_ITEM_2],
+                'next': '/vX/qaz?marker=2',
+            },
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?marker=2',
+            json={'qaz': [api_fakes.RESP_ITEM_3]},
+            status_code=200,
+        )
+        ret = self.api.paginate('qaz')
+        self.assertEqual(
+            api_fakes.LIST_RESP + [api_fakes.RESP_ITEM_3],
+            list(ret),
+        )
+        self.assertEqual(3, self.requests_mock.call_count)
+
+    def test_paginate_error(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json=api_fakes.LIST_RESP,
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz?marker=2',
+            status_code=500,
+        )
+        ret = self.api.paginate('qaz', marker_key='id')
+        self.assertEqual(api_fakes.RESP_ITEM_1, next(ret))
+        self.assertEqual(api_fakes.RESP_ITEM_2, next(ret))
+        self.assertRaises(ks_exceptions.InternalServerError, next, ret)
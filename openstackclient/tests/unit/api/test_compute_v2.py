@@ -614,6 +614,36 @@ class TestSecurityGroup(TestComputeAPIv2):
         ret = self.api.security_group_find('sg2')
         self.assertEqual(self.FAKE_SECURITY_GROUP_RESP_2, ret)
 
+    def test_security_group_find_names(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/os-security-groups/sg1',
+            status_code=404,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/os-security-groups/sg2',
+            status_code=404,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/os-security-groups',
+            json={'security_groups': self.LIST_SECURITY_GROUP_RESP},
+            status_code=200,
+        )
+        ret = self.api.security_group_find('sg1')
+        self.assertEqual(self.FAKE_SECURITY_GROUP_RESP, ret)
+        ret = self.api.security_group_find('sg2')
+        self.assertEqual(self.FAKE_SECURITY_GROUP_RESP_2, ret)
+        # The listing is fetched and indexed once
+        self.assertEqual(
+            1,
+            len([
+                r for r in self.requests_mock.request_history
+                if r.path.endswith('/os-security-groups')
+            ]),
+        )
+
     def test_security_group_find_not_found(self):
         self.requests_mock.register_uri(
             'GET',
@@ -763,3 +793,36 @@ class TestSecurityGroupRule(TestComputeAPIv2):
         ret = self.api.security_group_rule_delete('1')
         self.assertEqual(202, ret.status_code)
         self.assertEqual("", ret.text)
+
+    def test_security_group_rule_find(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/os-security-groups',
+            json={'security_groups': [
+                {'id': 'sg1', 'rules': [self.FAKE_SECURITY_GROUP_RULE_RESP]},
+                {'id': 'sg2', 'rules': [{'id': 2, 'name': 'sgr2'}]},
+            ]},
+            status_code=200,
+        )
+        ret = self.api.security_group_rule_find('1')
+        self.assertEqual(self.FAKE_SECURITY_GROUP_RULE_RESP, ret)
+        # nova-network rules have integer IDs
+        ret = self.api.security_group_rule_find('2')
+        self.assertEqual('sgr2', ret['name'])
+        # the lookups share one listing request
+        self.assertEqual(1, self.requests_mock.call_count)
+
+    def test_security_group_rule_find_not_found(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/os-security-groups',
+            json={'security_groups': [
+                {'id': 'sg1', 'rules': [self.FAKE_SECURITY_GROUP_RULE_RESP]},
+            ]},
+            status_code=200,
+        )
+        self.assertRaises(
+            osc_lib_exceptions.NotFound,
+            self.api.security_group_rule_find,
+            '3',
+        )
@@ -0,0 +1,216 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""HTTP Response Cache Tests"""
+
+import os
+
+import fixtures
+import mock
+
+from openstackclient.api import api
+from openstackclient.api import httpcache
+from openstackclient.tests.unit.api import fakes as api_fakes
+
+
+class TestResponseCache(api_fakes.TestSession):
+
+    def setUp(self):
+        super(TestResponseCache, self).setUp()
+        self.api = api.BaseAPI(
+            session=self.sess,
+            endpoint=self.BASE_URL,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json=api_fakes.LIST_RESP,
+            status_code=200,
+        )
+
+    def test_get_cached(self):
+        self.assertEqual(api_fakes.LIST_RESP, self.api.list('qaz'))
+        self.assertEqual(api_fakes.LIST_RESP, self.api.list('qaz'))
+        self.assertEqual(1, self.requests_mock.call_count)
+
+        # Other parameters are another request
+        self.api.list('qaz', name='alpha')
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_get_not_cached(self):
+        self.api._request('GET', 'qaz', stream=True)
+        self.api._request('GET', 'qaz', stream=True)
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_invalidate(self):
+        self.requests_mock.register_uri(
+            'DELETE',
+            self.BASE_URL + '/qaz/1',
+            status_code=204,
+        )
+        self.api.list('qaz')
+        self.api.delete('qaz/1')
+        self.api.list('qaz')
+        self.assertEqual(3, self.requests_mock.call_count)
+
+    def test_invalidate_other_path(self):
+        self.requests_mock.register_uri(
+            'DELETE',
+            self.BASE_URL + '/wsx/1',
+            status_code=204,
+        )
+        self.api.list('qaz')
+        self.api.delete('wsx/1')
+        self.api.list('qaz')
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_start_run(self):
+        self.api.list('qaz')
+        httpcache.start_run()
+        self.api.list('qaz')
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_maxsize(self):
+        self.api.response_cache.maxsize = 1
+        self.api.list('qaz')
+        self.api.list('qaz', name='alpha')
+        self.api.list('qaz')
+        self.assertEqual(3, self.requests_mock.call_count)
+
+
+class TestPersistentResponseCache(api_fakes.TestSession):
+
+    def setUp(self):
+        super(TestPersistentResponseCache, self).setUp()
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        httpcache.enable_persistent(self.cache_dir)
+        self.addCleanup(httpcache.disable_persistent)
+
+    def _api(self):
+        return api.BaseAPI(session=self.sess, endpoint=self.BASE_URL)
+
+    def test_revalidate(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json=api_fakes.LIST_RESP,
+            headers={'ETag': '"v1"'},
+            status_code=200,
+        )
+        self.assertEqual(api_fakes.LIST_RESP, self._api().list('qaz'))
+        [path] = os.listdir(self.cache_dir)
+        self.assertEqual(
+            0o600,
+            os.stat(os.path.join(self.cache_dir, path)).st_mode & 0o777,
+        )
+
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            status_code=304,
+        )
+        self.assertEqual(api_fakes.LIST_RESP, self._api().list('qaz'))
+        self.assertEqual(
+            '"v1"',
+            self.requests_mock.last_request.headers['If-None-Match'],
+        )
+
+    def test_modified(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json=api_fakes.LIST_RESP,
+            headers={'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'},
+            status_code=200,
+        )
+        self._api().list('qaz')
+
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json=[api_fakes.RESP_ITEM_3],
+            status_code=200,
+        )
+        self.assertEqual([api_fakes.RESP_ITEM_3], self._api().list('qaz'))
+        self.assertEqual(
+            'Wed, 21 Oct 2015 07:28:00 GMT',
+            self.requests_mock.last_request.headers['If-Modified-Since'],
+        )
+
+    def test_no_validator(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json=api_fakes.LIST_RESP,
+            status_code=200,
+        )
+        self._api().list('qaz')
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+    def test_identities_not_shared(self):
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json=api_fakes.LIST_RESP,
+            headers={'ETag': '"v1"'},
+            status_code=200,
+        )
+        with mock.patch.object(
+                self.sess, 'get_user_id', return_value='u1'), \
+                mock.patch.object(
+                    self.sess, 'get_project_id', return_value='p1'):
+            self._api().list('qaz')
+
+        self.requests_mock.register_uri(
+            'GET',
+            self.BASE_URL + '/qaz',
+            json=[api_fakes.RESP_ITEM_3],
+            headers={'ETag': '"v1"'},
+            status_code=200,
+        )
+        with mock.patch.object(
+                self.sess, 'get_user_id', return_value='u1'), \
+                mock.patch.object(
+                    self.sess, 'get_project_id', return_value='p2'):
+            # Another project does not revalidate the first one's response
+            self.assertEqual(
+                [api_fakes.RESP_ITEM_3],
+                self._api().list('qaz'),
+            )
+        self.assertNotIn(
+            'If-None-Match',
+            self.requests_mock.last_request.headers,
+        )
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+
+
+class TestGetIdentity(api_fakes.TestSession):
+
+    def test_no_auth(self):
+        self.assertIsNone(httpcache.get_identity(self.sess))
+
+    def test_user_and_project(self):
+        sess = mock.Mock()
+        sess.get_user_id.return_value = 'u1'
+        sess.get_project_id.return_value = 'p1'
+        self.assertEqual(['u1', 'p1'], httpcache.get_identity(sess))
+
+    def test_unscoped_token(self):
+        sess = mock.Mock()
+        sess.get_user_id.return_value = None
+        sess.get_project_id.return_value = None
+        sess.get_token.return_value = 'token'
+        identity = httpcache.get_identity(sess)
+        self.assertNotIn('token', identity)
+        sess.get_token.return_value = 'other'
+        self.assertNotEqual(identity, httpcache.get_identity(sess))
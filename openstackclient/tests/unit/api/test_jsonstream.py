@@ -0,0 +1,83 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""JSON Listing Stream Tests"""
+
+import simplejson as json
+
+from openstackclient.api import jsonstream
+from openstackclient.tests.unit import utils
+
+
+BODY = {
+    'images': [
+        {'id': '1', 'name': u'été', 'size': 12345},
+        {'id': '2', 'tags': ['a', 'b'], 'min_disk': 0},
+        12345,
+    ],
+    'next': '/v2/images?marker=2',
+    'schema': '/v2/schemas/images',
+}
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestItemStream(utils.TestCase):
+
+    def test_wrapped(self):
+        data = json.dumps(BODY).encode('utf-8')
+        # Every chunk boundary, including inside multi-byte characters
+        # and numbers
+        for size in range(1, len(data) + 1):
+            stream = jsonstream.ItemStream(_chunks(data, size), 'images')
+            self.assertEqual(BODY['images'], list(stream))
+            self.assertEqual(
+                {'next': BODY['next'], 'schema': BODY['schema']},
+                stream.members,
+            )
+
+    def test_bare_list(self):
+        data = json.dumps(BODY['images'], indent=2).encode('utf-8')
+        stream = jsonstream.ItemStream(_chunks(data, 7))
+        self.assertEqual(BODY['images'], list(stream))
+        self.assertEqual({}, stream.members)
+
+    def test_empty(self):
+        self.assertEqual([], list(jsonstream.ItemStream([])))
+        self.assertEqual([], list(jsonstream.ItemStream([b'[ ]'])))
+        stream = jsonstream.ItemStream([b'{}'], 'images')
+        self.assertEqual([], list(stream))
+        self.assertEqual({}, stream.members)
+
+    def test_other_resource(self):
+        stream = jsonstream.ItemStream(
+            [b'{"image": {"id": "1"}}'],
+            'images',
+        )
+        self.assertEqual([], list(stream))
+        self.assertEqual({'image': {'id': '1'}}, stream.members)
+
+    def test_truncated(self):
+        stream = jsonstream.ItemStream(
+            [b'{"images": [{"id": "1"}, {"id": '],
+            'images',
+        )
+        items = iter(stream)
+        self.assertEqual({'id': '1'}, next(items))
+        self.assertRaises(json.JSONDecodeError, next, items)
+
+    def test_extra_data(self):
+        stream = jsonstream.ItemStream([b'[1] [2]'])
+        self.assertRaises(json.JSONDecodeError, list, stream)
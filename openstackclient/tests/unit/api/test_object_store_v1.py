@@ -13,9 +13,17 @@
 
 """Object Store v1 API Library Tests"""
 
-import mock
-
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+
+import fixtures
 from keystoneauth1 import session
+import mock
+from osc_lib import exceptions
 from requests_mock.contrib import fixture
 
 from openstackclient.api import object_store_v1 as object_store
@@ -91,6 +99,15 @@ class TestContainer(TestObjectAPIv1):
         ret = self.api.container_list()
         self.assertEqual(LIST_CONTAINER_RESP, ret)
 
+    def test_container_list_empty(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL,
+            status_code=204,
+        )
+        ret = self.api.container_list()
+        self.assertEqual([], ret)
+
     def test_container_list_prefix(self):
         self.requests_mock.register_uri(
             'GET',
@@ -117,6 +134,51 @@ class TestContainer(TestObjectAPIv1):
         )
         self.assertEqual(LIST_CONTAINER_RESP, ret)
 
+    def test_container_list_full_listing(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '?format=json',
+            json=[{'name': 'qaz'}, {'name': 'fred'}],
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '?marker=fred&format=json',
+            json=[{'name': 'wilma'}],
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '?marker=wilma&format=json',
+            json=[],
+            status_code=200,
+        )
+        ret = self.api.container_list(full_listing=True)
+        # A list, as before the listing was streamed
+        self.assertEqual(
+            [{'name': 'qaz'}, {'name': 'fred'}, {'name': 'wilma'}],
+            ret,
+        )
+        self.assertEqual(3, self.requests_mock.call_count)
+        self.assertNotIn('full_listing', self.requests_mock.last_request.qs)
+
+    def test_container_iter(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '?prefix=q&format=json',
+            json=[{'name': 'qaz'}],
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '?marker=qaz&prefix=q&format=json',
+            json=[],
+            status_code=200,
+        )
+        ret = self.api.container_iter(prefix='q')
+        self.assertFalse(isinstance(ret, list))
+        self.assertEqual([{'name': 'qaz'}], list(ret))
+
 #     def test_container_list_full_listing(self):
 #         sess = self.app.client_manager.session
 #
@@ -169,6 +231,242 @@ class TestContainer(TestObjectAPIv1):
         self.assertEqual(resp, ret)
 
 
+class TestContainerSave(TestObjectAPIv1):
+
+    def setUp(self):
+        super(TestContainerSave, self).setUp()
+        # Objects are saved relative to the current directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.useFixture(fixtures.TempDir()).path)
+
+        self.contents = {
+            'a/1': b'one',
+            'a/2': b'two',
+            'b/c/3': b'three',
+        }
+        listing = [
+            {
+                'name': name,
+                'bytes': len(content),
+                'hash': hashlib.md5(content).hexdigest(),
+            }
+            for name, content in sorted(self.contents.items())
+        ]
+        listing.insert(0, {'name': 'a/', 'bytes': 0, 'hash': 'x'})
+        # Two pages
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz?format=json',
+            json=listing[:3],
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz?marker=a%2F2&format=json',
+            json=listing[3:],
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz?marker=b%2Fc%2F3&format=json',
+            json=[],
+        )
+        for name, content in self.contents.items():
+            self.requests_mock.register_uri(
+                'GET',
+                FAKE_URL + '/qaz/' + name,
+                content=content,
+                headers={'Etag': hashlib.md5(content).hexdigest()},
+            )
+
+    def _object_gets(self):
+        return sorted(
+            r.path for r in self.requests_mock.request_history
+            if 'format' not in r.qs
+        )
+
+    def test_container_save(self):
+        ret = self.api.container_save(container='qaz', concurrency=2)
+
+        self.assertEqual({'saved': 3, 'skipped': 0}, ret)
+        for name, content in self.contents.items():
+            with open(name, 'rb') as f:
+                self.assertEqual(content, f.read())
+        self.assertEqual(
+            ['/v1/q12we34r/qaz/a/1', '/v1/q12we34r/qaz/a/2',
+             '/v1/q12we34r/qaz/b/c/3'],
+            self._object_gets(),
+        )
+
+    def test_container_save_skip_identical(self):
+        os.makedirs('a')
+        with open('a/1', 'wb') as f:
+            f.write(b'one')
+        with open('a/2', 'wb') as f:
+            f.write(b'TWO')
+
+        ret = self.api.container_save(container='qaz', skip_identical=True)
+
+        self.assertEqual({'saved': 2, 'skipped': 1}, ret)
+        self.assertEqual(
+            ['/v1/q12we34r/qaz/a/2', '/v1/q12we34r/qaz/b/c/3'],
+            self._object_gets(),
+        )
+        with open('a/2', 'rb') as f:
+            self.assertEqual(b'two', f.read())
+
+    def test_container_save_failure(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz/a/2',
+            status_code=404,
+        )
+
+        exc = self.assertRaises(
+            exceptions.CommandError,
+            self.api.container_save,
+            container='qaz',
+        )
+
+        self.assertEqual('1 of 3 objects failed to save.', str(exc))
+        # The other objects were saved
+        self.assertTrue(os.path.exists('a/1'))
+        self.assertTrue(os.path.exists('b/c/3'))
+
+
+class TestObjectDeleteAll(TestObjectAPIv1):
+
+    def setUp(self):
+        super(TestObjectDeleteAll, self).setUp()
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz?format=json',
+            json=[{'name': 'a'}, {'name': 'b c'}],
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz?marker=b+c&format=json',
+            json=[{'name': 'd'}],
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz?marker=d&format=json',
+            json=[],
+        )
+
+    def _register_info(self, info=None, status_code=200):
+        self.requests_mock.register_uri(
+            'GET',
+            'http://gopher.com/info',
+            json=info or {},
+            status_code=status_code,
+        )
+
+    def test_get_capabilities(self):
+        self._register_info({'swift': {'version': '2.17.0'}})
+        self.assertEqual(
+            {'swift': {'version': '2.17.0'}},
+            self.api.get_capabilities(),
+        )
+        # Fetched once
+        self.api.get_capabilities()
+        self.assertEqual(1, self.requests_mock.call_count)
+
+    def test_get_capabilities_disabled(self):
+        self._register_info(status_code=404)
+        self.assertEqual({}, self.api.get_capabilities())
+
+    def test_object_delete_all_bulk(self):
+        self._register_info(
+            {'bulk_delete': {'max_deletes_per_request': 2}})
+        self.requests_mock.register_uri(
+            'POST',
+            FAKE_URL + '?bulk-delete=true',
+            json=lambda request, context: {
+                'Number Deleted': len(request.body.split(b'\n')),
+                'Number Not Found': 0,
+                'Response Status': '200 OK',
+                'Errors': [],
+            },
+        )
+
+        self.assertEqual(
+            3,
+            self.api.object_delete_all('qaz', concurrency=1),
+        )
+        bodies = [
+            r.body for r in self.requests_mock.request_history
+            if r.method == 'POST'
+        ]
+        # One request per batch of max_deletes_per_request names
+        self.assertEqual([b'/qaz/a\n/qaz/b%20c', b'/qaz/d'], bodies)
+
+    def test_object_delete_all_bulk_errors(self):
+        self._register_info({'bulk_delete': {}})
+        self.requests_mock.register_uri(
+            'POST',
+            FAKE_URL + '?bulk-delete=true',
+            json={
+                'Number Deleted': 1,
+                'Number Not Found': 1,
+                'Response Status': '400 Bad Request',
+                'Errors': [['/qaz/d', '409 Conflict']],
+            },
+        )
+
+        exc = self.assertRaises(
+            exceptions.CommandError,
+            self.api.object_delete_all,
+            'qaz',
+        )
+        self.assertEqual('1 of 3 objects failed to delete.', str(exc))
+
+    def test_object_delete_all_without_bulk(self):
+        self._register_info(status_code=404)
+        for name in ('a', 'b%20c'):
+            self.requests_mock.register_uri(
+                'DELETE',
+                FAKE_URL + '/qaz/' + name,
+                status_code=204,
+            )
+        # Deleted by someone else
+        self.requests_mock.register_uri(
+            'DELETE',
+            FAKE_URL + '/qaz/d',
+            status_code=404,
+        )
+
+        self.assertEqual(3, self.api.object_delete_all('qaz'))
+        self.assertEqual(
+            3,
+            len([r for r in self.requests_mock.request_history
+                 if r.method == 'DELETE']),
+        )
+
+    def test_object_delete_all_without_bulk_failure(self):
+        self._register_info(status_code=404)
+        self.requests_mock.register_uri(
+            'DELETE',
+            FAKE_URL + '/qaz/a',
+            status_code=204,
+        )
+        self.requests_mock.register_uri(
+            'DELETE',
+            FAKE_URL + '/qaz/b%20c',
+            status_code=409,
+        )
+        self.requests_mock.register_uri(
+            'DELETE',
+            FAKE_URL + '/qaz/d',
+            status_code=204,
+        )
+
+        exc = self.assertRaises(
+            exceptions.CommandError,
+            self.api.object_delete_all,
+            'qaz',
+        )
+        self.assertEqual('1 of 3 objects failed to delete.', str(exc))
+
+
 class TestObject(TestObjectAPIv1):
 
     def setUp(self):
@@ -209,6 +507,249 @@ class TestObject(TestObjectAPIv1):
         self.base_object_create('111\n222\n333\n')
         self.base_object_create(bytes([0x31, 0x00, 0x0d, 0x0a, 0x7f, 0xff]))
 
+    def _segmented_file(self, content):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'f')
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def _register_segments(self, corrupt=None):
+        uploaded = {}
+
+        def put_segment(request, context):
+            data = request.body.read()
+            uploaded[request.path_url] = data
+            etag = hashlib.md5(data).hexdigest()
+            if data == corrupt:
+                etag = hashlib.md5(b'').hexdigest()
+            context.headers['Etag'] = '"%s"' % etag
+            context.status_code = 201
+            return ''
+
+        self.requests_mock.register_uri(
+            'PUT',
+            FAKE_URL + '/qaz_segments',
+            status_code=201,
+        )
+        self.requests_mock.register_uri(
+            'PUT',
+            re.compile(re.escape(FAKE_URL + '/qaz_segments/big.img/slo/')),
+            text=put_segment,
+        )
+        return uploaded
+
+    def test_object_create_segmented(self):
+        path = self._segmented_file(b'0123456789')
+        uploaded = self._register_segments()
+        self.requests_mock.register_uri(
+            'PUT',
+            FAKE_URL + '/qaz/big.img?multipart-manifest=put',
+            headers={'etag': 'manifest', 'x-trans-id': 'trans'},
+            status_code=201,
+        )
+
+        ret = self.api.object_create(
+            container='qaz',
+            object=path,
+            name='big.img',
+            segment_size=4,
+            concurrency=2,
+        )
+
+        self.assertEqual('manifest', ret['etag'])
+        self.assertEqual('big.img', ret['object'])
+        self.assertEqual(
+            [b'0123', b'4567', b'89'],
+            [uploaded[url] for url in sorted(uploaded)],
+        )
+        manifest = json.loads(self.requests_mock.last_request.text)
+        self.assertEqual(
+            [
+                {
+                    'path': '/qaz_segments' +
+                    sorted(uploaded)[i].split('/qaz_segments', 1)[1],
+                    'etag': hashlib.md5(data).hexdigest(),
+                    'size_bytes': len(data),
+                }
+                for i, data in enumerate([b'0123', b'4567', b'89'])
+            ],
+            manifest,
+        )
+        self.assertTrue(manifest[0]['path'].endswith('/10/4/00000000'))
+
+    def test_object_create_segmented_corrupted(self):
+        path = self._segmented_file(b'0123456789')
+        self._register_segments(corrupt=b'4567')
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.api.object_create,
+            container='qaz',
+            object=path,
+            name='big.img',
+            segment_size=4,
+        )
+        # The manifest is not written
+        self.assertFalse(any(
+            'multipart-manifest' in r.url
+            for r in self.requests_mock.request_history
+        ))
+
+    def test_object_create_small_file_not_segmented(self):
+        path = self._segmented_file(b'0123')
+        self.requests_mock.register_uri(
+            'PUT',
+            FAKE_URL + '/qaz/small.txt',
+            headers={'etag': 'small'},
+            status_code=201,
+        )
+
+        ret = self.api.object_create(
+            container='qaz',
+            object=path,
+            name='small.txt',
+            segment_size=4,
+        )
+
+        self.assertEqual('small', ret['etag'])
+        self.assertEqual(1, self.requests_mock.call_count)
+
+    def _register_ranges(self, content, etag, status_code=206, headers=None):
+        def get_range(request, context):
+            context.headers['Etag'] = etag
+            context.headers.update(headers or {})
+            if 'Range' not in request.headers or status_code != 206:
+                return content
+            start, end = request.headers['Range'][len('bytes='):].split('-')
+            end = min(int(end), len(content) - 1)
+            context.status_code = status_code
+            context.headers['Content-Range'] = 'bytes %s-%d/%d' % (
+                start, end, len(content))
+            return content[int(start):end + 1]
+
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz/big.img',
+            content=get_range,
+        )
+
+    def _gets(self):
+        return sorted(
+            ((r.headers.get('Range'), r.headers.get('If-Match'))
+             for r in self.requests_mock.request_history),
+            key=lambda get: get[0] or '',
+        )
+
+    def _save(self, range_size=4):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'f')
+        self.api.object_save(
+            container='qaz',
+            object='big.img',
+            file=path,
+            range_size=range_size,
+            concurrency=2,
+        )
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_object_save_ranged(self):
+        content = b'0123456789'
+        etag = hashlib.md5(content).hexdigest()
+        self._register_ranges(content, '"%s"' % etag)
+
+        self.assertEqual(content, self._save())
+        # The first range gives the size, no HEAD is needed
+        self.assertEqual(
+            [
+                ('bytes=0-3', None),
+                ('bytes=4-7', etag),
+                ('bytes=8-9', etag),
+            ],
+            self._gets(),
+        )
+
+    def test_object_save_ranged_corrupted(self):
+        self._register_ranges(b'0123456789', hashlib.md5(b'').hexdigest())
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'f')
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.api.object_save,
+            container='qaz',
+            object='big.img',
+            file=path,
+            range_size=4,
+        )
+        # The corrupted file is removed
+        self.assertFalse(os.path.exists(path))
+
+    def test_object_save_ranges_not_supported(self):
+        content = b'0123456789'
+        self._register_ranges(
+            content, hashlib.md5(content).hexdigest(), status_code=200)
+
+        # The whole object is in the response to the first range
+        self.assertEqual(content, self._save())
+        self.assertEqual([('bytes=0-3', None)], self._gets())
+
+    def test_object_save_small_object_single_request(self):
+        content = b'0123'
+        self._register_ranges(content, hashlib.md5(content).hexdigest())
+
+        self.assertEqual(content, self._save(range_size=8))
+        self.assertEqual([('bytes=0-7', None)], self._gets())
+
+    def test_object_save_empty_object(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz/big.img',
+            [
+                {'status_code': 416},
+                {'content': b'', 'headers': {
+                    'Etag': hashlib.md5(b'').hexdigest()}},
+            ],
+        )
+
+        self.assertEqual(b'', self._save())
+        self.assertEqual([(None, None), ('bytes=0-3', None)], self._gets())
+
+    def _gzipped(self, content):
+        buf = io.BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+            f.write(content)
+        return buf.getvalue()
+
+    def test_object_save_content_encoding(self):
+        # The object is saved as stored, not decoded
+        content = self._gzipped(b'0123456789' * 10)
+        self._register_ranges(
+            content,
+            hashlib.md5(content).hexdigest(),
+            headers={'Content-Encoding': 'gzip'},
+        )
+
+        self.assertEqual(content, self._save(range_size=None))
+        self.assertEqual(
+            'identity',
+            self.requests_mock.last_request.headers['Accept-Encoding'],
+        )
+
+    def test_object_save_ranged_content_encoding(self):
+        content = self._gzipped(b'0123456789' * 10)
+        self._register_ranges(
+            content,
+            hashlib.md5(content).hexdigest(),
+            headers={'Content-Encoding': 'gzip'},
+        )
+
+        self.assertEqual(content, self._save(range_size=8))
+        self.assertEqual(
+            (len(content) + 7) // 8,
+            self.requests_mock.call_count,
+        )
+        for request in self.requests_mock.request_history:
+            self.assertEqual('identity', request.headers['Accept-Encoding'])
+
     def test_object_delete(self):
         self.requests_mock.register_uri(
             'DELETE',
@@ -272,6 +813,31 @@ class TestObject(TestObjectAPIv1):
         )
         self.assertEqual(LIST_CONTAINER_RESP, ret)
 
+    def test_object_list_full_listing_delimiter(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz?delimiter=%2f&format=json',
+            json=[{'name': 'fred'}, {'subdir': 'wilma/'}],
+            status_code=200,
+        )
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/qaz?marker=wilma%2f&format=json',
+            json=[],
+            status_code=200,
+        )
+        ret = self.api.object_list(
+            container='qaz',
+            delimiter='/',
+            all_data=True,
+        )
+        self.assertEqual([{'name': 'fred'}, {'subdir': 'wilma/'}], ret)
+        self.assertEqual(2, self.requests_mock.call_count)
+
+        ret = self.api.object_iter('qaz', delimiter='/')
+        self.assertFalse(isinstance(ret, list))
+        self.assertEqual([{'name': 'fred'}, {'subdir': 'wilma/'}], list(ret))
+
 #     def test_list_objects_full_listing(self):
 #         sess = self.app.client_manager.session
 #
@@ -0,0 +1,108 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Pagination Helper Tests"""
+
+import threading
+
+import mock
+
+from openstackclient.api import pagination
+from openstackclient.tests.unit import utils
+
+
+class TestPrefetch(utils.TestCase):
+
+    def test_prefetch(self):
+        self.assertEqual([1, 2, 3], list(pagination.prefetch(iter([1, 2, 3]))))
+
+    def test_prefetch_disabled(self):
+        self.assertEqual(
+            [1, 2, 3],
+            list(pagination.prefetch(iter([1, 2, 3]), depth=0)),
+        )
+
+    def test_prefetch_error(self):
+        def fail():
+            yield 1
+            raise ValueError('boom')
+
+        items = pagination.prefetch(fail())
+        self.assertEqual(1, next(items))
+        self.assertRaises(ValueError, next, items)
+
+    def test_prefetch_close(self):
+        produced = []
+        stopped = threading.Event()
+
+        def produce():
+            try:
+                for i in range(100):
+                    produced.append(i)
+                    yield i
+            finally:
+                stopped.set()
+
+        items = pagination.prefetch(produce(), depth=1)
+        self.assertEqual(0, next(items))
+        items.close()
+        self.assertTrue(stopped.wait(5))
+        # The producer stays at most a couple of items ahead
+        self.assertLess(len(produced), 5)
+
+    def test_batches(self):
+        self.assertEqual(
+            [[1, 2], [3, 4], [5]],
+            list(pagination.batches(iter([1, 2, 3, 4, 5]), 2)),
+        )
+        self.assertEqual([], list(pagination.batches([], 2)))
+
+
+class TestPaginate(utils.TestCase):
+
+    def test_paginate(self):
+        list_page = mock.Mock(side_effect=[
+            [{'id': 'a'}, {'id': 'b'}],
+            [{'id': 'c'}],
+            [],
+        ])
+        self.assertEqual(
+            [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}],
+            list(pagination.paginate(list_page)),
+        )
+        list_page.assert_has_calls([
+            mock.call(None),
+            mock.call('b'),
+            mock.call('c'),
+        ])
+
+    def test_paginate_marker_key(self):
+        list_page = mock.Mock(side_effect=[[{'name': 'a'}], []])
+        self.assertEqual(
+            [{'name': 'a'}],
+            list(pagination.paginate(
+                list_page,
+                marker='start',
+                marker_key=lambda item: item['name'],
+                prefetch_pages=0,
+            )),
+        )
+        list_page.assert_has_calls([mock.call('start'), mock.call('a')])
+
+    def test_paginate_marker_ignored(self):
+        list_page = mock.Mock(return_value=[{'id': 'a'}])
+        self.assertEqual(
+            [{'id': 'a'}, {'id': 'a'}],
+            list(pagination.paginate(list_page)),
+        )
+        self.assertEqual(2, list_page.call_count)
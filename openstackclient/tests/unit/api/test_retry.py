@@ -0,0 +1,198 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Retry Tests"""
+
+import io
+
+import mock
+from osc_lib import exceptions
+import requests
+
+from openstackclient.api import retry
+from openstackclient.tests.unit import utils
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(b'')
+    return response
+
+
+class TestParseRetryAfter(utils.TestCase):
+
+    def test_parse_retry_after(self):
+        self.assertEqual(3.0, retry.parse_retry_after('3'))
+        self.assertEqual(
+            30.0,
+            retry.parse_retry_after(
+                'Wed, 21 Oct 2015 07:28:30 GMT',
+                now=1445412480.0,
+            ),
+        )
+        self.assertIsNone(retry.parse_retry_after(None))
+        self.assertIsNone(retry.parse_retry_after('soon'))
+
+
+class TestTokenBucket(utils.TestCase):
+
+    def test_acquire(self):
+        clock = FakeClock()
+        bucket = retry.TokenBucket(2, clock=clock, sleep=clock.sleep)
+
+        # A burst of one second's worth, then one every half second
+        self.assertEqual(0, bucket.acquire())
+        self.assertEqual(0, bucket.acquire())
+        self.assertEqual(0.5, bucket.acquire())
+        self.assertEqual(0.5, bucket.acquire())
+        self.assertEqual([0.5, 0.5], clock.sleeps)
+
+
+class TestRetryPolicy(utils.TestCase):
+
+    def setUp(self):
+        super(TestRetryPolicy, self).setUp()
+        self.clock = FakeClock()
+        self.policy = retry.RetryPolicy(
+            max_retries=3,
+            max_time=60,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+
+    def test_retry_status(self):
+        send = mock.Mock(side_effect=[
+            make_response(503),
+            make_response(429, {'Retry-After': '7'}),
+            make_response(200),
+        ])
+
+        response = self.policy.run('GET', 'https://example.com', send)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, send.call_count)
+        self.assertEqual(2, len(self.clock.sleeps))
+        # Jittered backoff, then Retry-After
+        self.assertTrue(0 <= self.clock.sleeps[0] <= retry.DEFAULT_BACKOFF)
+        self.assertEqual(7, self.clock.sleeps[1])
+
+    def test_retry_exhausted(self):
+        send = mock.Mock(return_value=make_response(503))
+
+        response = self.policy.run('DELETE', 'https://example.com', send)
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual(4, send.call_count)
+
+    def test_retry_max_time(self):
+        send = mock.Mock(side_effect=[
+            make_response(429, {'Retry-After': '50'}),
+            make_response(429, {'Retry-After': '50'}),
+        ])
+
+        response = self.policy.run('GET', 'https://example.com', send)
+
+        self.assertEqual(429, response.status_code)
+        self.assertEqual(2, send.call_count)
+        self.assertEqual([50], self.clock.sleeps)
+
+    def test_no_retry_not_idempotent(self):
+        send = mock.Mock(return_value=make_response(503))
+
+        response = self.policy.run('POST', 'https://example.com', send)
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual(1, send.call_count)
+
+        # Rate limited requests were not processed
+        send = mock.Mock(side_effect=[
+            make_response(429),
+            make_response(201),
+        ])
+        response = self.policy.run('POST', 'https://example.com', send)
+        self.assertEqual(201, response.status_code)
+
+    def test_no_retry_not_replayable(self):
+        send = mock.Mock(return_value=make_response(429))
+
+        response = self.policy.run(
+            'PUT', 'https://example.com', send, replayable=False)
+
+        self.assertEqual(429, response.status_code)
+        self.assertEqual(1, send.call_count)
+
+    def test_retry_connection_error(self):
+        send = mock.Mock(side_effect=[
+            requests.exceptions.ConnectionError(),
+            make_response(200),
+        ])
+
+        response = self.policy.run('GET', 'https://example.com', send)
+        self.assertEqual(200, response.status_code)
+
+        send = mock.Mock(side_effect=requests.exceptions.ConnectionError())
+        self.assertRaises(
+            requests.exceptions.ConnectionError,
+            self.policy.run,
+            'POST',
+            'https://example.com',
+            send,
+        )
+        self.assertEqual(1, send.call_count)
+
+    def test_rate_limit(self):
+        policy = retry.RetryPolicy(
+            rate_limit=1,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+        send = mock.Mock(return_value=make_response(200))
+
+        for _i in range(3):
+            policy.run('GET', 'https://example.com', send)
+
+        self.assertEqual([1.0, 1.0], self.clock.sleeps)
+
+    def test_policy_from_config(self):
+        policy = retry.policy_from_config({
+            'http_retries': '5',
+            'http_retry_max_time': None,
+            'http_rate_limit': 20,
+        })
+
+        self.assertEqual(5, policy.max_retries)
+        self.assertEqual(retry.DEFAULT_MAX_TIME, policy.max_time)
+        self.assertEqual(20, policy.bucket.rate)
+
+        self.assertIsNone(retry.policy_from_config({}).bucket)
+        self.assertRaises(
+            exceptions.CommandError,
+            retry.policy_from_config,
+            {'http_retries': '-1'},
+        )
@@ -14,10 +14,16 @@
 """API Utilities Library Tests"""
 
 import copy
+import threading
+import time
+import weakref
+
+import mock
 
 from openstackclient.api import api
 from openstackclient.api import utils as api_utils
 from openstackclient.tests.unit.api import fakes as api_fakes
+from openstackclient.tests.unit import utils
 
 
 class TestBaseAPIFilter(api_fakes.TestSession):
@@ -113,3 +119,276 @@ class TestBaseAPIFilter(api_fakes.TestSession):
             property_field='props',
         )
         self.assertEqual([], output)
+
+
+class TestFilterItems(utils.TestCase):
+
+    def setUp(self):
+        super(TestFilterItems, self).setUp()
+        self.input_list = [
+            api_fakes.RESP_ITEM_1,
+            api_fakes.RESP_ITEM_2,
+            api_fakes.RESP_ITEM_3,
+        ]
+
+    def _filter(self, filters, property_field='props'):
+        return list(api_utils.filter_items(
+            self.input_list,
+            filters,
+            property_field=property_field,
+        ))
+
+    def test_filter_items_lazy(self):
+        original = copy.deepcopy(self.input_list)
+        consumed = []
+
+        def items():
+            for item in self.input_list:
+                consumed.append(item)
+                yield item
+
+        output = api_utils.filter_items(items(), {'status': 'DOWN'})
+        self.assertEqual([], consumed)
+        self.assertEqual(api_fakes.RESP_ITEM_2, next(output))
+        self.assertEqual(2, len(consumed))
+        self.assertEqual(original, self.input_list)
+
+    def test_filter_items_none(self):
+        self.assertEqual(self.input_list, self._filter({}))
+        self.assertEqual(self.input_list, self._filter({'status': None}))
+
+    def test_filter_items_eq(self):
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_1, api_fakes.RESP_ITEM_3],
+            self._filter({'status': 'UP'}),
+        )
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_3],
+            self._filter({'status': 'UP', 'b': 1}),
+        )
+        self.assertEqual([], self._filter({'b': 1}, property_field=None))
+        self.assertEqual([], self._filter({'missing': 'UP'}))
+
+    def test_filter_items_prefix(self):
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_2],
+            self._filter({'name': ('prefix', 'be')}),
+        )
+        # Only strings have a prefix
+        self.assertEqual([], self._filter({'a': ('prefix', '1')}))
+
+    def test_filter_items_regex(self):
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_1, api_fakes.RESP_ITEM_3],
+            self._filter({'name': ('regex', 'l.*a$')}),
+        )
+
+    def test_filter_items_compare(self):
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_2, api_fakes.RESP_ITEM_3],
+            self._filter({'a': ('gt', '1')}),
+        )
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_1, api_fakes.RESP_ITEM_2],
+            self._filter({'a': ('le', 2)}),
+        )
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_1],
+            self._filter({'id': ('lt', 2), 'a': ('ge', 1)}),
+        )
+        # Values that are not numbers never match
+        self.assertEqual([], self._filter({'name': ('ge', 0)}))
+
+    def test_filter_items_invalid(self):
+        self.assertRaises(
+            ValueError,
+            api_utils.filter_items,
+            self.input_list,
+            {'a': ('like', 1)},
+        )
+        self.assertRaises(
+            ValueError,
+            api_utils.filter_items,
+            self.input_list,
+            {'a': ('gt', 'one')},
+        )
+
+
+class TestIsIdLike(utils.TestCase):
+
+    def test_is_id_like(self):
+        self.assertTrue(api_utils.is_id_like(
+            'a6e4a3f4-8e04-4d3f-95cd-6f2c0d5bde4f'))
+        self.assertTrue(api_utils.is_id_like(
+            'a6e4a3f48e044d3f95cd6f2c0d5bde4f'))
+        self.assertTrue(api_utils.is_id_like('42'))
+        self.assertTrue(api_utils.is_id_like(42))
+        self.assertFalse(api_utils.is_id_like('private'))
+        self.assertFalse(api_utils.is_id_like('10.0.0.1'))
+        self.assertFalse(api_utils.is_id_like(None))
+
+
+class TestCallConcurrently(utils.TestCase):
+
+    def test_call_concurrently(self):
+        def fail():
+            raise ValueError('boom')
+
+        first, second, third = api_utils.call_concurrently(
+            lambda: 1,
+            fail,
+            lambda: 3,
+        )
+        self.assertEqual(1, first.get())
+        self.assertRaises(ValueError, second.get)
+        self.assertEqual(3, third.get())
+
+    def test_call_concurrently_none(self):
+        self.assertEqual([], api_utils.call_concurrently())
+
+
+class TestMapConcurrently(utils.TestCase):
+
+    def test_map_concurrently_order(self):
+        def slow_first(item):
+            if item == 0:
+                time.sleep(0.05)
+            if item == 3:
+                raise ValueError('boom')
+            return item * 10
+
+        results = list(api_utils.map_concurrently(
+            slow_first, range(6), concurrency=3))
+        self.assertEqual(list(range(6)), [item for item, _r in results])
+        self.assertEqual(0, results[0][1].get())
+        self.assertRaises(ValueError, results[3][1].get)
+        self.assertEqual(50, results[5][1].get())
+
+    def test_map_concurrently_bounded(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def call(item):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return item
+
+        results = api_utils.map_concurrently(call, range(20), concurrency=4)
+        self.assertEqual(
+            list(range(20)),
+            [result.get() for _item, result in results],
+        )
+        self.assertLessEqual(peak[0], 4)
+        self.assertGreater(peak[0], 1)
+
+    def test_map_concurrently_serial(self):
+        threads = set()
+
+        def call(item):
+            threads.add(threading.current_thread())
+            return item
+
+        results = api_utils.map_concurrently(call, iter('abc'), concurrency=1)
+        self.assertEqual(['a', 'b', 'c'], [r.get() for _i, r in results])
+        self.assertEqual({threading.current_thread()}, threads)
+
+
+class TestListIndex(utils.TestCase):
+
+    def setUp(self):
+        super(TestListIndex, self).setUp()
+        self.index = api_utils.ListIndex([
+            api_fakes.RESP_ITEM_1,
+            api_fakes.RESP_ITEM_2,
+            api_fakes.RESP_ITEM_3,
+        ])
+
+    def test_find(self):
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_1, api_fakes.RESP_ITEM_3],
+            self.index.find(status='UP'),
+        )
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_3],
+            self.index.find(status='UP', name='delta'),
+        )
+        self.assertEqual([], self.index.find(status='UP', name='beta'))
+        self.assertEqual([], self.index.find(missing='x'))
+
+    def test_find_unhashable(self):
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_2],
+            self.index.find(props={'a': 2, 'b': 2}),
+        )
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_2],
+            self.index.find(props={'a': 2, 'b': 2}, id='2'),
+        )
+
+    def test_index_cache(self):
+        cache = api_utils.ListIndexCache(maxsize=2)
+        response = mock.Mock()
+        response.json.return_value = {'qaz': [api_fakes.RESP_ITEM_1]}
+        index = cache.get('/qaz', {}, response)
+        self.assertEqual(
+            [api_fakes.RESP_ITEM_1],
+            index.find(name='alpha'),
+        )
+        self.assertIs(index, cache.get('/qaz', {}, response))
+        self.assertEqual(1, response.json.call_count)
+
+    def test_index_cache_items(self):
+        cache = api_utils.ListIndexCache()
+        response = mock.Mock()
+        response.json.return_value = {'qaz': [
+            {'id': '1', 'parts': [api_fakes.RESP_ITEM_2]},
+        ]}
+
+        def parts(body):
+            return [part for item in body['qaz'] for part in item['parts']]
+
+        index = cache.get('/qaz', {}, response, items=parts)
+        self.assertEqual([api_fakes.RESP_ITEM_2], index.find(id='2'))
+        # the default index of the listing is kept apart
+        self.assertEqual([], cache.get('/qaz', {}, response).find(id='2'))
+
+    def test_index_cache_eviction(self):
+        cache = api_utils.ListIndexCache(maxsize=2)
+        responses = [mock.Mock() for i in range(3)]
+        for i, response in enumerate(responses):
+            response.json.return_value = []
+            cache.get('/qaz', {'page': i}, response)
+        self.assertEqual(2, len(cache._entries))
+        cache.get('/qaz', {'page': 0}, responses[0])
+        self.assertEqual(2, responses[0].json.call_count)
+
+    def test_index_cache_weak_response(self):
+        class FakeResponse(object):
+            def json(self):
+                return []
+
+        cache = api_utils.ListIndexCache()
+        response = FakeResponse()
+        cache.get('/qaz', {}, response)
+        ref = weakref.ref(response)
+        del response
+        self.assertIsNone(ref())
+
+    def test_server_filters(self):
+        self.assertEqual(
+            {'name': 'alpha'},
+            api_utils.server_filters(
+                {'qaz': ('name',)},
+                '/qaz/',
+                {'name': 'alpha', 'status': 'UP'},
+            ),
+        )
+        self.assertEqual(
+            {},
+            api_utils.server_filters({}, 'qaz', {'name': 'alpha'}),
+        )
@@ -0,0 +1,120 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import os
+
+import fixtures
+import mock
+
+from openstackclient.common import authcache
+from openstackclient.tests.unit import utils
+
+
+class FakeAuth(object):
+
+    def __init__(self, cache_id='cache-id', state=None, expiring=False):
+        self.cache_id = cache_id
+        self.state = state
+        self.auth_ref = None
+        self.expiring = expiring
+        self.invalidate = mock.Mock()
+
+    def get_cache_id(self):
+        return self.cache_id
+
+    def get_auth_state(self):
+        return self.state
+
+    def set_auth_state(self, state):
+        self.state = state
+        self.auth_ref = mock.Mock()
+        self.auth_ref.will_expire_soon.return_value = self.expiring
+
+
+class TestAuthCache(utils.TestCase):
+
+    def setUp(self):
+        super(TestAuthCache, self).setUp()
+        self.cache_dir = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'auth',
+        )
+
+    def _save(self, state='{"auth_token": "tok"}'):
+        cache = authcache.AuthCache(
+            FakeAuth(state=state),
+            cache_dir=self.cache_dir,
+        )
+        cache.save()
+        return cache
+
+    def test_save_and_load(self):
+        saved = self._save()
+        self.assertEqual(0o600, os.stat(saved.path).st_mode & 0o777)
+
+        auth = FakeAuth()
+        cache = authcache.AuthCache(auth, cache_dir=self.cache_dir)
+        self.assertTrue(cache.load())
+        self.assertEqual('{"auth_token": "tok"}', auth.state)
+        auth.auth_ref.will_expire_soon.assert_called_once_with(
+            authcache.DEFAULT_EXPIRY_MARGIN)
+
+    def test_load_other_credentials(self):
+        self._save()
+        cache = authcache.AuthCache(
+            FakeAuth(cache_id='other'),
+            cache_dir=self.cache_dir,
+        )
+        self.assertFalse(cache.load())
+
+    def test_load_expiring(self):
+        saved = self._save()
+        auth = FakeAuth(expiring=True)
+        cache = authcache.AuthCache(auth, cache_dir=self.cache_dir)
+
+        self.assertFalse(cache.load())
+        auth.invalidate.assert_called_once_with()
+        self.assertFalse(os.path.exists(saved.path))
+
+    def test_no_cache_id(self):
+        cache = authcache.AuthCache(
+            FakeAuth(cache_id=None, state='state'),
+            cache_dir=self.cache_dir,
+        )
+        cache.save()
+        self.assertIsNone(cache.path)
+        self.assertFalse(cache.load())
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_save_unchanged(self):
+        self._save()
+        auth = FakeAuth()
+        cache = authcache.AuthCache(auth, cache_dir=self.cache_dir)
+        cache.load()
+
+        with mock.patch.object(authcache.cache, 'write_json') as write:
+            cache.save()
+            write.assert_not_called()
+            auth.state = '{"auth_token": "new"}'
+            cache.save()
+            write.assert_called_once_with(
+                cache.path,
+                {'state': '{"auth_token": "new"}'},
+            )
+
+    def test_invalidate(self):
+        cache = self._save()
+        cache.invalidate()
+        self.assertFalse(os.path.exists(cache.path))
+        # A missing file is not an error
+        cache.invalidate()
@@ -0,0 +1,142 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test batch module"""
+
+import json
+import logging
+import os
+
+import fixtures
+import mock
+from osc_lib import exceptions
+import six
+
+from openstackclient.common import batch
+from openstackclient.common import module as osc_module
+from openstackclient.tests.unit import utils
+
+
+class TestRunBatch(utils.TestCommand):
+
+    def setUp(self):
+        super(TestRunBatch, self).setUp()
+
+        self.app.stdout = six.StringIO()
+        self.app.command_manager = mock.Mock()
+        self.app.command_manager.find_command.side_effect = self._find
+        self.app.run_subcommand = mock.Mock(side_effect=self._run)
+        self.ran = []
+
+        self.cmd = batch.RunBatch(self.app, None)
+
+    def _find(self, argv):
+        if argv[0] == 'module':
+            return osc_module.ListModule, 'module list', argv[2:]
+        if argv[0] == 'batch':
+            return batch.RunBatch, 'batch run', argv[2:]
+        raise ValueError('Unknown command %r' % argv)
+
+    def _run(self, argv):
+        self.ran.append(argv)
+        if argv[0] == 'module':
+            self.app.stdout.write('{"novaclient": "1.0"}')
+            return 0
+        if argv[0] == 'batch':
+            logging.getLogger('test').error('no good')
+            return 1
+        raise SystemExit(2)
+
+    def _records(self):
+        return [json.loads(line)
+                for line in self.app.stdout.getvalue().splitlines()]
+
+    def _run_batch(self, text, args=None):
+        self.app.stdin = six.StringIO(text)
+        parsed_args = self.check_parser(self.cmd, args or [], [])
+        return self.cmd.take_action(parsed_args)
+
+    def test_batch_success(self):
+        self._run_batch(
+            '# comment\n'
+            '\n'
+            'openstack module list\n'
+            'module list -f yaml\n'
+        )
+
+        self.assertEqual(
+            [
+                ['module', 'list', '-f', 'json'],
+                ['module', 'list', '-f', 'yaml'],
+            ],
+            self.ran,
+        )
+        records = self._records()
+        self.assertEqual(2, len(records))
+        self.assertEqual(
+            {
+                'line': 3,
+                'command': 'openstack module list',
+                'status': 0,
+                'output': {'novaclient': '1.0'},
+                'errors': [],
+            },
+            records[0],
+        )
+        self.assertEqual(4, records[1]['line'])
+
+    def test_batch_continue_on_error(self):
+        self.assertRaises(
+            exceptions.CommandError,
+            self._run_batch,
+            'batch run\n'
+            'bogus command\n'
+            'module list\n'
+            'unbalanced "quote\n',
+        )
+
+        records = self._records()
+        self.assertEqual([1, 2, 0, 2], [r['status'] for r in records])
+        self.assertEqual(['no good'], records[0]['errors'])
+        self.assertEqual(['batch', 'run'], self.ran[0])
+        self.assertEqual(3, len(self.ran))
+
+    def test_batch_stop_on_error(self):
+        self.assertRaises(
+            exceptions.CommandError,
+            self._run_batch,
+            'bogus command\n'
+            'module list\n',
+            ['--stop-on-error'],
+        )
+
+        self.assertEqual(1, len(self._records()))
+        self.assertEqual([['bogus', 'command']], self.ran)
+
+    def test_batch_file(self):
+        tmp_dir = self.useFixture(fixtures.TempDir()).path
+        file_name = os.path.join(tmp_dir, 'commands.txt')
+        with open(file_name, 'w') as f:
+            f.write('module list\n')
+
+        self._run_batch('', ['--file', file_name])
+
+        self.assertEqual([['module', 'list', '-f', 'json']], self.ran)
+
+    def test_batch_file_missing(self):
+        self.assertRaises(
+            exceptions.CommandError,
+            self._run_batch,
+            '',
+            ['--file', '/does/not/exist'],
+        )
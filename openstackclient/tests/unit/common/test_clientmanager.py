@@ -14,12 +14,19 @@
 #
 
 import copy
+import os
 
+import fixtures
 from keystoneauth1 import token_endpoint
+import mock
 from osc_lib.tests import utils as osc_lib_test_utils
 
 from openstackclient.common import clientmanager
+from openstackclient.common import commandindex
+from openstackclient.common import httppool
+from openstackclient.object import client as object_client
 from openstackclient.tests.unit import fakes
+from openstackclient.tests.unit import utils
 
 
 class TestClientManager(osc_lib_test_utils.TestClientManager):
@@ -69,3 +76,87 @@ class TestClientManager(osc_lib_test_utils.TestClientManager):
         # This is True because ClientManager.auth_ref returns None in this
         # test; "no service catalog" means use Network API by default now
         self.assertTrue(client_manager.is_network_endpoint_enabled())
+
+    def test_client_manager_http_pool(self):
+        client_manager = self._make_clientmanager(
+            config_args={
+                'http_pool_maxsize': 32,
+                'http_compression': 'identity',
+            },
+        )
+
+        self.assertEqual(
+            (httppool.DEFAULT_POOL_CONNECTIONS, 32),
+            httppool.get_pool_sizes(client_manager.session),
+        )
+        self.assertEqual(
+            'identity',
+            client_manager.session.session.headers['Accept-Encoding'],
+        )
+        # The SDK and the other clients use the same session
+        self.assertIs(
+            client_manager.session,
+            client_manager._cli_options.get_session(),
+        )
+
+
+class TestPluginModule(utils.TestCase):
+
+    def setUp(self):
+        super(TestPluginModule, self).setUp()
+        self.ep = commandindex.IndexedEntryPoint(
+            'object_store',
+            'openstackclient.object.client',
+        )
+
+    def test_plugin_module_lazy(self):
+        with mock.patch('importlib.import_module') as import_mock:
+            mod = clientmanager.PluginModule(self.ep)
+            self.assertEqual('object_store', mod.API_NAME)
+            self.assertFalse(mod.loaded)
+            self.assertNotCalled(import_mock)
+
+    def test_plugin_module_load(self):
+        mod = clientmanager.PluginModule(self.ep)
+        self.assertEqual('os_object_api_version', mod.API_VERSION_OPTION)
+        self.assertTrue(mod.loaded)
+        self.assertEqual(object_client, mod.load())
+
+    def test_plugin_module_load_failed(self):
+        ep = commandindex.IndexedEntryPoint('fake', 'fake_does_not_exist')
+        mod = clientmanager.PluginModule(ep)
+        self.assertIsNone(mod.load())
+        self.assertRaises(AttributeError, getattr, mod, 'API_VERSIONS')
+
+    def test_plugin_module_make_client(self):
+        mod = clientmanager.PluginModule(self.ep)
+        check = mock.Mock()
+        mod.set_version_check(check)
+        instance = mock.Mock()
+
+        with mock.patch.object(object_client, 'make_client') as make_mock:
+            mod.make_client(instance)
+            mod.make_client(instance)
+
+        check.assert_called_once_with()
+        make_mock.assert_called_with(instance)
+        self.assertEqual(2, make_mock.call_count)
+
+    def test_plugin_module_get_settings(self):
+        tmp_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_COMMAND_INDEX', os.path.join(tmp_dir, 'index.json')))
+        expected = {
+            'API_VERSION_OPTION': 'os_object_api_version',
+            'DEFAULT_API_VERSION': '1',
+        }
+
+        mod = clientmanager.PluginModule(self.ep)
+        self.assertEqual(expected, mod.get_settings())
+        self.assertTrue(mod.loaded)
+
+        # Later runs read the settings from the command index
+        commandindex._INDEX = None
+        mod = clientmanager.PluginModule(self.ep)
+        self.assertEqual(expected, mod.get_settings())
+        self.assertFalse(mod.loaded)
@@ -0,0 +1,184 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import json
+import os
+
+import fixtures
+import mock
+
+from openstackclient.common import commandindex
+from openstackclient.common import commandmanager
+from openstackclient.tests.unit import utils
+
+
+def _fake_entry_point(name, module_name, attrs):
+    ep = mock.Mock()
+    ep.name = name
+    ep.module_name = module_name
+    ep.attrs = attrs
+    return ep
+
+
+FAKE_ENTRY_POINTS = [
+    _fake_entry_point(
+        'module_list',
+        'openstackclient.common.module',
+        ('ListModule',),
+    ),
+    _fake_entry_point(
+        'command_list',
+        'openstackclient.common.module',
+        ('ListCommand',),
+    ),
+]
+
+
+class TestIndexedEntryPoint(utils.TestCase):
+
+    def test_load(self):
+        ep = commandindex.IndexedEntryPoint(
+            'module_list',
+            'openstackclient.common.module:ListModule',
+        )
+        from openstackclient.common import module
+        self.assertEqual('openstackclient.common.module', ep.module_name)
+        self.assertEqual(('ListModule',), ep.attrs)
+        self.assertEqual(module.ListModule, ep.load())
+        self.assertEqual(module.ListModule, ep.resolve())
+
+    def test_load_module(self):
+        ep = commandindex.IndexedEntryPoint(
+            'common',
+            'openstackclient.common.module',
+        )
+        from openstackclient.common import module
+        self.assertEqual((), ep.attrs)
+        self.assertEqual(module, ep.load())
+
+
+class TestCommandIndex(utils.TestCase):
+
+    def setUp(self):
+        super(TestCommandIndex, self).setUp()
+        self.tmp_dir = self.useFixture(fixtures.TempDir()).path
+        self.index_path = os.path.join(self.tmp_dir, 'index.json')
+        self.scan_mock = self.useFixture(fixtures.MockPatch(
+            'openstackclient.common.commandindex.scan_group',
+            return_value=FAKE_ENTRY_POINTS,
+        )).mock
+
+    def _make_index(self, signature='sig'):
+        return commandindex.CommandIndex(
+            path=self.index_path,
+            signature=signature,
+        )
+
+    def test_get_entry_points_miss(self):
+        eps = commandindex.get_entry_points('test', index=self._make_index())
+
+        self.scan_mock.assert_called_once_with('test')
+        self.assertEqual(['module_list', 'command_list'],
+                         [ep.name for ep in eps])
+        self.assertEqual(
+            'openstackclient.common.module:ListCommand',
+            eps[1].value,
+        )
+        with open(self.index_path) as f:
+            data = json.load(f)
+        self.assertEqual('sig', data['signature'])
+        self.assertEqual(
+            {
+                'module_list': 'openstackclient.common.module:ListModule',
+                'command_list': 'openstackclient.common.module:ListCommand',
+            },
+            data['groups']['test'],
+        )
+
+    def test_get_entry_points_hit(self):
+        commandindex.get_entry_points('test', index=self._make_index())
+        self.scan_mock.reset_mock()
+
+        eps = commandindex.get_entry_points('test', index=self._make_index())
+
+        self.assertNotCalled(self.scan_mock)
+        self.assertEqual(['module_list', 'command_list'],
+                         [ep.name for ep in eps])
+
+    def test_get_entry_points_stale(self):
+        commandindex.get_entry_points('test', index=self._make_index())
+        self.scan_mock.reset_mock()
+
+        commandindex.get_entry_points(
+            'test',
+            index=self._make_index(signature='new-sig'),
+        )
+
+        self.scan_mock.assert_called_once_with('test')
+
+    def test_get_entry_points_disabled(self):
+        index = commandindex.CommandIndex(path=None)
+        commandindex.get_entry_points('test', index=index)
+        commandindex.get_entry_points('test', index=index)
+
+        self.assertEqual(2, self.scan_mock.call_count)
+        self.assertFalse(os.path.exists(self.index_path))
+
+    def test_get_index_path(self):
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_COMMAND_INDEX', self.index_path))
+        self.assertEqual(self.index_path, commandindex.get_index_path())
+
+        self.useFixture(fixtures.EnvironmentVariable('OS_COMMAND_INDEX', ''))
+        self.assertIsNone(commandindex.get_index_path())
+
+        self.useFixture(fixtures.EnvironmentVariable('OS_COMMAND_INDEX'))
+        self.useFixture(fixtures.EnvironmentVariable(
+            'XDG_CACHE_HOME', self.tmp_dir))
+        self.assertEqual(
+            os.path.join(self.tmp_dir, 'openstack', 'osc-command-index.json'),
+            commandindex.get_index_path(),
+        )
+
+    def test_command_manager_uses_index(self):
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_COMMAND_INDEX', self.index_path))
+
+        mgr = commandmanager.CommandManager('test')
+        self.scan_mock.assert_called_once_with('test')
+
+        from openstackclient.common import module
+        cmd, name, args = mgr.find_command(['command', 'list', '--group'])
+        self.assertEqual(module.ListCommand, cmd)
+        self.assertEqual('command list', name)
+        self.assertEqual(['--group'], args)
+
+
+class TestComputeSignature(utils.TestCase):
+
+    def test_signature_changes(self):
+        tmp_dir = self.useFixture(fixtures.TempDir()).path
+        sig_empty = commandindex.compute_signature([tmp_dir])
+
+        dist_dir = os.path.join(tmp_dir, 'fake-1.0.dist-info')
+        os.mkdir(dist_dir)
+        sig_dist = commandindex.compute_signature([tmp_dir])
+        self.assertNotEqual(sig_empty, sig_dist)
+
+        ep_file = os.path.join(dist_dir, 'entry_points.txt')
+        with open(ep_file, 'w') as f:
+            f.write('[openstack.cli]\n')
+        os.utime(ep_file, (1, 1))
+        sig_ep = commandindex.compute_signature([tmp_dir])
+        self.assertNotEqual(sig_dist, sig_ep)
+        self.assertEqual(sig_ep, commandindex.compute_signature([tmp_dir]))
@@ -13,8 +13,10 @@
 #   under the License.
 #
 
+import fixtures
 import mock
 
+from openstackclient.common import commandindex
 from openstackclient.common import commandmanager
 from openstackclient.tests.unit import utils
 
@@ -92,8 +94,12 @@ class TestCommandManager(utils.TestCase):
     def test_get_command_names(self):
         mock_cmd_one = mock.Mock()
         mock_cmd_one.name = 'one'
+        mock_cmd_one.module_name = 'fake.one'
+        mock_cmd_one.attrs = ('One',)
         mock_cmd_two = mock.Mock()
         mock_cmd_two.name = 'cmd two'
+        mock_cmd_two.module_name = 'fake.two'
+        mock_cmd_two.attrs = ('Two',)
         mock_pkg_resources = mock.Mock(
             return_value=[mock_cmd_one, mock_cmd_two],
         )
@@ -105,3 +111,91 @@ class TestCommandManager(utils.TestCase):
             iter_entry_points.assert_called_once_with('test')
             cmds = mgr.get_command_names('test')
             self.assertEqual(['one', 'cmd two'], cmds)
+
+
+class ComputeServerList(FakeCommand):
+    pass
+
+
+class NetworkServerList(FakeCommand):
+    pass
+
+
+def _target(cls):
+    return '%s:%s' % (__name__, cls.__name__)
+
+
+class TestLazyCommandGroups(utils.TestCase):
+
+    GROUPS = {
+        'test': {'one': _target(FakeCommand)},
+        'compute': {'server_list': _target(ComputeServerList)},
+        'network': {
+            'network_list': _target(FakeCommand),
+            'server_list': _target(NetworkServerList),
+        },
+        'volume': {'volume_list': _target(FakeCommand)},
+    }
+
+    def setUp(self):
+        super(TestLazyCommandGroups, self).setUp()
+        self.scanned = []
+
+        def get_entry_points(group):
+            self.scanned.append(group)
+            return [
+                commandindex.IndexedEntryPoint(name, target)
+                for name, target in self.GROUPS.get(group, {}).items()
+            ]
+
+        def get_entry_point_names(group):
+            return list(self.GROUPS.get(group, {}))
+
+        self.useFixture(fixtures.MockPatch(
+            'openstackclient.common.commandindex.get_entry_points',
+            side_effect=get_entry_points,
+        ))
+        self.useFixture(fixtures.MockPatch(
+            'openstackclient.common.commandindex.get_entry_point_names',
+            side_effect=get_entry_point_names,
+        ))
+
+        self.mgr = commandmanager.CommandManager('test')
+        for group in ('compute', 'network', 'volume'):
+            self.mgr.add_command_group(group)
+
+    def test_find_command_loads_matching_groups(self):
+        self.assertEqual(['test'], self.scanned)
+        self.assertEqual(
+            ['test', 'compute', 'network', 'volume'],
+            self.mgr.get_command_groups(),
+        )
+
+        cmd, name, args = self.mgr.find_command(['server', 'list', '--all'])
+
+        # The group added last still wins when groups define the same name
+        self.assertIs(NetworkServerList, cmd)
+        self.assertEqual(['--all'], args)
+        self.assertEqual(['test', 'compute', 'network'], self.scanned)
+
+    def test_find_command_loads_in_order(self):
+        self.mgr.find_command(['network', 'list'])
+        self.mgr.find_command(['server', 'list'])
+
+        self.assertEqual(['test', 'network', 'compute'], self.scanned)
+        cmd, name, args = self.mgr.find_command(['server', 'list'])
+        self.assertIs(NetworkServerList, cmd)
+
+    def test_find_command_miss_loads_all(self):
+        self.assertRaises(ValueError, self.mgr.find_command, ['bogus'])
+        self.assertEqual(
+            ['test', 'compute', 'network', 'volume'],
+            self.scanned,
+        )
+
+    def test_iter_loads_all(self):
+        names = sorted(name for name, ep in self.mgr)
+        self.assertEqual(
+            ['network list', 'one', 'server list', 'volume list'],
+            names,
+        )
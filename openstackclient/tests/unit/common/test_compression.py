@@ -0,0 +1,108 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import gzip
+import io
+import json
+
+from keystoneauth1 import session as ksa_session
+from osc_lib import exceptions
+from requests_mock.contrib import fixture
+import six
+
+from openstackclient.common import compression
+from openstackclient.tests.unit import utils
+
+
+URL = 'https://api.example.com:1234/v1/container'
+
+LISTING = [{'name': 'object-%d' % i, 'bytes': i} for i in range(500)]
+
+
+def gzip_body(data):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+        f.write(json.dumps(data).encode('utf-8'))
+    return buf.getvalue()
+
+
+class TestCompression(utils.TestCase):
+
+    def setUp(self):
+        super(TestCompression, self).setUp()
+        self.addCleanup(compression.disable_report)
+        self.requests_mock = self.useFixture(fixture.Fixture())
+        self.session = ksa_session.Session()
+        self.body = gzip_body(LISTING)
+        self.requests_mock.register_uri(
+            'GET',
+            URL,
+            content=self.body,
+            headers={'Content-Encoding': 'gzip'},
+        )
+
+    def test_configure(self):
+        compression.configure(self.session)
+        self.session.get(URL)
+        self.assertEqual(
+            'gzip, deflate',
+            self.requests_mock.last_request.headers['Accept-Encoding'],
+        )
+
+        compression.configure(self.session, 'identity')
+        self.session.get(URL)
+        self.assertEqual(
+            'identity',
+            self.requests_mock.last_request.headers['Accept-Encoding'],
+        )
+        # The hook is only added once
+        self.assertEqual(1, len(self.session.session.hooks['response']))
+
+    def test_configure_invalid(self):
+        self.assertRaises(
+            exceptions.CommandError,
+            compression.configure,
+            self.session,
+            'brotli',
+        )
+
+    def test_report(self):
+        compression.configure(self.session)
+        stats = compression.enable_report()
+
+        self.assertEqual(LISTING, self.session.get(URL).json())
+        # Streamed responses are counted as they are read
+        response = self.session.get(URL, stream=True)
+        content = b''.join(response.iter_content(1024))
+        self.assertEqual(LISTING, json.loads(content.decode('utf-8')))
+
+        self.assertEqual(2, stats.responses)
+        self.assertEqual(2, stats.compressed)
+        self.assertEqual(2 * len(self.body), stats.wire_bytes)
+        self.assertEqual(2 * len(content), stats.content_bytes)
+
+        stream = six.StringIO()
+        compression.report(stream)
+        self.assertIn('2 of 2 responses compressed', stream.getvalue())
+        self.assertIn(
+            '%d bytes received' % (2 * len(self.body)),
+            stream.getvalue(),
+        )
+
+    def test_report_disabled(self):
+        compression.configure(self.session)
+        self.session.get(URL)
+
+        stream = six.StringIO()
+        compression.report(stream)
+        self.assertEqual('', stream.getvalue())
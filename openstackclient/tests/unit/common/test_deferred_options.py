@@ -0,0 +1,174 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import argparse
+import os
+
+import fixtures
+from osc_lib import utils as osc_utils
+
+from openstackclient.common import commandindex
+from openstackclient.common import deferred_options
+from openstackclient.tests.unit import utils
+
+
+def build_compute_options(parser):
+    parser.add_argument(
+        '--os-compute-api-version',
+        default=osc_utils.env('OS_COMPUTE_API_VERSION', default='2.1'),
+    )
+    return parser
+
+
+def build_auth_options(parser):
+    parser.add_argument(
+        '--os-username',
+        dest='username',
+        default=osc_utils.env('OS_USERNAME'),
+    )
+    parser.add_argument(
+        '--os-project-name',
+        dest='project_name',
+        default=osc_utils.env('OS_PROJECT_NAME', 'OS_TENANT_NAME'),
+    )
+    return parser
+
+
+class TestDeferredOptions(utils.TestCase):
+
+    def setUp(self):
+        super(TestDeferredOptions, self).setUp()
+        tmp_dir = self.useFixture(fixtures.TempDir()).path
+        self.index = commandindex.CommandIndex(
+            path=os.path.join(tmp_dir, 'index.json'),
+            signature='sig',
+        )
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_COMPUTE_API_VERSION', '2.50'))
+
+    def _parse(self, argv, environ=None, index=None):
+        deferred = deferred_options.DeferredOptions(index=index or self.index)
+        deferred.add_group('compute', build_compute_options)
+        deferred.add_group('auth', build_auth_options)
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument('--os-cloud', dest='cloud')
+        deferred.build(parser)
+        deferred.materialize(parser, argv, environ=environ or {})
+        options, _rest = parser.parse_known_args(argv)
+        return parser, options
+
+    def test_describe_group(self):
+        description = deferred_options.describe_group(build_compute_options)
+        self.assertEqual(['--os-compute-api-version'], description['options'])
+        self.assertEqual(
+            {'OS_COMPUTE_API_VERSION': 'os_compute_api_version'},
+            description['envs'],
+        )
+        # The environment is ignored when describing a group
+        self.assertEqual(
+            {'os_compute_api_version': '2.1'},
+            description['defaults'],
+        )
+        self.assertEqual('2.50', os.environ['OS_COMPUTE_API_VERSION'])
+
+    def test_deferred(self):
+        parser, options = self._parse(['--os-cloud', 'x', 'server', 'list'])
+        self.assertNotIn('--os-username', parser._option_string_actions)
+        self.assertEqual('2.1', options.os_compute_api_version)
+        self.assertIsNone(options.project_name)
+        self.assertEqual(
+            ['auth', 'compute'],
+            sorted(self.index.get_data(deferred_options.INDEX_DATA_KEY)),
+        )
+
+    def test_materialize_argv(self):
+        parser, options = self._parse(['--os-user=bob', 'server', 'list'])
+        self.assertEqual('bob', options.username)
+        self.assertNotIn(
+            '--os-compute-api-version',
+            parser._option_string_actions,
+        )
+
+    def test_materialize_environ(self):
+        parser, options = self._parse(
+            ['server', 'list'],
+            environ={'OS_COMPUTE_API_VERSION': '2.50'},
+        )
+        self.assertEqual('2.50', options.os_compute_api_version)
+        self.assertNotIn('--os-username', parser._option_string_actions)
+
+    def test_describe_group_envs(self):
+        description = deferred_options.describe_group(build_auth_options)
+        # Variables not named after their option are recorded too
+        self.assertEqual(
+            {
+                'OS_USERNAME': 'username',
+                'OS_PROJECT_NAME': 'project_name',
+                'OS_TENANT_NAME': 'project_name',
+            },
+            description['envs'],
+        )
+
+    def test_describe_group_import_envs(self):
+        imported = []
+
+        def builder(parser):
+            if not imported:
+                # Like a module reading the environment when imported
+                os.environ.get('OS_LIBRARY_DEBUG')
+                imported.append(True)
+            return build_compute_options(parser)
+
+        description = deferred_options.describe_group(builder)
+        self.assertEqual(
+            {'OS_COMPUTE_API_VERSION': 'os_compute_api_version'},
+            description['envs'],
+        )
+
+    def test_materialize_environ_other_name(self):
+        parser, options = self._parse(
+            ['server', 'list'],
+            environ={'OS_TENANT_NAME': 'demo'},
+        )
+        self.assertIn('--os-username', parser._option_string_actions)
+
+    def test_materialize_help(self):
+        for argv in (
+                [],
+                ['--help'],
+                ['--os-cloud', 'x', 'help'],
+                ['complete', '--shell', 'bash'],
+        ):
+            parser, options = self._parse(argv)
+            self.assertIn('--os-username', parser._option_string_actions)
+            self.assertIn(
+                '--os-compute-api-version',
+                parser._option_string_actions,
+            )
+
+    def test_materialize_command_help(self):
+        for argv in (
+                ['help', 'server', 'list'],
+                ['server', 'list', '--help'],
+                ['--os-cloud', 'help', 'server', 'show', 'help'],
+        ):
+            parser, options = self._parse(argv)
+            self.assertNotIn('--os-username', parser._option_string_actions)
+
+    def test_no_index(self):
+        parser, options = self._parse(
+            ['server', 'list'],
+            index=commandindex.CommandIndex(path=None),
+        )
+        self.assertIn('--os-username', parser._option_string_actions)
+        self.assertEqual('2.50', options.os_compute_api_version)
@@ -0,0 +1,115 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+from keystoneauth1 import session as ksa_session
+import mock
+from osc_lib import exceptions
+from requests import adapters
+
+from openstackclient.common import httppool
+from openstackclient.tests.unit import utils
+
+
+class TestHTTPPool(utils.TestCase):
+
+    def setUp(self):
+        super(TestHTTPPool, self).setUp()
+        self.session = ksa_session.Session()
+
+    def test_configure(self):
+        httppool.configure(
+            self.session,
+            pool_connections='4',
+            pool_maxsize=64,
+        )
+
+        self.assertEqual((4, 64), httppool.get_pool_sizes(self.session))
+        for scheme in ('https://', 'http://'):
+            adapter = self.session.session.get_adapter(scheme + 'example.com')
+            self.assertIsInstance(adapter, ksa_session.TCPKeepAliveAdapter)
+
+    def test_configure_defaults(self):
+        httppool.configure(self.session)
+
+        self.assertEqual(
+            (
+                httppool.DEFAULT_POOL_CONNECTIONS,
+                httppool.DEFAULT_POOL_MAXSIZE,
+            ),
+            httppool.get_pool_sizes(self.session),
+        )
+
+    def test_configure_invalid(self):
+        self.assertRaises(
+            exceptions.CommandError,
+            httppool.configure,
+            self.session,
+            pool_maxsize='many',
+        )
+        self.assertRaises(
+            exceptions.CommandError,
+            httppool.configure,
+            self.session,
+            pool_connections=0,
+        )
+
+    def test_ensure_pool_maxsize(self):
+        httppool.configure(self.session, pool_connections=4, pool_maxsize=16)
+        adapter = self.session.session.get_adapter('https://')
+
+        # Large enough pools are kept with their connections
+        httppool.ensure_pool_maxsize(self.session, 8)
+        self.assertIs(adapter, self.session.session.get_adapter('https://'))
+
+        httppool.ensure_pool_maxsize(self.session, 32)
+        self.assertEqual((4, 32), httppool.get_pool_sizes(self.session))
+
+    def test_adapter_retry(self):
+        policy = mock.Mock()
+        httppool.configure(self.session, retry_policy=policy)
+        self.assertIs(policy, httppool.get_retry_policy(self.session))
+
+        # The policy is kept when the pools grow
+        httppool.ensure_pool_maxsize(self.session, 32)
+        self.assertIs(policy, httppool.get_retry_policy(self.session))
+
+        adapter = self.session.session.get_adapter('https://')
+        request = mock.Mock(method='GET', url='https://example.com', body=None)
+        with mock.patch.object(adapters.HTTPAdapter, 'send') as send_mock:
+            policy.run.side_effect = lambda method, url, send, **kw: send()
+            adapter.send(request, timeout=5)
+            send_mock.assert_called_once_with(request, timeout=5)
+        policy.run.assert_called_once_with(
+            'GET',
+            'https://example.com',
+            mock.ANY,
+            replayable=True,
+        )
+
+        # Uploads are not sent again
+        request.body = mock.Mock()
+        with mock.patch.object(adapters.HTTPAdapter, 'send'):
+            adapter.send(request)
+        self.assertFalse(policy.run.call_args[1]['replayable'])
+
+    def test_ensure_retry_policy(self):
+        policy = mock.Mock()
+        httppool.configure(self.session, pool_maxsize=16)
+
+        httppool.ensure_retry_policy(self.session, policy)
+        self.assertIs(policy, httppool.get_retry_policy(self.session))
+        self.assertEqual(16, httppool.get_pool_sizes(self.session)[1])
+
+        # A configured policy is kept
+        httppool.ensure_retry_policy(self.session, mock.Mock())
+        self.assertIs(policy, httppool.get_retry_policy(self.session))
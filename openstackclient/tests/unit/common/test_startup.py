@@ -0,0 +1,106 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import importlib
+import json
+import os
+import sys
+
+import fixtures
+import six
+from six.moves import builtins
+
+from openstackclient.common import startup
+from openstackclient.tests.unit import utils
+
+
+class TestStartupProfile(utils.TestCase):
+
+    def setUp(self):
+        super(TestStartupProfile, self).setUp()
+        self.addCleanup(startup.disable)
+
+    def test_phase_disabled(self):
+        self.assertIsNone(startup.get_profile())
+        with startup.phase('anything'):
+            pass
+        stream = six.StringIO()
+        startup.report(stream)
+        self.assertEqual('', stream.getvalue())
+
+    def test_phases(self):
+        profile = startup.enable()
+        for i in range(2):
+            with startup.phase('outer'):
+                with startup.phase('inner'):
+                    pass
+
+        self.assertEqual(['outer > inner', 'outer'], profile.phase_order)
+        self.assertEqual(2, profile.phases['outer']['count'])
+        self.assertEqual(
+            ['outer', 'outer > inner'],
+            sorted(p['phase'] for p in profile.to_dict()['phases']),
+        )
+
+    def test_imports(self):
+        import_func = builtins.__import__
+        import_module = importlib.import_module
+        tmp_dir = self.useFixture(fixtures.TempDir()).path
+        with open(os.path.join(tmp_dir, 'osc_startup_outer.py'), 'w') as f:
+            f.write('import osc_startup_inner\n')
+        with open(os.path.join(tmp_dir, 'osc_startup_inner.py'), 'w') as f:
+            f.write('x = 1\n')
+        self.useFixture(fixtures.MonkeyPatch(
+            'sys.path', [tmp_dir] + sys.path))
+        for name in ('osc_startup_outer', 'osc_startup_inner'):
+            self.addCleanup(sys.modules.pop, name, None)
+
+        profile = startup.enable()
+        importlib.import_module('osc_startup_outer')
+        startup.report(six.StringIO())
+
+        # The import hooks are removed when reporting
+        self.assertIs(import_func, builtins.__import__)
+        self.assertIs(import_module, importlib.import_module)
+        outer = profile.imports['osc_startup_outer']
+        inner = profile.imports['osc_startup_inner']
+        self.assertGreaterEqual(outer['time'], inner['time'])
+        self.assertLessEqual(outer['self'], outer['time'] - inner['time'])
+
+    def test_report(self):
+        startup.enable()
+        with startup.phase('plugin import'):
+            pass
+        tmp_dir = self.useFixture(fixtures.TempDir()).path
+        json_file = os.path.join(tmp_dir, 'profile.json')
+        stream = six.StringIO()
+
+        startup.report(stream, json_file)
+
+        self.assertIn('plugin import', stream.getvalue())
+        with open(json_file) as f:
+            data = json.load(f)
+        self.assertEqual('plugin import', data['phases'][0]['phase'])
+        self.assertIn('total', data)
+
+    def test_report_json_stream(self):
+        startup.enable()
+        stream = six.StringIO()
+        startup.report(stream, '-')
+        self.assertEqual([], json.loads(stream.getvalue())['phases'])
+
+    def test_requested(self):
+        self.assertTrue(startup.requested(['--profile-startup', 'help']))
+        self.assertTrue(
+            startup.requested(['--profile-startup-file=-', 'help']))
+        self.assertFalse(startup.requested(['server', 'list']))
@@ -0,0 +1,154 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import json
+import os
+import threading
+
+import fixtures
+import mock
+import requests
+
+from openstackclient.common import httppool
+from openstackclient.common import startup
+from openstackclient.common import trace
+from openstackclient.tests.unit import utils
+
+
+def make_request(method='GET', url='https://compute.example.com/v2/servers',
+                 body=None):
+    return requests.Request(method, url, data=body).prepare()
+
+
+def make_response(status_code=200, content=b'[]'):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+class TestTrace(utils.TestCase):
+
+    def setUp(self):
+        super(TestTrace, self).setUp()
+        self.addCleanup(trace.disable)
+
+    def _events(self, tracer, cat):
+        return [
+            e for e in tracer.to_dict()['traceEvents']
+            if e.get('cat') == cat
+        ]
+
+    def test_disabled(self):
+        self.assertFalse(trace.is_enabled())
+        with trace.span('anything'):
+            pass
+        send = mock.Mock(return_value=make_response())
+        trace.traced_send(send, make_request())
+        trace.write(self.useFixture(fixtures.TempDir()).path + '/trace')
+        self.assertIsNone(trace.get_tracer())
+
+    def test_spans(self):
+        tracer = trace.enable()
+
+        @trace.traced('lookup')
+        def lookup():
+            return 'found'
+
+        with startup.phase('command'):
+            self.assertEqual('found', lookup())
+
+        events = self._events(tracer, 'phase')
+        self.assertEqual(['command', 'lookup'], [e['name'] for e in events])
+        # Nested in the command span
+        self.assertLessEqual(events[0]['ts'], events[1]['ts'])
+        self.assertGreaterEqual(
+            events[0]['ts'] + events[0]['dur'],
+            events[1]['ts'] + events[1]['dur'],
+        )
+
+    def test_requests(self):
+        tracer = trace.enable()
+        trace.add_endpoint('https://compute.example.com/v2/', 'compute')
+        trace.add_endpoint('https://compute.example.com/v2/p1', 'other')
+
+        send = mock.Mock(return_value=make_response(content=b'[1, 2]'))
+        trace.traced_send(
+            send, make_request('POST', body=b'{"a": 1}'), timeout=5)
+        send.assert_called_once_with(mock.ANY, timeout=5)
+
+        error = requests.exceptions.ConnectionError('refused')
+        thread = threading.Thread(
+            target=self.assertRaises,
+            args=(
+                requests.exceptions.ConnectionError,
+                trace.traced_send,
+                mock.Mock(side_effect=error),
+                make_request(url='https://image.example.com/v2/images'),
+            ),
+            name='worker',
+        )
+        thread.start()
+        thread.join()
+
+        events = self._events(tracer, 'http')
+        self.assertEqual(
+            ['POST compute', 'GET image.example.com'],
+            [e['name'] for e in events],
+        )
+        self.assertEqual({
+            'url': 'https://compute.example.com/v2/servers',
+            'service_type': 'compute',
+            'status': 200,
+            'bytes_in': 6,
+            'bytes_out': 8,
+        }, events[0]['args'])
+        self.assertEqual('refused', events[1]['args']['error'])
+        self.assertNotEqual(events[0]['tid'], events[1]['tid'])
+        self.assertIn(
+            {'name': 'worker'},
+            [
+                e['args'] for e in tracer.to_dict()['traceEvents']
+                if e['name'] == 'thread_name'
+            ],
+        )
+
+    def test_pool_adapter(self):
+        tracer = trace.enable()
+        session = requests.Session()
+        httppool.configure(session)
+        with mock.patch.object(
+                requests.adapters.HTTPAdapter,
+                'send',
+                return_value=make_response(),
+        ):
+            session.get_adapter('https://').send(make_request())
+
+        self.assertEqual(1, len(self._events(tracer, 'http')))
+
+    def test_write(self):
+        trace.enable()
+        with trace.span('command'):
+            pass
+        path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'trace.json')
+
+        trace.write(path)
+
+        with open(path) as f:
+            data = json.load(f)
+        self.assertEqual('ms', data['displayTimeUnit'])
+        self.assertEqual(
+            ['process_name', 'thread_name', 'command'],
+            [e['name'] for e in data['traceEvents']],
+        )
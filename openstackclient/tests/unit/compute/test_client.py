@@ -0,0 +1,129 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import time
+
+import fixtures
+from keystoneauth1 import exceptions as ks_exceptions
+import mock
+import novaclient
+from novaclient import api_versions
+from osc_lib import exceptions
+
+from openstackclient.compute import client as compute_client
+from openstackclient.tests.unit import utils
+
+
+ENDPOINT = 'http://compute.example.com/v2.1'
+
+
+class TestDiscovery(utils.TestCase):
+
+    def setUp(self):
+        super(TestDiscovery, self).setUp()
+        self.useFixture(fixtures.MonkeyPatch(
+            'openstackclient.compute.client._discovery_cache', None))
+        self.client = mock.Mock()
+        self.client.versions.get_current.return_value = mock.Mock(
+            min_version='2.1',
+            version='2.42',
+        )
+
+    def _forget_memory(self):
+        compute_client._discovery_cache = None
+
+    def test_discover_version_cached(self):
+        self.assertEqual(
+            api_versions.APIVersion('2.42'),
+            compute_client._discover_version(self.client, ENDPOINT),
+        )
+        # A new process reads the result from the cache file
+        self._forget_memory()
+        self.assertEqual(
+            api_versions.APIVersion('2.42'),
+            compute_client._discover_version(self.client, ENDPOINT),
+        )
+        self.client.versions.get_current.assert_called_once_with()
+
+        compute_client._discover_version(self.client, ENDPOINT + '/other')
+        self.assertEqual(2, self.client.versions.get_current.call_count)
+
+    def test_discover_version_expired(self):
+        compute_client._discover_version(self.client, ENDPOINT)
+        with mock.patch.object(
+            time, 'time',
+            return_value=time.time() + compute_client.DISCOVERY_CACHE_TTL + 1,
+        ):
+            compute_client._discover_version(self.client, ENDPOINT)
+        self.assertEqual(2, self.client.versions.get_current.call_count)
+
+    def test_discover_version_client_max(self):
+        self.client.versions.get_current.return_value.version = '2.999'
+        self.assertEqual(
+            novaclient.API_MAX_VERSION,
+            compute_client._discover_version(self.client, ENDPOINT),
+        )
+
+    def test_discover_version_no_microversions(self):
+        self.client.versions.get_current.return_value = None
+        self.assertEqual(
+            api_versions.APIVersion('2.0'),
+            compute_client._discover_version(self.client, ENDPOINT),
+        )
+
+    def test_discover_version_server_min(self):
+        self.client.versions.get_current.return_value = mock.Mock(
+            min_version='2.999',
+            version='2.1000',
+        )
+        self.assertRaises(
+            exceptions.CommandError,
+            compute_client._discover_version,
+            self.client,
+            ENDPOINT,
+        )
+
+    def test_discover_version_failed(self):
+        self.client.versions.get_current.side_effect = (
+            ks_exceptions.ConnectFailure()
+        )
+        self.assertEqual(
+            api_versions.APIVersion('2.0'),
+            compute_client._discover_version(self.client, ENDPOINT),
+        )
+        # The failure is not cached
+        self.client.versions.get_current.side_effect = None
+        self.assertEqual(
+            api_versions.APIVersion('2.42'),
+            compute_client._discover_version(self.client, ENDPOINT),
+        )
+
+    @mock.patch('novaclient.client.discover_extensions')
+    def test_discover_extensions_cached(self, discover):
+        ext = mock.Mock(module=compute_client)
+        ext.name = 'list_extensions'
+        other = mock.Mock()
+        other.name = 'other'
+        discover.return_value = [ext, other]
+        version = api_versions.APIVersion('2.1')
+
+        self.assertEqual(
+            [ext],
+            compute_client._discover_extensions(version),
+        )
+        self._forget_memory()
+        extensions = compute_client._discover_extensions(version)
+
+        discover.assert_called_once_with(version)
+        self.assertEqual(['list_extensions'], [e.name for e in extensions])
+        self.assertIs(compute_client, extensions[0].module)
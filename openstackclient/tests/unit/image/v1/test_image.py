@@ -417,11 +417,35 @@ class TestImageList(TestImage):
         ), )
         self.assertEqual(datalist, tuple(data))
 
-    @mock.patch('openstackclient.api.utils.simple_filter')
-    def test_image_list_property_option(self, sf_mock):
-        sf_mock.side_effect = [
-            [self.image_info], [],
+    def test_image_list_multiple_property_options(self):
+        images = [
+            {'id': 'id-1', 'name': 'both', 'status': 'active',
+             'properties': {'a': '1', 'b': '2'}},
+            {'id': 'id-2', 'name': 'only-a', 'status': 'active',
+             'properties': {'a': '1'}},
+            {'id': 'id-3', 'name': 'other-b', 'status': 'active',
+             'properties': {'a': '1', 'b': '3'}},
         ]
+        self.api_mock.image_list.side_effect = [images, []]
+
+        arglist = [
+            '--property', 'a=1',
+            '--property', 'b=2',
+        ]
+        verifylist = [
+            ('property', {'a': '1', 'b': '2'}),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # Every property must match, not only the first one
+        self.assertEqual(self.columns, columns)
+        self.assertEqual((('id-1', 'both', 'active'),), tuple(data))
+
+    @mock.patch('openstackclient.api.utils.filter_items')
+    def test_image_list_property_option(self, sf_mock):
+        sf_mock.return_value = [self.image_info]
 
         arglist = [
             '--property', 'a=1',
@@ -435,16 +459,18 @@ class TestImageList(TestImage):
         # returns a tuple containing the column names and an iterable
         # containing the data to be listed.
         columns, data = self.cmd.take_action(parsed_args)
+        # The listing is filtered as it is fetched
+        items, filters = sf_mock.call_args[0]
+        self.assertEqual([self.image_info], list(items))
+        self.assertEqual({'a': '1'}, filters)
+        self.assertEqual(
+            {'property_field': 'properties'},
+            sf_mock.call_args[1],
+        )
         self.api_mock.image_list.assert_called_with(
             detailed=True,
             marker=self._image.id,
         )
-        sf_mock.assert_called_with(
-            [self.image_info],
-            attr='a',
-            value='1',
-            property_field='properties',
-        )
 
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
@@ -463,14 +489,14 @@ class TestImageList(TestImage):
         # returns a tuple containing the column names and an iterable
         # containing the data to be listed.
         columns, data = self.cmd.take_action(parsed_args)
+        # The listing is handed over as it is fetched
+        items, sort_str = si_mock.call_args[0]
+        self.assertEqual([self.image_info], list(items))
+        self.assertEqual('name:asc', sort_str)
         self.api_mock.image_list.assert_called_with(
             detailed=True,
             marker=self._image.id,
         )
-        si_mock.assert_called_with(
-            [self.image_info],
-            'name:asc'
-        )
 
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
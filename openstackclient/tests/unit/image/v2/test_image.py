@@ -691,7 +691,7 @@ class TestImageList(TestImage):
         ), )
         self.assertEqual(datalist, tuple(data))
 
-    @mock.patch('openstackclient.api.utils.simple_filter')
+    @mock.patch('openstackclient.api.utils.filter_items')
     def test_image_list_property_option(self, sf_mock):
         sf_mock.return_value = [copy.deepcopy(self._image)]
 
@@ -707,19 +707,46 @@ class TestImageList(TestImage):
         # returns a tuple containing the column names and an iterable
         # containing the data to be listed.
         columns, data = self.cmd.take_action(parsed_args)
+        # The listing is filtered as it is fetched
+        items, filters = sf_mock.call_args[0]
+        self.assertEqual([self._image], list(items))
+        self.assertEqual({'a': '1'}, filters)
+        self.assertEqual(
+            {'property_field': 'properties'},
+            sf_mock.call_args[1],
+        )
         self.api_mock.image_list.assert_called_with(
             marker=self._image.id,
         )
-        sf_mock.assert_called_with(
-            [self._image],
-            attr='a',
-            value='1',
-            property_field='properties',
-        )
 
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
 
+    def test_image_list_multiple_property_options(self):
+        images = [
+            {'id': 'id-1', 'name': 'both', 'status': 'active',
+             'a': '1', 'b': '2'},
+            {'id': 'id-2', 'name': 'only-a', 'status': 'active', 'a': '1'},
+            {'id': 'id-3', 'name': 'other-b', 'status': 'active',
+             'a': '1', 'b': '3'},
+        ]
+        self.api_mock.image_list.side_effect = [images, []]
+
+        arglist = [
+            '--property', 'a=1',
+            '--property', 'b=2',
+        ]
+        verifylist = [
+            ('property', {'a': '1', 'b': '2'}),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # Every property must match, not only the first one
+        self.assertEqual(self.columns, columns)
+        self.assertEqual((('id-1', 'both', 'active'),), tuple(data))
+
     @mock.patch('osc_lib.utils.sort_items')
     def test_image_list_sort_option(self, si_mock):
         si_mock.return_value = [copy.deepcopy(self._image)]
@@ -732,14 +759,13 @@ class TestImageList(TestImage):
         # returns a tuple containing the column names and an iterable
         # containing the data to be listed.
         columns, data = self.cmd.take_action(parsed_args)
+        # The listing is handed over as it is fetched
+        items, sort_str, sort_type = si_mock.call_args[0]
+        self.assertEqual([self._image], list(items))
+        self.assertEqual(('name:asc', str), (sort_str, sort_type))
         self.api_mock.image_list.assert_called_with(
             marker=self._image.id,
         )
-        si_mock.assert_called_with(
-            [self._image],
-            'name:asc',
-            str,
-        )
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
 
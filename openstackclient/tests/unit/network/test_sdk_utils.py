@@ -10,6 +10,8 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
+from openstack.network.v2 import port as _port
+
 from openstackclient.network import sdk_utils
 from openstackclient.tests.unit import utils as tests_utils
 
@@ -57,3 +59,31 @@ class TestSDKUtils(tests_utils.TestCase):
             {'foo': 'foo1', 'bar': 'bar1'},
             {'foo': 'foo_map', 'new': 'bar'},
             ('bar', 'foo_map'), ('bar', 'foo'))
+
+    def test_get_fields_for_columns(self):
+        columns = ('id', 'name', 'mac_address', 'security_group_ids')
+        self.assertEqual(
+            ['id', 'mac_address', 'security_groups'],
+            sdk_utils.get_fields_for_columns(
+                _port.Port,
+                columns,
+                ['mac_address', 'security_group_ids'],
+            ),
+        )
+
+    def test_get_fields_for_columns_all(self):
+        columns = ('id', 'name')
+        self.assertIsNone(
+            sdk_utils.get_fields_for_columns(_port.Port, columns, columns))
+        # Unknown columns are left to the formatter to report
+        self.assertIsNone(
+            sdk_utils.get_fields_for_columns(_port.Port, columns, ['foo']))
+
+    def test_get_fields_for_columns_not_field(self):
+        self.assertIsNone(
+            sdk_utils.get_fields_for_columns(
+                _port.Port,
+                ('id', 'name', 'location'),
+                ['name', 'location'],
+            ),
+        )
@@ -725,6 +725,27 @@ class TestListPort(TestPort):
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.data, list(data))
 
+    def test_port_list_columns(self):
+        arglist = [
+            '-c', 'ID',
+            '-c', 'MAC Address',
+        ]
+        verifylist = [
+            ('columns', ['ID', 'MAC Address']),
+        ]
+
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.network.ports.assert_called_once_with(
+            fields=['id', 'mac_address'])
+        self.assertEqual(['ID', 'MAC Address'], columns)
+        self.assertEqual(
+            [(p.id, p.mac_address) for p in self._ports],
+            list(data),
+        )
+
     def test_port_list_router_opt(self):
         arglist = [
             '--router', 'fake-router-name',
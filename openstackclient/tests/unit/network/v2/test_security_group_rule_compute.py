@@ -550,11 +550,8 @@ class TestShowSecurityGroupRuleCompute(TestSecurityGroupRuleCompute):
 
         self.app.client_manager.network_endpoint_enabled = False
 
-        # Build a security group fake customized for this test.
-        security_group_rules = [self._security_group_rule]
-        security_group = {'rules': security_group_rules}
-        self.compute.api.security_group_list = mock.Mock(
-            return_value=[security_group],
+        self.compute.api.security_group_rule_find = mock.Mock(
+            return_value=self._security_group_rule,
         )
 
         # Get the command object to test
@@ -575,6 +572,19 @@ class TestShowSecurityGroupRuleCompute(TestSecurityGroupRuleCompute):
 
         columns, data = self.cmd.take_action(parsed_args)
 
-        self.compute.api.security_group_list.assert_called_once_with()
+        self.compute.api.security_group_rule_find.assert_called_once_with(
+            self._security_group_rule['id'],
+        )
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.data, data)
+
+    def test_security_group_rule_show_not_found(self):
+        self.compute.api.security_group_rule_find.side_effect = (
+            exceptions.NotFound("Could not find security group rule")
+        )
+        arglist = ['unknown']
+        verifylist = [('rule', 'unknown')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
@@ -81,7 +81,6 @@ class TestContainerDelete(TestContainer):
 
     def test_recursive_delete(self, c_mock, o_list_mock, o_delete_mock):
         c_mock.return_value = None
-        o_list_mock.return_value = [object_fakes.OBJECT]
         o_delete_mock.return_value = None
 
         arglist = [
@@ -94,14 +93,22 @@ class TestContainerDelete(TestContainer):
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
-        self.assertIsNone(self.cmd.take_action(parsed_args))
+        # Without bulk delete
+        with mock.patch.object(
+            self.api, 'get_capabilities', return_value={},
+        ), mock.patch.object(
+            self.api, 'object_iter', return_value=iter([object_fakes.OBJECT]),
+        ) as o_iter_mock:
+            self.assertIsNone(self.cmd.take_action(parsed_args))
 
         kwargs = {}
         c_mock.assert_called_with(
             container=object_fakes.container_name,
             **kwargs
         )
-        o_list_mock.assert_called_with(container=object_fakes.container_name)
+        # Every page of the listing is deleted
+        o_iter_mock.assert_called_with(object_fakes.container_name)
+        self.assertFalse(o_list_mock.called)
         o_delete_mock.assert_called_with(
             container=object_fakes.container_name,
             object=object_fakes.OBJECT['name'],
@@ -109,7 +116,6 @@ class TestContainerDelete(TestContainer):
 
     def test_r_delete(self, c_mock, o_list_mock, o_delete_mock):
         c_mock.return_value = None
-        o_list_mock.return_value = [object_fakes.OBJECT]
         o_delete_mock.return_value = None
 
         arglist = [
@@ -122,14 +128,22 @@ class TestContainerDelete(TestContainer):
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
-        self.assertIsNone(self.cmd.take_action(parsed_args))
+        # Without bulk delete
+        with mock.patch.object(
+            self.api, 'get_capabilities', return_value={},
+        ), mock.patch.object(
+            self.api, 'object_iter', return_value=iter([object_fakes.OBJECT]),
+        ) as o_iter_mock:
+            self.assertIsNone(self.cmd.take_action(parsed_args))
 
         kwargs = {}
         c_mock.assert_called_with(
             container=object_fakes.container_name,
             **kwargs
         )
-        o_list_mock.assert_called_with(container=object_fakes.container_name)
+        # Every page of the listing is deleted
+        o_iter_mock.assert_called_with(object_fakes.container_name)
+        self.assertFalse(o_list_mock.called)
         o_delete_mock.assert_called_with(
             container=object_fakes.container_name,
             object=object_fakes.OBJECT['name'],
@@ -325,12 +339,15 @@ class TestContainerList(TestContainer):
         )
         self.assertEqual(datalist, tuple(data))
 
-    def test_object_list_containers_all(self, c_mock):
-        c_mock.return_value = [
+    @mock.patch(
+        'openstackclient.api.object_store_v1.APIv1.container_iter'
+    )
+    def test_object_list_containers_all(self, i_mock, c_mock):
+        i_mock.return_value = iter([
             copy.deepcopy(object_fakes.CONTAINER),
             copy.deepcopy(object_fakes.CONTAINER_2),
             copy.deepcopy(object_fakes.CONTAINER_3),
-        ]
+        ])
 
         arglist = [
             '--all',
@@ -345,13 +362,9 @@ class TestContainerList(TestContainer):
         # containing the data to be listed.
         columns, data = self.cmd.take_action(parsed_args)
 
-        # Set expected values
-        kwargs = {
-            'full_listing': True,
-        }
-        c_mock.assert_called_with(
-            **kwargs
-        )
+        # The listing is output page by page
+        i_mock.assert_called_with()
+        c_mock.assert_not_called()
 
         self.assertEqual(self.columns, columns)
         datalist = (
@@ -13,6 +13,7 @@
 
 import copy
 
+import mock
 from requests_mock.contrib import fixture
 
 from openstackclient.object.v1 import container as container_cmds
@@ -244,44 +245,36 @@ class TestContainerSave(TestContainerAll):
         # Get the command object to test
         self.cmd = container_cmds.SaveContainer(self.app, None)
 
-# TODO(dtroyer): need to mock out object_lib.save_object() to test this
-#     def test_object_save_container(self):
-#         return_body = [
-#             copy.deepcopy(object_fakes.OBJECT),
-#             copy.deepcopy(object_fakes.OBJECT_2),
-#         ]
-#         # Initial container list request
-#         self.requests_mock.register_uri(
-#             'GET',
-#             object_fakes.ENDPOINT + '/oscar?format=json',
-#             json=return_body,
-#             status_code=200,
-#         )
-#         # Individual object save requests
-#         self.requests_mock.register_uri(
-#             'GET',
-#             object_fakes.ENDPOINT + '/oscar/' + object_fakes.object_name_1,
-#             json=object_fakes.OBJECT,
-#             status_code=200,
-#         )
-#         self.requests_mock.register_uri(
-#             'GET',
-#             object_fakes.ENDPOINT + '/oscar/' + object_fakes.object_name_2,
-#             json=object_fakes.OBJECT_2,
-#             status_code=200,
-#         )
-#
-#         arglist = [
-#             'oscar',
-#         ]
-#         verifylist = [(
-#             'container', 'oscar',
-#         )]
-#         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
-#
-#         # Command.take_action() returns None
-#         ret = self.cmd.take_action(parsed_args)
-#         self.assertIsNone(ret)
+    def test_object_save_container(self):
+        arglist = [
+            'oscar',
+            '--prefix', 'logs/',
+            '--concurrency', '4',
+            '--skip-identical',
+        ]
+        verifylist = [
+            ('container', 'oscar'),
+            ('prefix', 'logs/'),
+            ('concurrency', 4),
+            ('skip_identical', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(
+            self.app.client_manager.object_store,
+            'container_save',
+            return_value={'saved': 2, 'skipped': 1},
+        ) as container_save:
+            # Command.take_action() returns None
+            ret = self.cmd.take_action(parsed_args)
+
+        self.assertIsNone(ret)
+        container_save.assert_called_once_with(
+            container='oscar',
+            prefix='logs/',
+            concurrency=4,
+            skip_identical=True,
+        )
 
 
 class TestContainerShow(TestContainerAll):
@@ -294,11 +294,14 @@ class TestObjectList(TestObject):
         )
         self.assertEqual(datalist, tuple(data))
 
-    def test_object_list_objects_all(self, o_mock):
-        o_mock.return_value = [
+    @mock.patch(
+        'openstackclient.api.object_store_v1.APIv1.object_iter'
+    )
+    def test_object_list_objects_all(self, i_mock, o_mock):
+        i_mock.return_value = iter([
             copy.deepcopy(object_fakes.OBJECT),
             copy.deepcopy(object_fakes.OBJECT_2),
-        ]
+        ])
 
         arglist = [
             '--all',
@@ -315,14 +318,9 @@ class TestObjectList(TestObject):
         # containing the data to be listed.
         columns, data = self.cmd.take_action(parsed_args)
 
-        # Set expected values
-        kwargs = {
-            'full_listing': True,
-        }
-        o_mock.assert_called_with(
-            container=object_fakes.container_name,
-            **kwargs
-        )
+        # The listing is output page by page
+        i_mock.assert_called_with(object_fakes.container_name)
+        o_mock.assert_not_called()
 
         self.assertEqual(self.columns, columns)
         datalist = (
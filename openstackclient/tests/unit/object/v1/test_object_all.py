@@ -12,7 +12,9 @@
 #
 
 import copy
+import os
 
+import fixtures
 import mock
 from osc_lib import exceptions
 from requests_mock.contrib import fixture
@@ -20,6 +22,7 @@ import six
 
 from openstackclient.object.v1 import object as object_cmds
 from openstackclient.tests.unit.object.v1 import fakes as object_fakes
+from openstackclient.tests.unit import utils as tests_utils
 
 
 class TestObjectAll(object_fakes.TestObjectv1):
@@ -59,6 +62,154 @@ class TestObjectCreate(TestObjectAll):
                           self.cmd.take_action,
                           parsed_args)
 
+    def _make_files(self, count):
+        # Upload relative file names, which are the object names
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.useFixture(fixtures.TempDir()).path)
+        names = []
+        for i in range(count):
+            name = 'file-%d' % i
+            with open(name, 'wb') as f:
+                f.write(b'x' * (i + 1))
+            names.append(name)
+        return names
+
+    def _register_put(self, name, status_code=201):
+        self.requests_mock.register_uri(
+            'PUT',
+            object_fakes.ENDPOINT + '/' + object_fakes.container_name +
+            '/' + name,
+            headers={'Etag': 'etag-' + name},
+            status_code=status_code,
+        )
+
+    def test_object_create_concurrently(self):
+        names = self._make_files(5)
+        for name in names:
+            self._register_put(name)
+
+        arglist = [
+            object_fakes.container_name,
+            '--concurrency', '3',
+        ] + names
+        verifylist = [
+            ('container', object_fakes.container_name),
+            ('objects', names),
+            ('concurrency', 3),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('object', 'container', 'etag'), columns)
+        # The rows keep the order of the files
+        self.assertEqual(
+            [
+                (name, object_fakes.container_name,
+                 'etag-' + name)
+                for name in names
+            ],
+            list(data),
+        )
+
+    def test_object_create_partial_failure(self):
+        names = self._make_files(3)
+        self._register_put(names[0])
+        self._register_put(names[1], status_code=500)
+        self._register_put(names[2])
+
+        arglist = [object_fakes.container_name] + names
+        verifylist = [
+            ('container', object_fakes.container_name),
+            ('objects', names),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('object', 'container', 'etag', 'error'), columns)
+        rows = list(data)
+        # Every file has a row, in order, the failed one with its error
+        self.assertEqual(names, [row[0] for row in rows])
+        self.assertEqual(
+            ('file-0', object_fakes.container_name, 'etag-file-0', ''),
+            rows[0],
+        )
+        self.assertEqual('', rows[1][2])
+        self.assertIn('500', rows[1][3])
+        self.assertEqual('', rows[2][3])
+        # The other uploads were not aborted
+        self.assertEqual(
+            3,
+            len([r for r in self.requests_mock.request_history
+                 if r.method == 'PUT']),
+        )
+
+    def test_object_create_partial_failure_exit_status(self):
+        names = self._make_files(2)
+        self._register_put(names[0])
+        self._register_put(names[1], status_code=500)
+        parsed_args = self.check_parser(
+            self.cmd, [object_fakes.container_name] + names, [])
+
+        with mock.patch.object(self.cmd, 'produce_output') as produce_output:
+            exc = self.assertRaises(exceptions.CommandError,
+                                    self.cmd.run,
+                                    parsed_args)
+
+        # The rows are displayed before failing
+        produce_output.assert_called_once_with(
+            parsed_args, ('object', 'container', 'etag', 'error'), mock.ANY)
+        self.assertEqual('1 of 2 objects failed to upload.', str(exc))
+
+    def test_object_create_segmented(self):
+        names = self._make_files(1)
+        arglist = [
+            object_fakes.container_name,
+            '--segment-size', '2M',
+            '--segment-container', 'segments',
+        ] + names
+        verifylist = [
+            ('segment_size', 2 * 1024 * 1024),
+            ('segment_container', 'segments'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(
+            self.app.client_manager.object_store,
+            'object_create',
+            return_value={'object': names[0]},
+        ) as object_create:
+            columns, data = self.cmd.take_action(parsed_args)
+            list(data)
+
+        object_create.assert_called_once_with(
+            container=object_fakes.container_name,
+            object=names[0],
+            name=None,
+            segment_size=2 * 1024 * 1024,
+            segment_container='segments',
+            concurrency=10,
+        )
+
+    def test_object_create_invalid_segment_size(self):
+        arglist = [
+            object_fakes.container_name,
+            object_fakes.object_name_1,
+            '--segment-size', '0',
+        ]
+        self.assertRaises(tests_utils.ParserException, self.check_parser,
+                          self.cmd, arglist, [])
+
+    def test_object_create_invalid_concurrency(self):
+        arglist = [
+            object_fakes.container_name,
+            object_fakes.object_name_1,
+            '--concurrency', '0',
+        ]
+        self.assertRaises(tests_utils.ParserException, self.check_parser,
+                          self.cmd, arglist, [])
+
 
 class TestObjectList(TestObjectAll):
 
@@ -245,3 +396,30 @@ class TestObjectSave(TestObjectAll):
             self.cmd.take_action(parsed_args)
 
         self.assertEqual(fake_stdout.getvalue(), object_fakes.object_1_content)
+
+    def test_save_ranged(self):
+        arglist = [
+            object_fakes.container_name,
+            object_fakes.object_name_1,
+            '--range-size', '8M',
+            '--concurrency', '4',
+        ]
+        verifylist = [
+            ('range_size', 8 * 1024 * 1024),
+            ('concurrency', 4),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(
+            self.app.client_manager.object_store,
+            'object_save',
+        ) as object_save:
+            self.cmd.take_action(parsed_args)
+
+        object_save.assert_called_once_with(
+            container=object_fakes.container_name,
+            object=object_fakes.object_name_1,
+            file=None,
+            range_size=8 * 1024 * 1024,
+            concurrency=4,
+        )
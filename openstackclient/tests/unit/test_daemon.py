@@ -0,0 +1,218 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import io
+import os
+import socket
+import sys
+import threading
+
+import fixtures
+import mock
+
+from openstackclient import daemon
+from openstackclient.tests.unit import utils
+
+
+class FakeShell(object):
+
+    def __init__(self, status=0):
+        self.status = status
+
+    def run(self, argv):
+        line = sys.stdin.readline()
+        sys.stdout.write('%s %s' % (' '.join(argv), line))
+        sys.stderr.write(os.environ.get('OS_CLOUD', ''))
+        return self.status
+
+
+class TestFrames(utils.TestCase):
+
+    def test_send_recv_frame(self):
+        left, right = socket.socketpair()
+        self.addCleanup(left.close)
+        self.addCleanup(right.close)
+
+        daemon.send_frame(left, daemon.FRAME_STDOUT, b'hello')
+        daemon.send_frame(left, daemon.FRAME_EXIT)
+        left.close()
+
+        self.assertEqual(
+            (daemon.FRAME_STDOUT, b'hello'),
+            daemon.recv_frame(right),
+        )
+        self.assertEqual((daemon.FRAME_EXIT, b''), daemon.recv_frame(right))
+        self.assertEqual((None, None), daemon.recv_frame(right))
+
+
+class TestCommandServer(utils.TestCase):
+
+    def setUp(self):
+        super(TestCommandServer, self).setUp()
+        self.tmp_dir = self.useFixture(fixtures.TempDir()).path
+        self.socket_path = os.path.join(self.tmp_dir, 'sub', 'daemon.sock')
+        self.server = daemon.CommandServer(socket_path=self.socket_path)
+        self.useFixture(fixtures.MockPatch(
+            'openstackclient.daemon.make_warm_shell',
+            return_value=FakeShell(status=3),
+        ))
+
+    def _serve_one(self):
+        sock = self.server._bind()
+        self.addCleanup(sock.close)
+
+        def serve():
+            conn, _addr = sock.accept()
+            try:
+                self.server.handle(conn)
+            finally:
+                conn.close()
+
+        thread = threading.Thread(target=serve)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def test_forward(self):
+        thread = self._serve_one()
+        self.assertEqual(
+            0o600,
+            os.stat(self.socket_path).st_mode & 0o777,
+        )
+
+        stdin = io.BytesIO(b'input line\n')
+        stdout = io.BytesIO()
+        stderr = io.BytesIO()
+        self.useFixture(fixtures.EnvironmentVariable('OS_CLOUD', 'devstack'))
+
+        status = daemon.forward(
+            ['server', 'list'],
+            socket_path=self.socket_path,
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+        )
+        thread.join()
+
+        self.assertEqual(3, status)
+        self.assertEqual(b'server list input line\n', stdout.getvalue())
+        self.assertEqual(b'devstack', stderr.getvalue())
+
+    def test_forward_unavailable(self):
+        self.assertRaises(
+            daemon.DaemonUnavailable,
+            daemon.forward,
+            ['server', 'list'],
+            socket_path=self.socket_path,
+        )
+
+    def test_run_command_restores_state(self):
+        left, right = socket.socketpair()
+        self.addCleanup(left.close)
+        self.addCleanup(right.close)
+        daemon.send_frame(right, daemon.FRAME_STDIN_DATA, b'')
+        cwd = os.getcwd()
+        stdout = sys.stdout
+
+        status = self.server.run_command(
+            left,
+            ['help'],
+            {'OS_CLOUD': 'other'},
+            self.tmp_dir,
+        )
+
+        self.assertEqual(3, status)
+        self.assertEqual(cwd, os.getcwd())
+        self.assertIs(stdout, sys.stdout)
+        self.assertNotEqual('other', os.environ.get('OS_CLOUD'))
+
+    def test_client_manager_cache(self):
+        self.useFixture(fixtures.MockPatch(
+            'openstackclient.daemon.MAX_CLIENT_MANAGERS', 2))
+        self.server.add_client_manager('a', 'cm-a')
+        self.server.add_client_manager('b', 'cm-b')
+        self.assertEqual('cm-a', self.server.get_client_manager('a'))
+        self.server.add_client_manager('c', 'cm-c')
+
+        self.assertIsNone(self.server.get_client_manager('b'))
+        self.assertEqual('cm-a', self.server.get_client_manager('a'))
+        self.assertEqual('cm-c', self.server.get_client_manager('c'))
+
+    def test_client_manager_key(self):
+        key = daemon.client_manager_key(
+            {'auth': {'username': 'admin'}, 'region_name': 'One'},
+            {'compute': '2.1'},
+        )
+        self.assertEqual(
+            key,
+            daemon.client_manager_key(
+                {'region_name': 'One', 'auth': {'username': 'admin'}},
+                {'compute': '2.1'},
+            ),
+        )
+        self.assertNotEqual(
+            key,
+            daemon.client_manager_key(
+                {'auth': {'username': 'admin'}, 'region_name': 'Two'},
+                {'compute': '2.1'},
+            ),
+        )
+
+
+class TestSocketStreams(utils.TestCase):
+
+    def test_reader(self):
+        left, right = socket.socketpair()
+        self.addCleanup(left.close)
+        self.addCleanup(right.close)
+        daemon.send_frame(right, daemon.FRAME_STDIN_DATA, b'one\ntw')
+        daemon.send_frame(right, daemon.FRAME_STDIN_DATA, b'o\n')
+        daemon.send_frame(right, daemon.FRAME_STDIN_DATA, b'')
+
+        reader = daemon._TextReader(daemon._SocketReader(left))
+        self.assertEqual(['one\n', 'two\n'], list(reader))
+        self.assertEqual('', reader.read())
+
+    def test_writer(self):
+        left, right = socket.socketpair()
+        self.addCleanup(left.close)
+        self.addCleanup(right.close)
+
+        writer = daemon._SocketWriter(left, daemon.FRAME_STDERR)
+        writer.write(u'text')
+        writer.buffer.write(b'bytes')
+
+        self.assertEqual(
+            (daemon.FRAME_STDERR, b'text'),
+            daemon.recv_frame(right),
+        )
+        self.assertEqual(
+            (daemon.FRAME_STDERR, b'bytes'),
+            daemon.recv_frame(right),
+        )
+
+
+class TestMain(utils.TestCase):
+
+    def test_main_fallback(self):
+        with mock.patch.object(
+            daemon, 'forward',
+            side_effect=daemon.DaemonUnavailable('no server'),
+        ), mock.patch('openstackclient.shell.main', return_value=5) as m:
+            self.assertEqual(5, daemon.main(['server', 'list']))
+        m.assert_called_once_with(['server', 'list'])
+
+    def test_main_forward(self):
+        with mock.patch.object(daemon, 'forward', return_value=0) as m:
+            self.assertEqual(0, daemon.main(['server', 'list']))
+        m.assert_called_once_with(['server', 'list'])
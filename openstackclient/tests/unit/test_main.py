@@ -0,0 +1,37 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+
+from openstackclient.common import startup
+from openstackclient import main
+from openstackclient.tests.unit import utils
+
+
+class TestMain(utils.TestCase):
+
+    def setUp(self):
+        super(TestMain, self).setUp()
+        self.addCleanup(startup.disable)
+
+    def test_main(self):
+        with mock.patch('openstackclient.shell.main', return_value=0) as m:
+            self.assertEqual(0, main.main(['server', 'list']))
+        m.assert_called_once_with(['server', 'list'])
+        self.assertIsNone(startup.get_profile())
+
+    def test_main_profile_startup(self):
+        with mock.patch('openstackclient.shell.main', return_value=0) as m:
+            self.assertEqual(0, main.main(['--profile-startup', 'help']))
+        m.assert_called_once_with(['--profile-startup', 'help'])
+        self.assertIsNotNone(startup.get_profile())
@@ -13,15 +13,22 @@
 #   under the License.
 #
 
+import json
 import os
 import sys
 
+import fixtures
 import mock
 from osc_lib.tests import utils as osc_lib_test_utils
 from oslo_utils import importutils
+import six
 import wrapt
 
+from openstackclient.common import compression
+from openstackclient.common import startup
+from openstackclient.common import trace
 from openstackclient import shell
+from openstackclient.tests.unit import utils
 
 
 DEFAULT_AUTH_URL = "http://127.0.0.1:5000/v2.0/"
@@ -437,3 +444,66 @@ class TestShellArgV(TestShell):
             # When shell.main() gets sys.argv itself it should be decoded
             shell.main()
             self.assertEqual(type(u'x'), type(self.app.call_args[0][0][0]))
+
+
+class TestShellStartupProfile(TestShell):
+    """Test --profile-startup without main()"""
+
+    def setUp(self):
+        super(TestShellStartupProfile, self).setUp()
+        self.addCleanup(startup.disable)
+
+    def test_profile_startup_from_options(self):
+        # Commands run by a warm process do not go through main()
+        _shell = shell.OpenStackShell()
+        _shell.stderr = six.StringIO()
+        _shell.run(['--profile-startup', '--os-auth-type', 'none',
+                    'configuration', 'show'])
+        self.assertIn('initialize', _shell.stderr.getvalue())
+        # The next command of a warm process is not profiled
+        self.assertIsNone(startup.get_profile())
+
+
+class TestShellTraceFile(TestShell):
+    """Test --trace-file without main()"""
+
+    def setUp(self):
+        super(TestShellTraceFile, self).setUp()
+        self.addCleanup(trace.disable)
+
+    def test_trace_file_from_options(self):
+        # Commands run by a warm process do not go through main()
+        trace_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'trace.json',
+        )
+        _shell = shell.OpenStackShell()
+        _shell.run(['--trace-file', trace_file, '--os-auth-type', 'none',
+                    'configuration', 'show'])
+        with open(trace_file) as f:
+            events = json.load(f)['traceEvents']
+        self.assertIn('initialize', [e.get('name') for e in events])
+        # The next command of a warm process is not traced
+        self.assertFalse(trace.is_enabled())
+
+
+class TestShellCompressionReport(utils.TestCase):
+    """Test --http-compression-report over several runs of a shell"""
+
+    def setUp(self):
+        super(TestShellCompressionReport, self).setUp()
+        self.addCleanup(compression.disable_report)
+
+    def test_compression_report_once(self):
+        # A warm process runs several commands in one process
+        _shell = shell.OpenStackShell()
+        _shell.stdout = six.StringIO()
+        _shell.stderr = six.StringIO()
+        _shell.run(['--http-compression-report', '--os-auth-type', 'none',
+                    'configuration', 'show'])
+        self.assertIn('HTTP compression:', _shell.stderr.getvalue())
+        self.assertIsNone(compression.get_stats())
+
+        _shell.stderr = six.StringIO()
+        _shell.run(['--os-auth-type', 'none', 'configuration', 'show'])
+        self.assertNotIn('HTTP compression:', _shell.stderr.getvalue())
@@ -37,6 +37,14 @@ class TestCase(testtools.TestCase):
     def setUp(self):
         testtools.TestCase.setUp(self)
 
+        # Keep the persistent command index and the other on-disk caches
+        # out of the unit tests
+        self.useFixture(fixtures.EnvironmentVariable('OS_COMMAND_INDEX', ''))
+        self.useFixture(fixtures.EnvironmentVariable(
+            'XDG_CACHE_HOME',
+            self.useFixture(fixtures.TempDir()).path,
+        ))
+
         if (os.environ.get("OS_STDOUT_CAPTURE") == "True" or
                 os.environ.get("OS_STDOUT_CAPTURE") == "1"):
             stdout = self.useFixture(fixtures.StringStream("stdout")).stream